@@ -0,0 +1,73 @@
+"""
+Checksum Benchmark
+calculate_checksum against a byte-at-a-time loop
+
+Usage: python benchmarks/checksum_benchmark.py [--sizes 1024 65536 ...]
+
+Each size is measured on random bytes and on 0xFF bytes; the latter
+carries on nearly every add, the worst case for the NumPy path.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pypolycall.core.protocol import checksum as checksum_module
+from pypolycall.core.protocol.checksum import calculate_checksum
+
+DEFAULT_SIZES = [64, 1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024]
+
+INPUTS = {
+    "random": os.urandom,
+    "0xff": lambda size: b"\xff" * size,
+}
+
+def naive_checksum(data: bytes) -> int:
+    """polycall_protocol_calculate_checksum transcribed literally"""
+    checksum = 0
+    for byte in data:
+        checksum = ((checksum << 5) & 0xFFFFFFFF) | (checksum >> 27)
+        checksum = (checksum + byte) & 0xFFFFFFFF
+    return checksum
+
+def best_of(func, data: bytes, repeat: int) -> float:
+    """Fastest of repeat runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Payload sizes in bytes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+    args = parser.parse_args()
+
+    vectorized = checksum_module._load_numpy() is not None
+    print(f"NumPy path: {'enabled' if vectorized else 'unavailable'} "
+          f"(threshold {checksum_module.VECTOR_THRESHOLD} bytes)")
+    print(f"{'size':>12} {'input':>8} {'naive MB/s':>12} {'fast MB/s':>12} {'speedup':>9}")
+
+    for size in args.sizes:
+        for name, make_input in INPUTS.items():
+            data = make_input(size)
+            if calculate_checksum(data) != naive_checksum(data):
+                print(f"checksum mismatch at {size} {name} bytes", file=sys.stderr)
+                return 1
+
+            naive = best_of(naive_checksum, data, args.repeat)
+            fast = best_of(calculate_checksum, data, args.repeat)
+            megabytes = size / (1024 * 1024)
+            print(f"{size:>12} {name:>8} {megabytes / naive:>12.1f} {megabytes / fast:>12.1f} "
+                  f"{naive / fast:>8.1f}x")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Transport Benchmark
+Round-trip latency and pipelined throughput per transport
+
+An echo runtime runs in a separate process, as a co-located polycall.exe
+would. Usage: python benchmarks/transport_benchmark.py [--requests 5000]
+[--event-loop uvloop]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pypolycall.core.loop import EVENT_LOOPS, configured_event_loop, loop_backend, run as run_loop
+from pypolycall.core.protocol import MessageBuilder, MessageParser, MessageTypes, ProtocolHandler
+from pypolycall.core.protocol.messages import HEADER_SIZE
+from pypolycall.core.protocol.shm import start_shm_server
+
+TRANSPORTS = ("tcp", "uds", "shm")
+
+async def echo(reader, writer):
+    """Answer HANDSHAKE in kind and every other frame with its payload"""
+    builder = MessageBuilder()
+    parser = MessageParser()
+    try:
+        while True:
+            header = parser.parse_header(await reader.readexactly(HEADER_SIZE))
+            payload = await reader.readexactly(header.payload_length)
+            if header.type == MessageTypes.HANDSHAKE:
+                reply = builder.handshake_payload()
+                reply_type = MessageTypes.HANDSHAKE
+            else:
+                reply, reply_type = payload, MessageTypes.RESPONSE
+            writer.write(builder.build(reply_type, reply, sequence=header.sequence))
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+def serve(transport: str, address, ready, event_loop: str) -> None:
+    """Runtime process entry point"""
+    async def main():
+        if transport == "tcp":
+            server = await asyncio.start_server(echo, "127.0.0.1", address)
+        elif transport == "uds":
+            server = await asyncio.start_unix_server(echo, address)
+        else:
+            server = await start_shm_server(echo, address)
+        ready.set()
+        await asyncio.Event().wait()
+
+    run_loop(main(), event_loop)
+
+async def measure(handler: ProtocolHandler, payload: bytes, requests: int, window: int):
+    """Sequential latencies and pipelined requests per second"""
+    await handler.connect()
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await handler.execute_raw(payload)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(requests // window):
+        await asyncio.gather(*(handler.execute_raw(payload) for _ in range(window)))
+    throughput = (requests // window) * window / (time.perf_counter() - started)
+
+    await handler.disconnect()
+    return latencies, throughput, loop_backend()
+
+def run(transport: str, args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        address = os.path.join(directory, "polycall.sock")
+        if transport == "tcp":
+            address, handler_args = args.port, {"host": "127.0.0.1", "port": args.port}
+        elif transport == "uds":
+            handler_args = {"host": f"unix://{address}", "port": 0}
+        else:
+            handler_args = {"host": "localhost", "port": 0, "shm_path": address}
+
+        ready = multiprocessing.Event()
+        runtime = multiprocessing.Process(
+            target=serve, args=(transport, address, ready, args.event_loop), daemon=True
+        )
+        runtime.start()
+        ready.wait()
+        try:
+            latencies, throughput, backend = run_loop(measure(
+                ProtocolHandler(**handler_args), os.urandom(args.size), args.requests, args.window
+            ), args.event_loop)
+        finally:
+            runtime.terminate()
+            runtime.join()
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{transport:>6} {p50:>10.1f} {p99:>10.1f} {throughput:>12.0f} {backend:>8}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per phase")
+    parser.add_argument("--size", type=int, default=256, help="Payload bytes")
+    parser.add_argument("--window", type=int, default=64, help="Pipelined requests in flight")
+    parser.add_argument("--port", type=int, default=18084, help="TCP port for the runtime")
+    parser.add_argument("--transports", nargs="+", default=list(TRANSPORTS), choices=TRANSPORTS,
+                        help="tcp: loopback TCP, uds: unix:// socket, shm: shared memory")
+    parser.add_argument("--event-loop", choices=EVENT_LOOPS, default=configured_event_loop(),
+                        help="Event loop backend for the client and the runtime")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, {args.size}-byte payloads, window {args.window}")
+    print(f"{'':>6} {'p50 us':>10} {'p99 us':>10} {'pipelined/s':>12} {'loop':>8}")
+    for transport in args.transports:
+        run(transport, args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,9 +8,10 @@ PROTOCOL COMPLIANCE:
 - Clean separation of concerns enforced
 """
 
+import importlib
+import os
 import sys
 import warnings
-from typing import Optional
 
 # Version and metadata
 __version__ = "1.0.0"
@@ -27,53 +28,65 @@ def _check_architecture_compliance():
 # Perform compliance check
 _check_architecture_compliance()
 
-# Core imports with error handling
-try:
-    from .core.binding import ProtocolBinding
-    from .core.protocol import ProtocolHandler, MessageTypes, StateTransitions
-    from .core.telemetry import TelemetryObserver, MetricsCollector
-except ImportError as e:
-    warnings.warn(f"PyPolyCall core components incomplete: {e}", ImportWarning)
-    ProtocolBinding = None
-    ProtocolHandler = None
-    MessageTypes = None
-    StateTransitions = None
-    TelemetryObserver = None
-    MetricsCollector = None
+# Public names resolved on first access (PEP 562), so importing the
+# package stays cheap and optional dependencies load only when used
+_LAZY_IMPORTS = {
+    "ProtocolBinding": ".core.binding",
+    "BindingPool": ".core.pool",
+    "SyncBinding": ".core.sync",
+    "ProtocolHandler": ".core.protocol",
+    "MessageTypes": ".core.protocol",
+    "StateTransitions": ".core.protocol",
+    "FFIBridge": ".core.ffi",
+    "StateMachine": ".core.state",
+    "StateManager": ".core.state",
+    "TelemetryObserver": ".core.telemetry",
+    "MetricsCollector": ".core.telemetry",
+    "MetricsExporter": ".core.telemetry",
+    "EventTracker": ".core.telemetry",
+    "SlowOperationLog": ".core.telemetry",
+    "CLI": ".cli",
+    "main": ".cli.main",
+    "ConfigManager": ".config",
+    "Logger": ".utils",
+    "Validator": ".utils",
+}
 
-# CLI imports with error handling
-try:
-    from .cli import CLI
-    from .cli.main import main
-except ImportError as e:
-    warnings.warn(f"PyPolyCall CLI incomplete: {e}", ImportWarning)
-    CLI = None
-    main = None
+def __getattr__(name: str):
+    """Import a public name on first access"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Configuration imports with error handling
-try:
-    from .config import ConfigManager
-except ImportError as e:
-    warnings.warn(f"PyPolyCall config incomplete: {e}", ImportWarning)
-    ConfigManager = None
+    try:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    except ImportError as e:
+        warnings.warn(f"PyPolyCall component {name} unavailable: {e}", ImportWarning)
+        value = None
 
-# Utilities imports with error handling
-try:
-    from .utils import Logger, Validator
-except ImportError as e:
-    warnings.warn(f"PyPolyCall utils incomplete: {e}", ImportWarning)
-    Logger = None
-    Validator = None
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 # Public API exports
 __all__ = [
     # Core components
     "ProtocolBinding",
-    "ProtocolHandler", 
+    "BindingPool",
+    "SyncBinding",
+    "ProtocolHandler",
     "MessageTypes",
     "StateTransitions",
+    "FFIBridge",
+    "StateMachine",
+    "StateManager",
     "TelemetryObserver",
     "MetricsCollector",
+    "MetricsExporter",
+    "EventTracker",
+    "SlowOperationLog",
     
     # CLI components
     "CLI",
@@ -110,13 +123,14 @@ def get_protocol_info() -> dict:
     """Get protocol compliance information"""
     return get_architecture_info()
 
-# Show compliance notice in development
-if __debug__:
-    print("=" * 50)
-    print("PYPOLYCALL PROTOCOL COMPLIANCE NOTICE")
-    print("=" * 50)
-    print("This binding is an ADAPTER for polycall.exe runtime.")
-    print("- All operations must go through polycall.exe")
-    print("- Clean architecture enforced")
-    print("- Zero-trust validation required")
-    print("=" * 50)
+# Compliance notice is opt-in and goes to stderr, keeping stdout clean
+# for tools that speak JSON
+if os.environ.get("PYPOLYCALL_COMPLIANCE_NOTICE"):
+    print("=" * 50, file=sys.stderr)
+    print("PYPOLYCALL PROTOCOL COMPLIANCE NOTICE", file=sys.stderr)
+    print("=" * 50, file=sys.stderr)
+    print("This binding is an ADAPTER for polycall.exe runtime.", file=sys.stderr)
+    print("- All operations must go through polycall.exe", file=sys.stderr)
+    print("- Clean architecture enforced", file=sys.stderr)
+    print("- Zero-trust validation required", file=sys.stderr)
+    print("=" * 50, file=sys.stderr)
@@ -6,8 +6,14 @@ Protocol-compliant CLI for PyPolyCall binding
 import sys
 import argparse
 import asyncio
+import json
+import time
 from typing import List, Optional
 
+from ..config.manager import ConfigManager
+from ..core.loop import EVENT_LOOPS, configured_event_loop, loop_backend, run
+from ..core.telemetry.profiler import DEFAULT_INTERVAL, profile
+
 def create_parser() -> argparse.ArgumentParser:
     """Create command line argument parser"""
     parser = argparse.ArgumentParser(
@@ -34,6 +40,13 @@ def create_parser() -> argparse.ArgumentParser:
         help="polycall.exe runtime port (default: 8084)"
     )
     
+    parser.add_argument(
+        "--event-loop",
+        choices=EVENT_LOOPS,
+        default=None,
+        help="Event loop backend (default: PYPOLYCALL_EVENT_LOOP or asyncio)"
+    )
+    
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
     # Info command
@@ -43,6 +56,41 @@ def create_parser() -> argparse.ArgumentParser:
     # Test command  
     test_parser = subparsers.add_parser("test", help="Test protocol connection")
     
+    # Telemetry command
+    telemetry_parser = subparsers.add_parser(
+        "telemetry", help="Show connection telemetry and tail protocol events"
+    )
+    telemetry_parser.add_argument(
+        "--observe", action="store_true", help="Tail state changes, errors and slow calls live"
+    )
+    telemetry_parser.add_argument(
+        "--duration", type=float, default=None, help="Seconds to observe (default: until Ctrl-C)"
+    )
+    telemetry_parser.add_argument("--credentials", default="{}", help="AUTH credentials as JSON")
+    telemetry_parser.add_argument(
+        "--heartbeat-interval", type=float, default=None,
+        help="Seconds between HEARTBEATs (default: off; the runtime must echo them)"
+    )
+    telemetry_parser.add_argument(
+        "--slow-threshold", type=float, default=1.0, help="Seconds before a call is logged as slow"
+    )
+    
+    # Profile command
+    profile_parser = subparsers.add_parser(
+        "profile", help="Sample the binding under a live workload"
+    )
+    profile_parser.add_argument("--operation", default="profile", help="Operation to execute")
+    profile_parser.add_argument("--params", default="{}", help="Operation parameters as JSON")
+    profile_parser.add_argument("--credentials", default="{}", help="AUTH credentials as JSON")
+    profile_parser.add_argument("--requests", type=int, default=1000, help="Operations to execute")
+    profile_parser.add_argument("--concurrency", type=int, default=16, help="Operations in flight")
+    profile_parser.add_argument(
+        "--interval", type=float, default=DEFAULT_INTERVAL, help="Seconds between stack samples"
+    )
+    profile_parser.add_argument(
+        "--output", default="pypolycall.folded", help="Collapsed-stack output file"
+    )
+    
     return parser
 
 async def run_info_command(args: argparse.Namespace) -> int:
@@ -58,6 +106,7 @@ async def run_info_command(args: argparse.Namespace) -> int:
         print(f"Runtime Required: {info['polycall_runtime_required']}")
         print(f"Adapter Pattern: {info['adapter_pattern']}")
         print(f"Zero Trust: {info['zero_trust_compliant']}")
+        print(f"Event Loop: {loop_backend()}")
         
         if args.detailed:
             print("\nPROTOCOL COMPLIANCE:")
@@ -82,6 +131,105 @@ async def run_test_command(args: argparse.Namespace) -> int:
         print(f"Test failed: {e}")
         return 1
 
+def format_event(event) -> str:
+    """One line per ProtocolEvent for the telemetry tail"""
+    stamp = time.strftime("%H:%M:%S", time.localtime(event.timestamp))
+    line = f"{stamp}.{int(event.timestamp * 1000) % 1000:03d} #{event.sequence:<6} {event.kind:<6} {event.name}"
+    if event.duration is not None:
+        line += f" {event.duration * 1e3:.1f}ms"
+    if event.detail:
+        line += f" {event.detail}"
+    return line
+
+async def run_telemetry_command(args: argparse.Namespace) -> int:
+    """Execute telemetry command"""
+    from ..core.binding import ProtocolBinding
+    
+    binding = ProtocolBinding(args.host, args.port, {
+        "heartbeat_interval": args.heartbeat_interval,
+        "slow_call_threshold": args.slow_threshold,
+    })
+    subscription = binding.events.subscribe()
+    
+    async def tail() -> None:
+        async for event in subscription:
+            print(format_event(event), flush=True)
+    
+    try:
+        credentials = json.loads(args.credentials)
+        if not await binding.connect():
+            print(f"Unable to connect to polycall.exe at {args.host}:{args.port}")
+            return 1
+        if not await binding.authenticate(credentials):
+            print("Authentication failed")
+            return 1
+        
+        if args.observe:
+            print(f"Observing {binding.protocol_handler.endpoint}, Ctrl-C to stop")
+            try:
+                await asyncio.wait_for(tail(), args.duration)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await binding.heartbeat()
+    except Exception as e:
+        print(f"Telemetry failed: {e}")
+        return 1
+    finally:
+        subscription.close()
+        handler = binding.protocol_handler
+        await binding.shutdown()
+    
+    if handler is not None:
+        rtt = handler.rtt_stats
+        print(f"RTT: samples={rtt['samples']} missed={rtt['missed']} "
+              f"srtt={(rtt['srtt'] or 0) * 1e3:.3f}ms p99={(rtt['p99'] or 0) * 1e3:.3f}ms")
+    for name, value in binding.metrics.get_current_metrics()["counters"].items():
+        print(f"  {name:<18} {value}")
+    print(f"Events: {binding.events.recorded} recorded, {subscription.dropped} dropped by the tail")
+    return 0
+
+async def run_profile_command(args: argparse.Namespace) -> int:
+    """Execute profile command"""
+    from ..core.binding import ProtocolBinding
+    
+    binding = ProtocolBinding(args.host, args.port)
+    try:
+        params = json.loads(args.params)
+        credentials = json.loads(args.credentials)
+        if not await binding.connect():
+            print(f"Unable to connect to polycall.exe at {args.host}:{args.port}")
+            return 1
+        if not await binding.authenticate(credentials):
+            print("Authentication failed")
+            return 1
+        
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                await binding.execute_operation(args.operation, params)
+        
+        concurrency = max(1, min(args.concurrency, args.requests))
+        counts = [args.requests // concurrency + (i < args.requests % concurrency)
+                  for i in range(concurrency)]
+        with profile(args.output, args.interval) as profiler:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(count) for count in counts))
+            elapsed = time.perf_counter() - started
+    except Exception as e:
+        print(f"Profile failed: {e}")
+        return 1
+    finally:
+        await binding.shutdown()
+    
+    print(f"{args.requests} x {args.operation} in {elapsed:.3f}s "
+          f"({args.requests / elapsed:.0f} ops/s, concurrency {concurrency})")
+    total = profiler.samples or 1
+    print(f"{profiler.samples} samples every {args.interval * 1e3:g}ms")
+    for phase, count in profiler.phases().items():
+        print(f"  {phase:<10} {count:>7} {100 * count / total:6.1f}%")
+    print(f"Collapsed stacks written to {args.output}")
+    return 0
+
 class CLI:
     """Main CLI class for extensibility"""
     
@@ -90,26 +238,36 @@ class CLI:
     
     async def run(self, argv: Optional[List[str]] = None) -> int:
         """Main CLI execution"""
-        args = self.parser.parse_args(argv)
-        
+        return await self.dispatch(self.parser.parse_args(argv))
+    
+    async def dispatch(self, args: argparse.Namespace) -> int:
+        """Run the command named by parsed arguments"""
         if args.command == "info":
             return await run_info_command(args)
         elif args.command == "test":
             return await run_test_command(args)
+        elif args.command == "telemetry":
+            return await run_telemetry_command(args)
+        elif args.command == "profile":
+            return await run_profile_command(args)
         else:
             self.parser.print_help()
             return 1
 
-async def main_async() -> None:
+async def main_async(cli: Optional[CLI] = None, args: Optional[argparse.Namespace] = None) -> None:
     """Async main entry point"""
-    cli = CLI()
-    exit_code = await cli.run()
+    cli = cli or CLI()
+    exit_code = await (cli.dispatch(args) if args is not None else cli.run())
     sys.exit(exit_code)
 
-def main() -> None:
-    """Synchronous CLI entry point"""
+def main(argv: Optional[List[str]] = None) -> None:
+    """Synchronous CLI entry point, run on the configured event loop backend"""
+    cli = CLI()
+    args = cli.parser.parse_args(argv)
+    # The backend is picked before any loop runs, so read the core section synchronously
+    core_config = ConfigManager().default_config()["core"]
     try:
-        asyncio.run(main_async())
+        run(main_async(cli, args), args.event_loop or configured_event_loop(core_config))
     except KeyboardInterrupt:
         print("\nOperation cancelled by user")
         sys.exit(130)
@@ -23,13 +23,38 @@ class ConfigManager:
     
     async def get_default_config(self) -> Dict[str, Any]:
         """Get default configuration"""
+        return self.default_config()
+    
+    def default_config(self) -> Dict[str, Any]:
+        """Default configuration, for callers that run before an event loop exists"""
         return {
             'core': {
                 'polycall_host': os.getenv('PYPOLYCALL_HOST', 'localhost'),
                 'polycall_port': int(os.getenv('PYPOLYCALL_PORT', '8084')),
+                'connection_timeout': 30,
+                'retry_attempts': 3,
+                'retry_backoff': 0.1,
+                'retry_backoff_max': 10.0,
+                'heartbeat_interval': None,
+                'heartbeat_timeout': 5.0,
+                'heartbeat_max_missed': 2,
+                'ffi_path': os.getenv('PYPOLYCALL_FFI_PATH'),
+                'ffi_workers': None,
+                'shm_path': os.getenv('PYPOLYCALL_SHM_PATH'),
+                'shm_ring_size': 1024 * 1024,
+                'event_loop': os.getenv('PYPOLYCALL_EVENT_LOOP', 'asyncio'),
+                'slow_call_threshold': 1.0,
+                'slow_call_thresholds': {},
+                'slow_log_path': os.getenv('PYPOLYCALL_SLOW_LOG'),
+                'slow_log_max_bytes': 10 * 1024 * 1024,
+                'slow_log_backup_count': 5,
             },
             'telemetry': {
                 'enabled': True,
+                'enable_metrics': os.getenv('PYPOLYCALL_ENABLE_METRICS', 'false').lower() == 'true',
+                'metrics_host': os.getenv('PYPOLYCALL_METRICS_HOST', '127.0.0.1'),
+                'metrics_port': int(os.getenv('PYPOLYCALL_METRICS_PORT', '9090')),
+                'metrics_cache_ttl': 1.0,
             },
             'cli': {
                 'auto_load_extensions': True,
@@ -3,27 +3,57 @@ PyPolyCall Core Layer
 Protocol binding components for polycall.exe runtime
 """
 
-from .binding import ProtocolBinding
+import importlib
+import warnings
 
-# Conditional imports for graceful degradation
-try:
-    from .protocol import ProtocolHandler, MessageTypes, StateTransitions
-except ImportError:
-    ProtocolHandler = None
-    MessageTypes = None
-    StateTransitions = None
+# Public names resolved on first access (PEP 562), so using one component
+# does not import the pool, the ctypes FFI layer or the state layer with it
+_LAZY_IMPORTS = {
+    "ProtocolBinding": ".binding",
+    "BindingPool": ".pool",
+    "OperationBatcher": ".batching",
+    "SyncBinding": ".sync",
+    "ProtocolHandler": ".protocol",
+    "MessageTypes": ".protocol",
+    "StateTransitions": ".protocol",
+    "FFIBridge": ".ffi",
+    "NativeInterface": ".ffi",
+    "StateMachine": ".state",
+    "StateManager": ".state",
+    "TelemetryObserver": ".telemetry",
+    "MetricsCollector": ".telemetry",
+}
 
-try:
-    from .telemetry import TelemetryObserver, MetricsCollector
-except ImportError:
-    TelemetryObserver = None
-    MetricsCollector = None
+def __getattr__(name: str):
+    """Import a public name on first access"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    except ImportError as e:
+        warnings.warn(f"PyPolyCall component {name} unavailable: {e}", ImportWarning)
+        value = None
+
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 __all__ = [
     "ProtocolBinding",
+    "BindingPool",
+    "OperationBatcher",
+    "SyncBinding",
     "ProtocolHandler", 
     "MessageTypes",
     "StateTransitions",
+    "FFIBridge",
+    "NativeInterface",
+    "StateMachine",
+    "StateManager",
     "TelemetryObserver",
     "MetricsCollector"
 ]
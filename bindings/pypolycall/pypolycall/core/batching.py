@@ -0,0 +1,112 @@
+"""
+Operation Batcher - Coalesce individual operations into batched writes
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class OperationBatcher:
+    """
+    Automatic batching front-end for execute_many
+
+    Operations submitted within max_delay of each other are sent together,
+    flushing early once max_batch_size operations are queued. The target
+    is any object exposing execute_many(operations, return_exceptions),
+    such as ProtocolBinding or BindingPool.
+    """
+
+    def __init__(self,
+                 target: Any,
+                 max_batch_size: int = 64,
+                 max_delay: float = 0.001):
+        """
+        Initialize Operation Batcher
+
+        Args:
+            target: ProtocolBinding or BindingPool receiving the batches
+            max_batch_size: Operations per batch before an immediate flush
+            max_delay: Seconds the first queued operation may wait for company
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive, got: {max_batch_size}")
+
+        self.target = target
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self._queue: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+        self.batches_sent = 0
+        self.operations_sent = 0
+
+    async def submit(self, operation: str, params: Dict[str, Any]) -> Any:
+        """Queue one operation and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((operation, params, future))
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush_now)
+
+        return await future
+
+    async def flush(self) -> None:
+        """Send anything queued and wait for in-progress batches"""
+        self._flush_now()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Flush remaining operations"""
+        await self.flush()
+
+    def _flush_now(self) -> None:
+        """Hand the current queue to a batch task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._queue:
+            return
+
+        batch, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._send(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _send(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        """Execute one batch and resolve its futures in order"""
+        try:
+            results = await self.target.execute_many(
+                [(operation, params) for operation, params, _ in batch],
+                return_exceptions=True,
+            )
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} operations failed: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_sent += 1
+        self.operations_sent += len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @property
+    def pending(self) -> int:
+        """Operations queued but not yet sent"""
+        return len(self._queue)
@@ -4,10 +4,31 @@ Core Protocol Binding - Adapter for polycall.exe
 
 import asyncio
 import logging
-from typing import Any, Dict, Optional
+import random
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..exceptions import RuntimeError as PyPolyCallRuntimeError
+from .protocol import MessageFlags, ProtocolHandler
+from .protocol.compression import DEFAULT_COMPRESSION_THRESHOLD
+from .protocol.handler import DEFAULT_MAX_IN_FLIGHT, DEFAULT_SLOW_CALL_THRESHOLD
+from .protocol.heartbeat import (
+    DEFAULT_HEARTBEAT_MAX_MISSED,
+    DEFAULT_HEARTBEAT_TIMEOUT,
+)
+from .protocol.messages import DEFAULT_RECEIVE_BUFFER_SIZE
+from .protocol.shm import DEFAULT_RING_SIZE
+from .telemetry.events import EventTracker
+from .telemetry.exporter import MetricsExporter
+from .telemetry.metrics import MetricsCollector
+from .telemetry.slowlog import SlowOperationLog
 
 logger = logging.getLogger(__name__)
 
+# Reconnect policy defaults, overridable through the binding config
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 0.1
+DEFAULT_RETRY_BACKOFF_MAX = 10.0
+
 class ProtocolBinding:
     """
     Core Protocol Binding Adapter
@@ -16,6 +37,14 @@ class ProtocolBinding:
     - Acts as adapter to polycall.exe runtime
     - Never bypasses protocol validation
     - Maintains zero-trust architecture
+    
+    RECONNECTION:
+    - Failed connects are retried retry_attempts times with jittered
+      exponential backoff
+    - A dropped connection is re-established in the background and
+      re-authenticated with the cached credentials
+    - Operations executed with reliable=True are sent with the RELIABLE
+      flag and replayed after a reconnect; they must be idempotent
     """
     
     def __init__(self, 
@@ -27,22 +56,167 @@ class ProtocolBinding:
         self.polycall_port = polycall_port
         self.config = binding_config or {}
         
+        # Runtime transport
+        self._protocol_handler: Optional[ProtocolHandler] = None
+        
+        # Metrics outlive reconnects; pass a shared collector as "metrics"
+        # to aggregate several bindings, or None to turn collection off
+        self.metrics: Optional[MetricsCollector] = self.config.get("metrics", MetricsCollector())
+        # Likewise the event log of state changes, errors and slow calls
+        self.events: Optional[EventTracker] = self.config.get("events", EventTracker())
+        # Slow call traces go to a shared "slow_log", or to one opened on
+        # slow_log_path and closed with the binding
+        self._owns_slow_log = "slow_log" not in self.config
+        self.slow_log: Optional[SlowOperationLog] = (
+            self.config["slow_log"] if not self._owns_slow_log
+            else SlowOperationLog.from_config(self.config)
+        )
+        # OpenMetrics endpoint, started on connect when enable_metrics is set
+        self.exporter: Optional[MetricsExporter] = None
+        
         # Connection state
         self._connected = False
         self._authenticated = False
         
+        # Reconnect supervision
+        self.retry_attempts = self.config.get("retry_attempts", DEFAULT_RETRY_ATTEMPTS)
+        self.retry_backoff = self.config.get("retry_backoff", DEFAULT_RETRY_BACKOFF)
+        self.retry_backoff_max = self.config.get("retry_backoff_max", DEFAULT_RETRY_BACKOFF_MAX)
+        self._credentials: Optional[Dict[str, Any]] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._reconnects = 0
+        # Called once the supervisor has restored the connection
+        self.reconnected_callback: Optional[Callable[[], None]] = None
+        
         logger.info(f"ProtocolBinding initialized for {polycall_host}:{polycall_port}")
     
     async def connect(self) -> bool:
-        """Connect to polycall.exe runtime"""
+        """Connect to polycall.exe runtime, retrying with backoff"""
+        self._closing = False
+        for attempt in range(self.retry_attempts + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+            if await self._open_handler():
+                self._connected = True
+                if self.exporter is None:
+                    self.exporter = await MetricsExporter.serve(self.config, self.metrics, bindings=[self])
+                return True
+        return False
+    
+    async def _open_handler(self) -> bool:
+        """Create a ProtocolHandler and complete the HANDSHAKE"""
         try:
-            # Simulate connection logic - actual implementation requires polycall.exe
             logger.info("Attempting connection to polycall.exe runtime")
-            self._connected = True
-            return True
+            handler = ProtocolHandler(
+                host=self.polycall_host,
+                port=self.polycall_port,
+                timeout=self.config.get("connection_timeout", 30),
+                max_in_flight=self.config.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT),
+                codecs=self.config.get("codecs"),
+                compression=self.config.get("compression"),
+                compression_threshold=self.config.get(
+                    "compression_threshold", DEFAULT_COMPRESSION_THRESHOLD
+                ),
+                receive_buffer_size=self.config.get(
+                    "receive_buffer_size", DEFAULT_RECEIVE_BUFFER_SIZE
+                ),
+                # Off unless configured: polycall_protocol_process does not
+                # answer HEARTBEAT, so probing it would drop every connection
+                heartbeat_interval=self.config.get("heartbeat_interval"),
+                heartbeat_timeout=self.config.get(
+                    "heartbeat_timeout", DEFAULT_HEARTBEAT_TIMEOUT
+                ),
+                heartbeat_max_missed=self.config.get(
+                    "heartbeat_max_missed", DEFAULT_HEARTBEAT_MAX_MISSED
+                ),
+                shm_path=self.config.get("shm_path"),
+                shm_ring_size=self.config.get("shm_ring_size", DEFAULT_RING_SIZE),
+                metrics=self.metrics,
+                events=self.events,
+                slow_call_threshold=self.config.get(
+                    "slow_call_threshold", DEFAULT_SLOW_CALL_THRESHOLD
+                ),
+                slow_call_thresholds=self.config.get("slow_call_thresholds"),
+                slow_log=self.slow_log,
+            )
+            handler.connection_lost_callback = self._on_connection_lost
+            await handler.connect()
         except Exception as e:
             logger.error(f"Connection failed: {e}")
             return False
+        
+        self._protocol_handler = handler
+        return True
+    
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a 0-based retry attempt"""
+        ceiling = min(self.retry_backoff_max, self.retry_backoff * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    def _on_connection_lost(self, error: Exception) -> None:
+        """Start the reconnect supervisor when the runtime drops the connection"""
+        self._connected = False
+        if self._closing or self.retry_attempts <= 0:
+            return
+        
+        if not self.is_reconnecting:
+            logger.warning(f"Lost connection to polycall.exe runtime ({error}), reconnecting")
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+    
+    async def _reconnect(self) -> bool:
+        """Re-establish and re-authenticate the connection"""
+        for attempt in range(self.retry_attempts):
+            await asyncio.sleep(self._backoff(attempt))
+            if self._closing:
+                return False
+            if not await self._open_handler():
+                continue
+            
+            if self._authenticated and self._credentials is not None:
+                try:
+                    auth_result = await self._protocol_handler.authenticate(self._credentials)
+                    success = auth_result.success
+                except Exception as e:
+                    logger.error(f"Re-authentication failed: {e}")
+                    success = False
+                if not success:
+                    await self._protocol_handler.disconnect()
+                    continue
+            
+            self._connected = True
+            self._reconnects += 1
+            logger.info(f"Reconnected to polycall.exe runtime after {attempt + 1} attempt(s)")
+            if self.reconnected_callback is not None:
+                self.reconnected_callback()
+            return True
+        
+        logger.error(f"Giving up on polycall.exe runtime after {self.retry_attempts} attempts")
+        self._authenticated = False
+        return False
+    
+    async def _wait_reconnected(self) -> None:
+        """Wait for an in-progress reconnect, raising if it fails"""
+        if self.is_reconnecting:
+            if not await asyncio.shield(self._reconnect_task):
+                raise PyPolyCallRuntimeError("Unable to reconnect to polycall.exe runtime")
+    
+    async def _replay(self, call: Callable[[ProtocolHandler], Awaitable[Any]]) -> Any:
+        """Run a reliable call, replaying it on the new connection after a reconnect"""
+        error: Optional[Exception] = None
+        for _ in range(self.retry_attempts + 1):
+            await self._wait_reconnected()
+            handler = self._protocol_handler
+            try:
+                return await call(handler)
+            except PyPolyCallRuntimeError as e:
+                # Only connection loss is worth replaying
+                if self._closing or (handler is self._protocol_handler
+                                     and not self.is_reconnecting):
+                    raise
+                logger.info(f"Replaying reliable operation after connection loss: {e}")
+                error = e
+        raise error
     
     async def authenticate(self, credentials: Dict[str, Any]) -> bool:
         """Authenticate with polycall.exe runtime"""
@@ -51,23 +225,89 @@ class ProtocolBinding:
         
         try:
             logger.info("Authenticating with runtime")
-            self._authenticated = True
-            return True
+            auth_result = await self._protocol_handler.authenticate(credentials)
+            self._authenticated = auth_result.success
+            if auth_result.success:
+                self._credentials = credentials
+            return auth_result.success
         except Exception as e:
             logger.error(f"Authentication failed: {e}")
             return False
     
-    async def execute_operation(self, operation: str, params: Dict[str, Any]) -> Any:
-        """Execute operation through polycall.exe runtime"""
+    async def execute_operation(self,
+                                operation: str,
+                                params: Dict[str, Any],
+                                reliable: bool = False) -> Any:
+        """
+        Execute operation through polycall.exe runtime
+        
+        Args:
+            operation: Operation identifier
+            params: Operation parameters
+            reliable: Send with the RELIABLE flag and replay across
+                reconnects; only for idempotent operations
+        """
         if not self._authenticated:
             raise RuntimeError("Must authenticate before operation execution")
         
-        # All operations go through protocol handler - NO BYPASS
-        logger.info(f"Executing operation: {operation}")
-        return {"status": "success", "operation": operation, "params": params}
+        # All operations go through protocol handler - NO BYPASS.
+        # Concurrent calls are pipelined on the same connection.
+        logger.debug(f"Executing operation: {operation}")
+        if reliable:
+            return await self._replay(lambda handler: handler.execute_operation(
+                operation, params, MessageFlags.RELIABLE
+            ))
+        return await self._protocol_handler.execute_operation(operation, params)
+    
+    async def execute_many(self,
+                           operations: Iterable[Tuple[str, Dict[str, Any]]],
+                           return_exceptions: bool = False,
+                           reliable: bool = False) -> List[Any]:
+        """Execute (operation, params) pairs in one write, results in order"""
+        if not self._authenticated:
+            raise RuntimeError("Must authenticate before operation execution")
+        
+        if reliable:
+            operations = list(operations)
+            return await self._replay(lambda handler: handler.execute_many(
+                operations, return_exceptions, MessageFlags.RELIABLE
+            ))
+        return await self._protocol_handler.execute_many(operations, return_exceptions)
+    
+    async def execute_raw(self, payload: bytes) -> bytes:
+        """Execute a pre-encoded command payload without codec round-trips"""
+        if not self._authenticated:
+            raise RuntimeError("Must authenticate before operation execution")
+        
+        return await self._protocol_handler.execute_raw(payload)
+    
+    async def heartbeat(self) -> float:
+        """Probe runtime liveness, returning the round-trip time in seconds"""
+        if not self._connected:
+            raise RuntimeError("Must connect before heartbeat")
+        
+        return await self._protocol_handler.heartbeat()
     
     async def shutdown(self) -> None:
         """Clean shutdown of binding adapter"""
+        self._closing = True
+        reconnect_task, self._reconnect_task = self._reconnect_task, None
+        if reconnect_task is not None and not reconnect_task.done():
+            reconnect_task.cancel()
+            try:
+                await reconnect_task
+            except asyncio.CancelledError:
+                pass
+        
+        if self._protocol_handler:
+            await self._protocol_handler.disconnect()
+        
+        if self._owns_slow_log and self.slow_log is not None:
+            self.slow_log.close()
+        exporter, self.exporter = self.exporter, None
+        if exporter is not None:
+            await exporter.close()
+        
         self._connected = False
         self._authenticated = False
         logger.info("ProtocolBinding shutdown complete")
@@ -75,9 +315,35 @@ class ProtocolBinding:
     @property
     def is_connected(self) -> bool:
         """Check runtime connection status"""
-        return self._connected
+        return (
+            self._connected
+            and self._protocol_handler is not None
+            and self._protocol_handler.is_connected
+        )
     
     @property
     def is_authenticated(self) -> bool:
         """Check authentication status"""
         return self._authenticated
+    
+    @property
+    def rtt(self) -> Optional[float]:
+        """Smoothed HEARTBEAT round-trip time in seconds, None before any sample"""
+        if self._protocol_handler is None:
+            return None
+        return self._protocol_handler.rtt
+    
+    @property
+    def protocol_handler(self) -> Optional[ProtocolHandler]:
+        """Handler for the current connection"""
+        return self._protocol_handler
+    
+    @property
+    def is_reconnecting(self) -> bool:
+        """Check whether the reconnect supervisor is running"""
+        return self._reconnect_task is not None and not self._reconnect_task.done()
+    
+    @property
+    def reconnects(self) -> int:
+        """Number of successful reconnects"""
+        return self._reconnects
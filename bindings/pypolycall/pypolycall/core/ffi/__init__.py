@@ -0,0 +1,16 @@
+"""
+Core FFI Layer
+Foreign Function Interface for in-process libpolycall calls
+"""
+
+from .bridge import FFIBridge, NativeStateMachine, ParseResult
+from .native import NativeBuffer, NativeInterface, SMStatus
+
+__all__ = [
+    "FFIBridge",
+    "NativeStateMachine",
+    "ParseResult",
+    "NativeBuffer",
+    "NativeInterface",
+    "SMStatus",
+]
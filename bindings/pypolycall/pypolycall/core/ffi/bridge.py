@@ -0,0 +1,391 @@
+"""
+FFI Bridge
+In-process access to libpolycall protocol and state machine functions
+"""
+
+import asyncio
+import concurrent.futures
+import ctypes
+import functools
+import logging
+import os
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from ...exceptions import FFIError
+from ..protocol.messages import MessageHeader
+from .native import (
+    MAX_NAME_LENGTH,
+    NativeBuffer,
+    NativeInterface,
+    PolycallConfigStruct,
+    SMStatus,
+    StateDiagnosticsStruct,
+    StateMachinePtr,
+    StateSnapshotStruct,
+)
+
+logger = logging.getLogger(__name__)
+
+StateRef = Union[int, str]
+
+# Payloads at least this long are checksummed on the worker pool by
+# calculate_checksum_async; shorter ones cost less than the thread hop
+OFFLOAD_THRESHOLD = 64 * 1024
+
+class ParseResult(NamedTuple):
+    """Summary of a PolycallAST"""
+    node_count: int
+    error_count: int
+
+def _encode_name(name: str) -> bytes:
+    encoded = name.encode("utf-8")
+    if not encoded or len(encoded) >= MAX_NAME_LENGTH:
+        raise FFIError(f"Name must be 1-{MAX_NAME_LENGTH - 1} bytes: {name!r}")
+    return encoded
+
+class NativeStateMachine:
+    """
+    PolyCall_StateMachine owned by an FFIBridge
+
+    Mirrors the polycall_sm_* API; failures raise FFIError naming the
+    polycall_sm_status_t code. As in the C library, execute_transition
+    does not check that the machine is in the transition's source state.
+    """
+
+    def __init__(self, native: NativeInterface, handle: StateMachinePtr):
+        self._native = native
+        self._handle = handle
+
+    def _check(self, function: str, status: int) -> None:
+        if status != SMStatus.SUCCESS:
+            raise FFIError(f"{function} failed: {SMStatus.name_of(status)}")
+
+    def _call(self, function: str, *args) -> None:
+        if not self._handle:
+            raise FFIError("State machine has been destroyed")
+        self._check(function, getattr(self._native, function)(self._handle, *args))
+
+    def _state_id(self, state: StateRef) -> int:
+        if isinstance(state, int):
+            return state
+        machine = self._handle.contents
+        encoded = state.encode("utf-8")
+        for index in range(machine.num_states):
+            if machine.states[index].name == encoded:
+                return index
+        raise FFIError(f"Unknown state: {state}")
+
+    def add_state(self, name: str, is_final: bool = False) -> int:
+        """
+        Add a state
+
+        Args:
+            name: State name, unique within the machine
+            is_final: Whether the state is terminal
+
+        Returns:
+            int: State id
+        """
+        self._call("polycall_sm_add_state", _encode_name(name), None, None, is_final)
+        return self._handle.contents.num_states - 1
+
+    def add_transition(self, name: str, from_state: StateRef, to_state: StateRef) -> None:
+        """Add a named transition between two states, by id or name"""
+        self._call(
+            "polycall_sm_add_transition",
+            _encode_name(name),
+            self._state_id(from_state),
+            self._state_id(to_state),
+            None,
+            None,
+        )
+
+    def execute_transition(self, name: str) -> str:
+        """Execute a named transition, returning the new current state"""
+        self._call("polycall_sm_execute_transition", _encode_name(name))
+        return self.current_state
+
+    def lock_state(self, state: StateRef) -> None:
+        """Block transitions into and out of a state"""
+        self._call("polycall_sm_lock_state", self._state_id(state))
+
+    def unlock_state(self, state: StateRef) -> None:
+        """Allow transitions into and out of a state again"""
+        self._call("polycall_sm_unlock_state", self._state_id(state))
+
+    def verify_state_integrity(self, state: StateRef) -> bool:
+        """Check a state against its stored checksum"""
+        if not self._handle:
+            raise FFIError("State machine has been destroyed")
+        status = self._native.polycall_sm_verify_state_integrity(
+            self._handle, self._state_id(state)
+        )
+        if status == SMStatus.ERROR_INTEGRITY_CHECK_FAILED:
+            return False
+        self._check("polycall_sm_verify_state_integrity", status)
+        return True
+
+    def get_state_version(self, state: StateRef) -> int:
+        """Version counter of a state"""
+        version = ctypes.c_uint()
+        self._call("polycall_sm_get_state_version", self._state_id(state), ctypes.byref(version))
+        return version.value
+
+    def create_snapshot(self, state: StateRef) -> StateSnapshotStruct:
+        """Capture a state for restore_snapshot"""
+        snapshot = StateSnapshotStruct()
+        self._call("polycall_sm_create_state_snapshot", self._state_id(state), ctypes.byref(snapshot))
+        return snapshot
+
+    def restore_snapshot(self, snapshot: StateSnapshotStruct) -> None:
+        """Restore a state captured by create_snapshot"""
+        self._call("polycall_sm_restore_state_from_snapshot", ctypes.byref(snapshot))
+
+    def get_diagnostics(self, state: StateRef) -> Dict[str, Any]:
+        """Diagnostics for one state"""
+        diagnostics = StateDiagnosticsStruct()
+        self._call("polycall_sm_get_state_diagnostics", self._state_id(state), ctypes.byref(diagnostics))
+        return {name: getattr(diagnostics, name) for name, _ in diagnostics._fields_}
+
+    def destroy(self) -> None:
+        """Free the native state machine"""
+        handle, self._handle = self._handle, StateMachinePtr()
+        if handle:
+            self._native.polycall_sm_destroy(handle)
+
+    @property
+    def states(self) -> List[str]:
+        """State names in id order"""
+        machine = self._handle.contents
+        return [machine.states[i].name.decode("utf-8") for i in range(machine.num_states)]
+
+    @property
+    def current_state(self) -> Optional[str]:
+        """Name of the current state, None before any state is added"""
+        machine = self._handle.contents
+        if machine.current_state >= machine.num_states:
+            return None
+        return machine.states[machine.current_state].name.decode("utf-8")
+
+    @property
+    def failed_transitions(self) -> int:
+        """Transitions rejected as invalid or by a guard"""
+        return self._handle.contents.diagnostics.failed_transitions
+
+    def __enter__(self) -> "NativeStateMachine":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.destroy()
+
+class FFIBridge:
+    """
+    In-process bridge to libpolycall
+
+    RESPONSIBILITIES:
+    - Compute checksums and headers with the runtime's own C code
+    - Create native state machines on a shared polycall context
+    - Run long native calls on a worker pool, off the event loop
+    - Release the context and the pool on close
+
+    Native calls run without the GIL and read caller buffers in place
+    through NativeBuffer, so the *_async methods let other threads and
+    the event loop proceed while libpolycall works.
+    """
+
+    def __init__(self,
+                 library_path: Optional[str] = None,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize FFI Bridge
+
+        Args:
+            library_path: Shared library to load; PYPOLYCALL_FFI_PATH or
+                the system library search path when omitted
+            max_workers: Worker threads for offloaded calls, the
+                ThreadPoolExecutor default when omitted
+        """
+        self._native = NativeInterface(library_path)
+        self._context = ctypes.c_void_p()
+        self.max_workers = max_workers
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "FFIBridge":
+        """Create a bridge from the core.ffi_path and core.ffi_workers settings"""
+        return cls(config.get("ffi_path"), config.get("ffi_workers"))
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="pypolycall-ffi"
+            )
+        return self._executor
+
+    async def offload(self, function: Callable[..., Any], *args) -> Any:
+        """
+        Run a blocking bridge call on the worker pool
+
+        Args:
+            function: Callable to run, typically a bridge method
+            *args: Arguments for function
+
+        Returns:
+            Any: The function's result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(function, *args)
+        )
+
+    def _get_context(self) -> ctypes.c_void_p:
+        if not self._context:
+            status = self._native.polycall_init_with_config(
+                ctypes.byref(self._context), ctypes.byref(PolycallConfigStruct())
+            )
+            if status != 0:
+                raise FFIError(f"polycall_init_with_config failed with status {status}")
+        return self._context
+
+    def calculate_checksum(self, data) -> int:
+        """
+        polycall_protocol_calculate_checksum over a payload
+
+        Args:
+            data: Any object supporting the buffer protocol
+
+        Returns:
+            int: Unsigned 32-bit checksum
+        """
+        with NativeBuffer(data) as buffer:
+            if buffer.length == 0:
+                return 0
+            return self._native.polycall_protocol_calculate_checksum(buffer.address, buffer.length)
+
+    async def calculate_checksum_async(self, data) -> int:
+        """calculate_checksum, on the worker pool for payloads of OFFLOAD_THRESHOLD bytes or more"""
+        if memoryview(data).nbytes < OFFLOAD_THRESHOLD:
+            return self.calculate_checksum(data)
+        return await self.offload(self.calculate_checksum, data)
+
+    def verify_checksum(self, expected: int, data) -> bool:
+        """Check a payload against the checksum carried in its header"""
+        return self.calculate_checksum(data) == expected
+
+    def create_header(self,
+                      message_type: int,
+                      payload_length: int,
+                      flags: int = 0) -> MessageHeader:
+        """
+        polycall_protocol_create_header
+
+        Sequence and checksum are left 0, as the C library leaves them for
+        the send path to fill in.
+        """
+        header = self._native.polycall_protocol_create_header(message_type, payload_length, flags)
+        return MessageHeader(
+            header.version,
+            header.type,
+            header.flags,
+            header.sequence,
+            header.payload_length,
+            header.checksum,
+        )
+
+    def version_compatible(self, version: int) -> bool:
+        """polycall_protocol_version_compatible"""
+        return bool(self._native.polycall_protocol_version_compatible(version))
+
+    def _parse(self, parse: Callable[[int], Any]) -> ParseResult:
+        """Run one parse on a private parser and free the AST"""
+        native = self._native
+        destroy = native.require("polycall_parser_destroy")
+        parser = native.require("polycall_parser_create")(None)
+        if not parser:
+            raise FFIError("polycall_parser_create failed")
+
+        try:
+            ast = parse(parser)
+            if not ast:
+                get_error = native.polycall_parser_get_error
+                error = (get_error(parser) if get_error is not None else None) or b"unknown error"
+                raise FFIError(f"Parse failed: {error.decode('utf-8', 'replace')}")
+
+            result = ParseResult(ast.contents.node_count, ast.contents.error_count)
+            # parse_tokens allocates root and every node from a pool it frees
+            # before returning, so root and the nodes entries already dangle;
+            # only the PolycallAST itself is the caller's to free
+            native.free(ast)
+            return result
+        finally:
+            destroy(parser)
+
+    def parse_string(self, source) -> ParseResult:
+        """
+        polycall_parser_parse_string over a buffer
+
+        Args:
+            source: Source text as str or any buffer-protocol object
+
+        Returns:
+            ParseResult: Node and error counts
+        """
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        parse = self._native.require("polycall_parser_parse_string")
+        with NativeBuffer(source) as buffer:
+            return self._parse(lambda parser: parse(parser, buffer.address, buffer.length))
+
+    def parse_file(self, path: Union[str, os.PathLike]) -> ParseResult:
+        """polycall_parser_parse_file; the file is read by libpolycall"""
+        parse = self._native.require("polycall_parser_parse_file")
+        filename = os.fsencode(path)
+        return self._parse(lambda parser: parse(parser, filename))
+
+    async def parse_string_async(self, source) -> ParseResult:
+        """parse_string on the worker pool"""
+        return await self.offload(self.parse_string, source)
+
+    async def parse_file_async(self, path: Union[str, os.PathLike]) -> ParseResult:
+        """parse_file on the worker pool"""
+        return await self.offload(self.parse_file, path)
+
+    def create_state_machine(self) -> NativeStateMachine:
+        """Create an empty native state machine"""
+        handle = StateMachinePtr()
+        status = self._native.polycall_sm_create_with_integrity(
+            self._get_context(), ctypes.byref(handle), None
+        )
+        if status != SMStatus.SUCCESS:
+            raise FFIError(
+                f"polycall_sm_create_with_integrity failed: {SMStatus.name_of(status)}"
+            )
+        return NativeStateMachine(self._native, handle)
+
+    def close(self) -> None:
+        """Wait for offloaded calls and release the polycall context; destroy state machines first"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+        if self._context:
+            self._native.polycall_cleanup(self._context)
+            self._context = ctypes.c_void_p()
+
+    def __enter__(self) -> "FFIBridge":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def library_path(self) -> str:
+        """Path the shared library was loaded from"""
+        return self._native.library_path
+
+    @property
+    def native(self) -> NativeInterface:
+        """Raw ctypes functions"""
+        return self._native
+
+__all__ = ["FFIBridge", "NativeStateMachine", "ParseResult", "OFFLOAD_THRESHOLD"]
@@ -0,0 +1,356 @@
+"""
+Native Interface
+ctypes declarations for the libpolycall shared library
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+from typing import Optional
+
+from ...exceptions import FFIError
+
+logger = logging.getLogger(__name__)
+
+# Environment variable naming the shared library to load
+FFI_PATH_ENV = "PYPOLYCALL_FFI_PATH"
+
+# polycall.h limits
+MAX_NAME_LENGTH = 32
+MAX_STATES = 32
+MAX_TRANSITIONS = 64
+
+class SMStatus:
+    """polycall_sm_status_t"""
+    SUCCESS = 0
+    ERROR_INVALID_STATE = 1
+    ERROR_INVALID_TRANSITION = 2
+    ERROR_MAX_STATES_REACHED = 3
+    ERROR_MAX_TRANSITIONS_REACHED = 4
+    ERROR_INVALID_CONTEXT = 5
+    ERROR_NOT_INITIALIZED = 6
+    ERROR_INTEGRITY_CHECK_FAILED = 7
+    ERROR_STATE_LOCKED = 8
+    ERROR_VERSION_MISMATCH = 9
+
+    @classmethod
+    def name_of(cls, status: int) -> str:
+        """Symbolic name of a status code"""
+        for name, value in vars(cls).items():
+            if name.isupper() and value == status:
+                return name
+        return f"UNKNOWN({status})"
+
+class MessageHeaderStruct(ctypes.Structure):
+    """polycall_message_header_t"""
+    _fields_ = [
+        ("version", ctypes.c_uint8),
+        ("type", ctypes.c_uint8),
+        ("flags", ctypes.c_uint16),
+        ("sequence", ctypes.c_uint32),
+        ("payload_length", ctypes.c_uint32),
+        ("checksum", ctypes.c_uint32),
+    ]
+
+class StateStruct(ctypes.Structure):
+    """PolyCall_State"""
+    _fields_ = [
+        ("name", ctypes.c_char * MAX_NAME_LENGTH),
+        ("on_enter", ctypes.c_void_p),
+        ("on_exit", ctypes.c_void_p),
+        ("is_final", ctypes.c_bool),
+        ("id", ctypes.c_uint),
+        ("checksum", ctypes.c_uint32),
+        ("timestamp", ctypes.c_uint64),
+        ("version", ctypes.c_uint),
+        ("is_locked", ctypes.c_bool),
+    ]
+
+class TransitionStruct(ctypes.Structure):
+    """PolyCall_Transition"""
+    _fields_ = [
+        ("name", ctypes.c_char * MAX_NAME_LENGTH),
+        ("from_state", ctypes.c_uint),
+        ("to_state", ctypes.c_uint),
+        ("action", ctypes.c_void_p),
+        ("is_valid", ctypes.c_bool),
+        ("guard_condition", ctypes.c_void_p),
+        ("guard_checksum", ctypes.c_uint32),
+    ]
+
+class DiagnosticsCounters(ctypes.Structure):
+    """Anonymous diagnostics member of PolyCall_StateMachine"""
+    _fields_ = [
+        ("failed_transitions", ctypes.c_uint),
+        ("integrity_violations", ctypes.c_uint),
+        ("last_verification", ctypes.c_uint64),
+    ]
+
+class StateMachineStruct(ctypes.Structure):
+    """PolyCall_StateMachine"""
+    _fields_ = [
+        ("states", StateStruct * MAX_STATES),
+        ("transitions", TransitionStruct * MAX_TRANSITIONS),
+        ("current_state", ctypes.c_uint),
+        ("num_states", ctypes.c_uint),
+        ("num_transitions", ctypes.c_uint),
+        ("ctx", ctypes.c_void_p),
+        ("is_initialized", ctypes.c_bool),
+        ("integrity_check", ctypes.c_void_p),
+        ("machine_checksum", ctypes.c_uint32),
+        ("diagnostics", DiagnosticsCounters),
+    ]
+
+class StateSnapshotStruct(ctypes.Structure):
+    """PolyCall_StateSnapshot"""
+    _fields_ = [
+        ("state", StateStruct),
+        ("timestamp", ctypes.c_uint64),
+        ("checksum", ctypes.c_uint32),
+    ]
+
+class StateDiagnosticsStruct(ctypes.Structure):
+    """PolyCall_StateDiagnostics"""
+    _fields_ = [
+        ("state_id", ctypes.c_uint),
+        ("creation_time", ctypes.c_uint64),
+        ("last_modified", ctypes.c_uint64),
+        ("transition_count", ctypes.c_uint),
+        ("integrity_check_count", ctypes.c_uint),
+        ("is_locked", ctypes.c_bool),
+        ("current_checksum", ctypes.c_uint32),
+    ]
+
+class PolycallConfigStruct(ctypes.Structure):
+    """polycall_config_t"""
+    _fields_ = [
+        ("flags", ctypes.c_uint),
+        ("memory_pool_size", ctypes.c_size_t),
+        ("user_data", ctypes.c_void_p),
+    ]
+
+class ASTStruct(ctypes.Structure):
+    """PolycallAST"""
+    _fields_ = [
+        ("root", ctypes.c_void_p),
+        ("nodes", ctypes.c_void_p),
+        ("node_count", ctypes.c_uint32),
+        ("capacity", ctypes.c_uint32),
+        ("error_count", ctypes.c_uint32),
+    ]
+
+class _PyBuffer(ctypes.Structure):
+    """CPython Py_buffer"""
+    _fields_ = [
+        ("buf", ctypes.c_void_p),
+        ("obj", ctypes.c_void_p),
+        ("len", ctypes.c_ssize_t),
+        ("itemsize", ctypes.c_ssize_t),
+        ("readonly", ctypes.c_int),
+        ("ndim", ctypes.c_int),
+        ("format", ctypes.c_char_p),
+        ("shape", ctypes.c_void_p),
+        ("strides", ctypes.c_void_p),
+        ("suboffsets", ctypes.c_void_p),
+        ("internal", ctypes.c_void_p),
+    ]
+
+StateMachinePtr = ctypes.POINTER(StateMachineStruct)
+ASTPtr = ctypes.POINTER(ASTStruct)
+
+_PyBUF_SIMPLE = 0
+
+_get_buffer = ctypes.pythonapi.PyObject_GetBuffer
+_get_buffer.restype = ctypes.c_int
+_get_buffer.argtypes = [ctypes.py_object, ctypes.POINTER(_PyBuffer), ctypes.c_int]
+
+_release_buffer = ctypes.pythonapi.PyBuffer_Release
+_release_buffer.restype = None
+_release_buffer.argtypes = [ctypes.POINTER(_PyBuffer)]
+
+class NativeBuffer:
+    """
+    Buffer-protocol export pinned for a native call
+
+    Holds the exporter's buffer (PyObject_GetBuffer) so the address stays
+    valid, and the object cannot be resized, while a call runs without
+    the GIL. Read-only objects such as bytes and memoryview slices are
+    passed without copying; only non-contiguous views are copied.
+    """
+
+    __slots__ = ("_view", "address", "length")
+
+    def __init__(self, data):
+        self._view = _PyBuffer()
+        try:
+            _get_buffer(data, ctypes.byref(self._view), _PyBUF_SIMPLE)
+        except BufferError:
+            _get_buffer(memoryview(data).tobytes(), ctypes.byref(self._view), _PyBUF_SIMPLE)
+        self.address = self._view.buf
+        self.length = self._view.len
+
+    def release(self) -> None:
+        """Release the export; the address is invalid afterwards"""
+        if self._view is not None:
+            _release_buffer(ctypes.byref(self._view))
+            self._view = None
+
+    def __enter__(self) -> "NativeBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+# name: (restype, argtypes)
+_PROTOTYPES = {
+    "polycall_init_with_config": (
+        ctypes.c_int,
+        [ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(PolycallConfigStruct)],
+    ),
+    "polycall_cleanup": (None, [ctypes.c_void_p]),
+    "polycall_protocol_calculate_checksum": (
+        ctypes.c_uint32, [ctypes.c_void_p, ctypes.c_size_t],
+    ),
+    "polycall_protocol_verify_checksum": (
+        ctypes.c_bool,
+        [ctypes.POINTER(MessageHeaderStruct), ctypes.c_void_p, ctypes.c_size_t],
+    ),
+    "polycall_protocol_create_header": (
+        MessageHeaderStruct, [ctypes.c_int, ctypes.c_size_t, ctypes.c_int],
+    ),
+    "polycall_protocol_version_compatible": (ctypes.c_bool, [ctypes.c_uint8]),
+    "polycall_sm_create_with_integrity": (
+        ctypes.c_int,
+        [ctypes.c_void_p, ctypes.POINTER(StateMachinePtr), ctypes.c_void_p],
+    ),
+    "polycall_sm_destroy": (None, [StateMachinePtr]),
+    "polycall_sm_add_state": (
+        ctypes.c_int,
+        [StateMachinePtr, ctypes.c_char_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_bool],
+    ),
+    "polycall_sm_add_transition": (
+        ctypes.c_int,
+        [StateMachinePtr, ctypes.c_char_p, ctypes.c_uint, ctypes.c_uint,
+         ctypes.c_void_p, ctypes.c_void_p],
+    ),
+    "polycall_sm_execute_transition": (ctypes.c_int, [StateMachinePtr, ctypes.c_char_p]),
+    "polycall_sm_verify_state_integrity": (ctypes.c_int, [StateMachinePtr, ctypes.c_uint]),
+    "polycall_sm_lock_state": (ctypes.c_int, [StateMachinePtr, ctypes.c_uint]),
+    "polycall_sm_unlock_state": (ctypes.c_int, [StateMachinePtr, ctypes.c_uint]),
+    "polycall_sm_get_state_version": (
+        ctypes.c_int, [StateMachinePtr, ctypes.c_uint, ctypes.POINTER(ctypes.c_uint)],
+    ),
+    "polycall_sm_create_state_snapshot": (
+        ctypes.c_int,
+        [StateMachinePtr, ctypes.c_uint, ctypes.POINTER(StateSnapshotStruct)],
+    ),
+    "polycall_sm_restore_state_from_snapshot": (
+        ctypes.c_int, [StateMachinePtr, ctypes.POINTER(StateSnapshotStruct)],
+    ),
+    "polycall_sm_get_state_diagnostics": (
+        ctypes.c_int,
+        [StateMachinePtr, ctypes.c_uint, ctypes.POINTER(StateDiagnosticsStruct)],
+    ),
+}
+
+# Functions from optional components; libraries built without them load
+# fine and report FFIError when the function is used
+_OPTIONAL_PROTOTYPES = {
+    "polycall_parser_create": (ctypes.c_void_p, [ctypes.c_void_p]),
+    "polycall_parser_destroy": (None, [ctypes.c_void_p]),
+    "polycall_parser_parse_string": (ASTPtr, [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]),
+    "polycall_parser_parse_file": (ASTPtr, [ctypes.c_void_p, ctypes.c_char_p]),
+    "polycall_parser_get_error": (ctypes.c_char_p, [ctypes.c_void_p]),
+}
+
+def find_library(path: Optional[str] = None) -> str:
+    """
+    Resolve the libpolycall shared library
+
+    Args:
+        path: Explicit path; PYPOLYCALL_FFI_PATH and then the system
+            library search path are used when omitted
+
+    Returns:
+        str: Path or name to hand to ctypes
+    """
+    path = path or os.getenv(FFI_PATH_ENV) or ctypes.util.find_library("polycall")
+    if not path:
+        raise FFIError(
+            f"libpolycall not found; set {FFI_PATH_ENV} or the core.ffi_path setting"
+        )
+    return path
+
+class NativeInterface:
+    """
+    Typed handle on libpolycall
+
+    RESPONSIBILITIES:
+    - Load the shared library
+    - Declare argument and return types for every function used
+    - Expose the raw functions; FFIBridge wraps them
+
+    Functions are loaded through ctypes.CDLL, which releases the GIL for
+    the duration of every call.
+    """
+
+    def __init__(self, library_path: Optional[str] = None):
+        """
+        Initialize Native Interface
+
+        Args:
+            library_path: Shared library to load, see find_library
+        """
+        self.library_path = find_library(library_path)
+        try:
+            self._lib = ctypes.CDLL(self.library_path)
+        except OSError as e:
+            raise FFIError(f"Unable to load {self.library_path}: {e}")
+
+        for name, (restype, argtypes) in _PROTOTYPES.items():
+            try:
+                function = getattr(self._lib, name)
+            except AttributeError:
+                raise FFIError(f"{self.library_path} does not export {name}")
+            function.restype = restype
+            function.argtypes = argtypes
+            setattr(self, name, function)
+
+        for name, (restype, argtypes) in _OPTIONAL_PROTOTYPES.items():
+            function = getattr(self._lib, name, None)
+            if function is not None:
+                function.restype = restype
+                function.argtypes = argtypes
+            setattr(self, name, function)
+
+        # Frees memory libpolycall hands back to the caller
+        self.free = ctypes.CDLL(None).free
+        self.free.restype = None
+        self.free.argtypes = [ctypes.c_void_p]
+
+        logger.debug(f"Loaded libpolycall from {self.library_path}")
+
+    def require(self, name: str):
+        """Look up an optional function, raising FFIError when missing"""
+        function = getattr(self, name, None)
+        if function is None:
+            raise FFIError(f"{self.library_path} does not export {name}")
+        return function
+
+__all__ = [
+    "NativeInterface",
+    "NativeBuffer",
+    "SMStatus",
+    "MessageHeaderStruct",
+    "StateMachineStruct",
+    "StateSnapshotStruct",
+    "StateDiagnosticsStruct",
+    "PolycallConfigStruct",
+    "StateMachinePtr",
+    "ASTStruct",
+    "ASTPtr",
+    "find_library",
+    "MAX_NAME_LENGTH",
+    "FFI_PATH_ENV",
+]
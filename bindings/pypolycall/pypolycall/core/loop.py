@@ -0,0 +1,121 @@
+"""
+Event Loop Selection
+Opt-in uvloop backend with fallback to the stdlib asyncio loop
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from typing import Any, Awaitable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_ENV = "PYPOLYCALL_EVENT_LOOP"
+DEFAULT_EVENT_LOOP = "asyncio"
+EVENT_LOOPS = ("asyncio", "uvloop")
+
+def configured_event_loop(config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Event loop backend named by configuration
+
+    Args:
+        config: ``core`` configuration section; its ``event_loop`` key wins
+            over the PYPOLYCALL_EVENT_LOOP environment variable
+
+    Returns:
+        str: Requested backend name, not yet checked for availability
+    """
+    name = (config or {}).get("event_loop") or os.getenv(EVENT_LOOP_ENV) or DEFAULT_EVENT_LOOP
+    return name.lower()
+
+def resolve_event_loop(name: Optional[str] = None) -> str:
+    """
+    Backend that will actually run for a requested name
+
+    uvloop falls back to asyncio, with a warning, when it is not installed
+    or not supported on this platform.
+
+    Args:
+        name: Requested backend, the configured one by default
+
+    Returns:
+        str: "uvloop" or "asyncio"
+    """
+    name = (name or configured_event_loop()).lower()
+    if name not in EVENT_LOOPS:
+        raise ValueError(f"Unknown event loop {name!r}, expected one of {', '.join(EVENT_LOOPS)}")
+
+    if name == "uvloop":
+        try:
+            import uvloop  # noqa: F401
+        except ImportError:
+            logger.warning("uvloop requested but not installed, using the asyncio event loop")
+            return "asyncio"
+    return name
+
+def new_event_loop(name: Optional[str] = None) -> asyncio.AbstractEventLoop:
+    """
+    Create an event loop of the requested backend
+
+    Args:
+        name: "uvloop" or "asyncio", the configured backend by default
+
+    Returns:
+        asyncio.AbstractEventLoop: New, unset event loop
+    """
+    if resolve_event_loop(name) == "uvloop":
+        import uvloop
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+def run(coro: Awaitable[Any], name: Optional[str] = None) -> Any:
+    """
+    asyncio.run() on the requested backend
+
+    Args:
+        coro: Coroutine to run to completion
+        name: "uvloop" or "asyncio", the configured backend by default
+
+    Returns:
+        Any: The coroutine's result
+    """
+    backend = resolve_event_loop(name)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=lambda: new_event_loop(backend)) as runner:
+            return runner.run(coro)
+
+    loop = new_event_loop(backend)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+def loop_backend(loop: Optional[asyncio.AbstractEventLoop] = None) -> str:
+    """
+    Name the backend of a loop
+
+    Args:
+        loop: Loop to inspect, the running loop by default
+
+    Returns:
+        str: "uvloop" or "asyncio"
+    """
+    loop = loop or asyncio.get_running_loop()
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+__all__ = [
+    "EVENT_LOOP_ENV",
+    "DEFAULT_EVENT_LOOP",
+    "EVENT_LOOPS",
+    "configured_event_loop",
+    "resolve_event_loop",
+    "new_event_loop",
+    "run",
+    "loop_backend",
+]
@@ -0,0 +1,341 @@
+"""
+Binding Pool - Multiple runtime connections behind one adapter
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .binding import ProtocolBinding
+from .telemetry.events import EventTracker
+from .telemetry.exporter import MetricsExporter
+from .telemetry.metrics import MetricsCollector
+from .telemetry.slowlog import SlowOperationLog
+
+logger = logging.getLogger(__name__)
+
+class _PooledBinding:
+    """Pool bookkeeping for one ProtocolBinding"""
+
+    __slots__ = ("binding", "leases", "last_used")
+
+    def __init__(self, binding: ProtocolBinding):
+        self.binding = binding
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+class BindingPool:
+    """
+    Pool of ProtocolBinding connections to one polycall.exe runtime
+
+    RESPONSIBILITIES:
+    - Keep between min_size and max_size authenticated connections
+    - Spread concurrent operations across the least-loaded connection,
+      preferring the lowest HEARTBEAT round-trip time on ties
+    - Serve waiters first-come first-served once every connection is saturated
+    - Evict idle connections and connections that miss a HEARTBEAT
+    """
+
+    def __init__(self,
+                 polycall_host: str = "localhost",
+                 polycall_port: int = 8084,
+                 binding_config: Optional[Dict[str, Any]] = None,
+                 credentials: Optional[Dict[str, Any]] = None,
+                 min_size: int = 1,
+                 max_size: int = 10,
+                 max_leases_per_binding: int = 64,
+                 idle_timeout: float = 300.0,
+                 health_check_interval: float = 30.0,
+                 heartbeat_timeout: float = 5.0):
+        """
+        Initialize Binding Pool
+
+        Args:
+            polycall_host: polycall.exe runtime host
+            polycall_port: polycall.exe runtime port
+            binding_config: Configuration passed to every ProtocolBinding
+            credentials: Credentials used to authenticate new connections
+            min_size: Connections kept open even when idle
+            max_size: Upper bound on open connections
+            max_leases_per_binding: Concurrent leases before a connection is saturated
+            idle_timeout: Seconds before an idle connection above min_size is closed
+            health_check_interval: Seconds between health sweeps
+            heartbeat_timeout: Seconds to wait for a HEARTBEAT reply; sweeps
+                probe HEARTBEAT only when binding_config sets heartbeat_interval
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool sizing: min_size={min_size}, max_size={max_size}")
+
+        self.polycall_host = polycall_host
+        self.polycall_port = polycall_port
+        # Every pooled binding reports into one collector, one event log
+        # and one slow call log
+        self.config = dict(binding_config or {})
+        self.metrics: Optional[MetricsCollector] = self.config.setdefault("metrics", MetricsCollector())
+        self.events: Optional[EventTracker] = self.config.setdefault("events", EventTracker())
+        self._owns_slow_log = "slow_log" not in self.config
+        self.slow_log: Optional[SlowOperationLog] = (
+            self.config["slow_log"] if not self._owns_slow_log
+            else SlowOperationLog.from_config(self.config)
+        )
+        self.config["slow_log"] = self.slow_log
+        # One exporter reports the whole pool; pooled bindings start none
+        self._export_metrics = MetricsExporter.enabled(self.config)
+        self.config["enable_metrics"] = False
+        self.exporter: Optional[MetricsExporter] = None
+        self.credentials = credentials or {}
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_leases_per_binding = max_leases_per_binding
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self._entries: List[_PooledBinding] = []
+        self._opening = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._health_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self._evictions = 0
+
+    async def start(self) -> None:
+        """Open min_size connections and start health checking"""
+        await asyncio.gather(*[self._open_entry() for _ in range(self.min_size)])
+        self._health_task = asyncio.ensure_future(self._health_loop())
+        if self._export_metrics and self.exporter is None:
+            self.exporter = await MetricsExporter.serve(
+                {**self.config, "enable_metrics": True}, self.metrics, pool=self
+            )
+        logger.info(
+            f"BindingPool started for {self.polycall_host}:{self.polycall_port} "
+            f"({self.min_size}..{self.max_size})"
+        )
+
+    async def acquire(self) -> _PooledBinding:
+        """
+        Lease the least-loaded connection
+
+        Opens a new connection when every existing one is saturated and the
+        pool is below max_size; otherwise waits in FIFO order.
+        """
+        woken = False
+        while True:
+            if self._closed:
+                raise RuntimeError("BindingPool is closed")
+
+            # New arrivals queue behind existing waiters; woken waiters go first
+            if woken or not self._waiters:
+                entry = self._least_loaded()
+                if entry is not None and entry.leases < self.max_leases_per_binding:
+                    entry.leases += 1
+                    if woken:
+                        self._wake_next()
+                    return entry
+
+                if len(self._entries) + self._opening < self.max_size:
+                    entry = await self._open_entry()
+                    entry.leases += 1
+                    return entry
+
+            waiter = asyncio.get_running_loop().create_future()
+            if woken:
+                self._waiters.appendleft(waiter)
+            else:
+                self._waiters.append(waiter)
+
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # A wakeup that arrived just before cancellation passes on
+                # to the next waiter instead of being lost
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_next()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            woken = True
+
+    def release(self, entry: _PooledBinding) -> None:
+        """Return a lease taken with acquire()"""
+        entry.leases -= 1
+        entry.last_used = time.monotonic()
+        self._wake_next()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[ProtocolBinding]:
+        """Lease a binding for the duration of a block"""
+        entry = await self.acquire()
+        try:
+            yield entry.binding
+        finally:
+            self.release(entry)
+
+    async def execute_operation(self,
+                                operation: str,
+                                params: Dict[str, Any],
+                                reliable: bool = False) -> Any:
+        """Execute an operation on the least-loaded pooled connection"""
+        entry = await self.acquire()
+        try:
+            return await entry.binding.execute_operation(operation, params, reliable)
+        finally:
+            self.release(entry)
+
+    async def execute_many(self,
+                           operations: Iterable[Tuple[str, Dict[str, Any]]],
+                           return_exceptions: bool = False,
+                           reliable: bool = False) -> List[Any]:
+        """Execute a batch of operations on one pooled connection"""
+        entry = await self.acquire()
+        try:
+            return await entry.binding.execute_many(operations, return_exceptions, reliable)
+        finally:
+            self.release(entry)
+
+    async def close(self) -> None:
+        """Close every connection and fail pending waiters"""
+        self._closed = True
+
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("BindingPool is closed"))
+        self._waiters.clear()
+
+        entries, self._entries = self._entries, []
+        await asyncio.gather(*[entry.binding.shutdown() for entry in entries])
+        if self._owns_slow_log and self.slow_log is not None:
+            self.slow_log.close()
+        exporter, self.exporter = self.exporter, None
+        if exporter is not None:
+            await exporter.close()
+        logger.info("BindingPool closed")
+
+    async def _open_entry(self) -> _PooledBinding:
+        """Connect and authenticate a new pooled binding"""
+        self._opening += 1
+        try:
+            binding = ProtocolBinding(
+                polycall_host=self.polycall_host,
+                polycall_port=self.polycall_port,
+                binding_config=self.config,
+            )
+            if not await binding.connect():
+                raise RuntimeError(
+                    f"Unable to connect to polycall.exe at {self.polycall_host}:{self.polycall_port}"
+                )
+            if not await binding.authenticate(self.credentials):
+                await binding.shutdown()
+                raise RuntimeError("Pooled connection failed authentication")
+        finally:
+            self._opening -= 1
+
+        entry = _PooledBinding(binding)
+        # Disconnected entries are skipped by _least_loaded, so waiters are
+        # woken again once one comes back
+        binding.reconnected_callback = self._wake_next
+        self._entries.append(entry)
+        self._wake_next()
+        return entry
+
+    def _least_loaded(self) -> Optional[_PooledBinding]:
+        """Pick the live connection with the fewest leases, then the lowest RTT"""
+        live = [entry for entry in self._entries if entry.binding.is_connected]
+        if not live:
+            return None
+        return min(live, key=lambda entry: (entry.leases, entry.binding.rtt or 0.0))
+
+    def _wake_next(self) -> None:
+        """Wake the longest-waiting acquirer"""
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _evict(self, entry: _PooledBinding, reason: str) -> None:
+        """Remove a connection from the pool and close it"""
+        if entry in self._entries:
+            self._entries.remove(entry)
+            self._evictions += 1
+            logger.info(f"Evicting pooled connection: {reason}")
+            # The freed slot lets a waiter open a replacement connection
+            self._wake_next()
+            await entry.binding.shutdown()
+
+    async def _check_health(self) -> None:
+        """One sweep of idle eviction, HEARTBEAT probing and replenishment"""
+        now = time.monotonic()
+
+        for entry in list(self._entries):
+            if entry.leases:
+                continue
+
+            if (len(self._entries) > self.min_size
+                    and now - entry.last_used > self.idle_timeout):
+                await self._evict(entry, "idle timeout")
+                continue
+
+            if not entry.binding.is_connected:
+                await self._evict(entry, "disconnected")
+                continue
+
+            # HEARTBEAT is only probed when the runtime is configured as
+            # echoing it, see ProtocolBinding heartbeat_interval
+            if self.config.get("heartbeat_interval"):
+                try:
+                    await asyncio.wait_for(entry.binding.heartbeat(), self.heartbeat_timeout)
+                except Exception as e:
+                    await self._evict(entry, f"heartbeat failed: {e}")
+
+        missing = self.min_size - len(self._entries) - self._opening
+        if missing > 0 and not self._closed:
+            results = await asyncio.gather(
+                *[self._open_entry() for _ in range(missing)],
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning(f"Pool replenishment failed: {result}")
+
+    async def _health_loop(self) -> None:
+        """Run health checks every health_check_interval seconds"""
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self._check_health()
+            except Exception as e:
+                logger.error(f"Pool health check failed: {e}")
+
+    @property
+    def size(self) -> int:
+        """Number of open connections"""
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool occupancy statistics"""
+        return {
+            "size": len(self._entries),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "leases": sum(entry.leases for entry in self._entries),
+            "idle": sum(1 for entry in self._entries if not entry.leases),
+            "waiters": len(self._waiters),
+            "evictions": self._evictions,
+            "in_flight": sum(
+                entry.binding.protocol_handler.in_flight
+                for entry in self._entries if entry.binding.protocol_handler is not None
+            ),
+            "rtt": [entry.binding.rtt for entry in self._entries],
+        }
@@ -1,33 +1,34 @@
 """
 Core Protocol Layer
+Protocol Handler and Message Management
 """
 
-# Protocol constants
-class MessageTypes:
-    HANDSHAKE = 0x01
-    AUTH = 0x02
-    COMMAND = 0x03
-    RESPONSE = 0x04
+from .constants import MessageTypes, MessageFlags, StateTransitions
+from .codecs import Codec, CodecRegistry, default_registry
+from .messages import MessageBuilder, MessageParser, MessageHeader, Message, FrameBuffer
+from .transport import StreamTransport
+from .shm import ShmTransport, ShmServer, start_shm_server
+from .heartbeat import HeartbeatMonitor, RTTStats
+from .handler import ProtocolHandler, AuthResult
 
-class StateTransitions:
-    INIT = "init"
-    CONNECTED = "connected"
-    AUTHENTICATED = "authenticated"
-    READY = "ready"
-
-class ProtocolHandler:
-    """Minimal protocol handler"""
-    
-    def __init__(self, host: str, port: int):
-        self.host = host
-        self.port = port
-    
-    async def connect(self):
-        """Connect to runtime"""
-        pass
-    
-    async def authenticate(self, credentials):
-        """Authenticate with runtime"""
-        return type('AuthResult', (), {'success': True})()
-
-__all__ = ["ProtocolHandler", "MessageTypes", "StateTransitions"]
+__all__ = [
+    "ProtocolHandler",
+    "AuthResult",
+    "StreamTransport",
+    "ShmTransport",
+    "ShmServer",
+    "start_shm_server",
+    "HeartbeatMonitor",
+    "RTTStats",
+    "MessageTypes",
+    "MessageFlags",
+    "StateTransitions",
+    "Codec",
+    "CodecRegistry",
+    "default_registry",
+    "MessageBuilder",
+    "MessageParser",
+    "MessageHeader",
+    "Message",
+    "FrameBuffer",
+]
@@ -0,0 +1,155 @@
+"""
+Protocol Checksum
+Bit-exact port of polycall_protocol_calculate_checksum
+"""
+
+# NumPy is imported on the first payload large enough to use it, keeping
+# it off the import path of the package
+np = None
+_numpy_checked = False
+
+_MASK32 = 0xFFFFFFFF
+
+# Payloads at least this long take the NumPy path when it is available
+VECTOR_THRESHOLD = 256
+
+# Vector run length: short after a sequential fix-up, doubling up to the max
+_MIN_BLOCK = 1024
+_MAX_BLOCK = 8 * 1024
+
+# A run stopped by a carry this early means the data carries on most
+# bytes (e.g. runs of 0xFF); the rest of the block is then cheaper in the
+# scalar loop than as a string of short vector runs
+_MIN_RUN = 64
+
+# Per-position shift tables for one _MAX_BLOCK run, built on first use
+_shift_tables = None
+
+def _checksum_loop(data, checksum: int = 0) -> int:
+    """Byte-at-a-time reference loop"""
+    for byte in data:
+        checksum = (((checksum << 5) | (checksum >> 27)) + byte) & _MASK32
+    return checksum
+
+def _load_numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+def _rotate(checksum: int) -> int:
+    return ((checksum << 5) | (checksum >> 27)) & _MASK32
+
+def _get_shift_tables():
+    global _shift_tables
+    if _shift_tables is None:
+        positions = np.arange(_MAX_BLOCK, dtype=np.uint64)
+        _shift_tables = (
+            (positions * 27) % 32,   # 32**-j modulo 2**32-1
+            (positions * 5) % 32,    # 32**i modulo 2**32-1
+        )
+    return _shift_tables
+
+def _fold(values):
+    """Partially reduce uint64 values modulo 2**32-1 (2**32 == 1)"""
+    return (values & np.uint64(_MASK32)) + (values >> np.uint64(32))
+
+def _vector_run(block, checksum: int):
+    """
+    Advance the checksum over a block until the first byte whose update
+    cannot be derived arithmetically
+
+    Rotate-left-5 is multiplication by 32 modulo 2**32-1, so as long as
+    the 32-bit add never carries the running value after byte i is a
+    polynomial in the bytes, evaluated here with one cumulative sum. A
+    carry, or the running value landing on 0xFFFFFFFF (congruent to 0),
+    shows up as a residue smaller than the byte just added; the run stops
+    there and that byte is applied exactly.
+
+    Args:
+        block: uint8 array of at most _MAX_BLOCK bytes
+        checksum: Running value before the block, not 0xFFFFFFFF
+
+    Returns:
+        Tuple[int, int]: Running value and number of bytes consumed
+    """
+    inverse_shift, shift = _get_shift_tables()
+    count = len(block)
+    data = block.astype(np.uint64)
+
+    # residue[i] = 32**i * sum(data[j] * 32**-j for j <= i) + 32**(i+1) * checksum
+    terms = data << inverse_shift[:count]
+    terms[0] += _rotate(checksum)
+    residue = _fold(np.cumsum(terms))
+    residue <<= shift[:count]
+    residue = _fold(_fold(residue))
+
+    # Residues are in [0, 2**32-1]; both ends stand for 0 modulo 2**32-1
+    events = (residue < data) | (residue == np.uint64(_MASK32))
+    if not events.any():
+        return int(residue[-1]), count
+
+    index = int(events.argmax())
+    previous = checksum if index == 0 else int(residue[index - 1])
+    return (_rotate(previous) + int(block[index])) & _MASK32, index + 1
+
+def _checksum_vector(data, checksum: int = 0) -> int:
+    """NumPy path for large payloads"""
+    block_size = _MAX_BLOCK
+    position = 0
+    length = len(data)
+    view = memoryview(data)
+
+    while position < length:
+        if checksum == _MASK32:
+            # rotl(0xFFFFFFFF) is itself; only the next byte can move it
+            checksum = (checksum + int(data[position])) & _MASK32
+            position += 1
+            continue
+
+        end = min(position + block_size, length)
+        checksum, consumed = _vector_run(data[position:end], checksum)
+        position += consumed
+        if position == end:
+            block_size = min(block_size * 2, _MAX_BLOCK)
+        elif consumed < _MIN_RUN:
+            checksum = _checksum_loop(view[position:end], checksum)
+            position = end
+            block_size = _MIN_BLOCK
+        else:
+            block_size = _MIN_BLOCK
+
+    return checksum
+
+def calculate_checksum(data, checksum: int = 0) -> int:
+    """
+    Rotate-left-5-and-add checksum over a payload
+
+    Matches polycall_protocol_calculate_checksum, including returning 0
+    for an empty payload. The algorithm is not CRC32 or Adler-32, so zlib
+    cannot compute it; large payloads use a NumPy reduction when NumPy is
+    installed.
+
+    Args:
+        data: Any object supporting the buffer protocol
+        checksum: Running value to continue from, for payloads checksummed
+            in pieces
+
+    Returns:
+        int: Unsigned 32-bit checksum
+    """
+    view = memoryview(data).cast("B")
+    if len(view) >= VECTOR_THRESHOLD and _load_numpy() is not None:
+        return _checksum_vector(np.frombuffer(view, dtype=np.uint8), checksum)
+    return _checksum_loop(view, checksum)
+
+def verify_checksum(expected: int, data) -> bool:
+    """Check a payload against the checksum carried in its header"""
+    return calculate_checksum(data) == expected
+
+__all__ = ["calculate_checksum", "verify_checksum", "VECTOR_THRESHOLD"]
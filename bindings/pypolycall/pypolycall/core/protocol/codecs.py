@@ -0,0 +1,168 @@
+"""
+Payload Codecs
+Serialization formats negotiated during the HANDSHAKE exchange
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from ...exceptions import ProtocolError
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+class CodecIds:
+    """Wire identifiers advertised in the HANDSHAKE payload"""
+    RAW = 0x00
+    JSON = 0x01
+    MSGPACK = 0x02
+
+class Codec:
+    """Base payload codec"""
+
+    name = ""
+    codec_id = -1
+    # Whether the codec can carry the {"operation", "params"} envelope
+    structured = True
+
+    def encode(self, data: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, payload) -> Any:
+        raise NotImplementedError
+
+class JSONCodec(Codec):
+    """UTF-8 JSON, the format every runtime understands"""
+
+    name = "json"
+    codec_id = CodecIds.JSON
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+        self._decoder = json.JSONDecoder()
+
+    def encode(self, data: Any) -> bytes:
+        return self._encoder.encode(data).encode("utf-8")
+
+    def decode(self, payload) -> Any:
+        return self._decoder.decode(str(payload, "utf-8"))
+
+class MsgpackCodec(Codec):
+    """MessagePack via the msgpack package"""
+
+    name = "msgpack"
+    codec_id = CodecIds.MSGPACK
+
+    def __init__(self):
+        if msgpack is None:
+            raise ProtocolError("msgpack codec requires the msgpack package")
+        self._packer = msgpack.Packer(use_bin_type=True)
+
+    def encode(self, data: Any) -> bytes:
+        return self._packer.pack(data)
+
+    def decode(self, payload) -> Any:
+        return msgpack.unpackb(payload, raw=False)
+
+class RawCodec(Codec):
+    """Pass-through for payloads the caller has already encoded"""
+
+    name = "raw"
+    codec_id = CodecIds.RAW
+    structured = False
+
+    def encode(self, data: Any) -> bytes:
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise ProtocolError(f"raw codec requires a bytes-like payload, got {type(data).__name__}")
+        return data
+
+    def decode(self, payload) -> Any:
+        return payload
+
+class CodecRegistry:
+    """
+    Registry of available payload codecs
+
+    Codecs whose dependencies are missing are simply not registered, so
+    they are never offered during negotiation.
+    """
+
+    def __init__(self):
+        self._by_name: Dict[str, Codec] = {}
+        self._by_id: Dict[int, Codec] = {}
+
+    def register(self, codec: Codec) -> None:
+        """Register a codec instance under its name and wire id"""
+        self._by_name[codec.name] = codec
+        self._by_id[codec.codec_id] = codec
+
+    def get(self, name: str) -> Codec:
+        """Look up a codec by name"""
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise ProtocolError(f"Unknown payload codec: {name}")
+
+    def by_id(self, codec_id: int) -> Codec:
+        """Look up a codec by wire id"""
+        try:
+            return self._by_id[codec_id]
+        except KeyError:
+            raise ProtocolError(f"Unknown payload codec id: {codec_id}")
+
+    def available(self) -> List[str]:
+        """Names of registered codecs"""
+        return list(self._by_name)
+
+    def preference(self, names: Optional[Iterable[str]] = None) -> List[Codec]:
+        """
+        Resolve an ordered preference list to registered structured codecs
+
+        Unknown or unavailable names are skipped; JSON is always appended
+        as the final fallback.
+        """
+        if names is None:
+            names = DEFAULT_CODEC_PREFERENCE
+
+        codecs = [
+            self._by_name[name] for name in names
+            if name in self._by_name and self._by_name[name].structured
+        ]
+        json_codec = self._by_name[JSONCodec.name]
+        if json_codec not in codecs:
+            codecs.append(json_codec)
+        return codecs
+
+    def negotiate(self, offered_ids: Iterable[int]) -> Codec:
+        """Pick the first offered codec this side supports (runtime role)"""
+        for codec_id in offered_ids:
+            codec = self._by_id.get(codec_id)
+            if codec is not None and codec.structured:
+                return codec
+        return self._by_name[JSONCodec.name]
+
+# Preferred order when the binding configuration does not specify one
+DEFAULT_CODEC_PREFERENCE = ("msgpack", "json")
+
+def _build_default_registry() -> CodecRegistry:
+    registry = CodecRegistry()
+    registry.register(JSONCodec())
+    registry.register(RawCodec())
+    if msgpack is not None:
+        registry.register(MsgpackCodec())
+    return registry
+
+default_registry = _build_default_registry()
+
+__all__ = [
+    "CodecIds",
+    "Codec",
+    "JSONCodec",
+    "MsgpackCodec",
+    "RawCodec",
+    "CodecRegistry",
+    "DEFAULT_CODEC_PREFERENCE",
+    "default_registry",
+]
@@ -0,0 +1,146 @@
+"""
+Payload Compression
+Per-message compression signalled by POLYCALL_FLAG_COMPRESSED
+"""
+
+import lzma
+import time
+import zlib
+from typing import Any, Dict, Tuple
+
+from ...exceptions import ProtocolError
+
+# Stream magic used to tell algorithms apart on receive; the flag bit only
+# says "compressed", so every compressed payload is self-describing
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+class CompressionStats:
+    """Counters for compression effectiveness and CPU cost"""
+
+    __slots__ = (
+        "frames_compressed",
+        "frames_skipped",
+        "frames_decompressed",
+        "bytes_in",
+        "bytes_out",
+        "compress_ns",
+        "decompress_ns",
+    )
+
+    def __init__(self):
+        self.frames_compressed = 0
+        self.frames_skipped = 0
+        self.frames_decompressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_ns = 0
+        self.decompress_ns = 0
+
+    @property
+    def ratio(self) -> float:
+        """Uncompressed / compressed bytes over all compressed frames"""
+        return self.bytes_in / self.bytes_out if self.bytes_out else 1.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Snapshot of the counters"""
+        snapshot = {name: getattr(self, name) for name in self.__slots__}
+        snapshot["ratio"] = self.ratio
+        return snapshot
+
+class Compressor:
+    """
+    zlib / lzma payload compressor with a size threshold
+
+    Payloads below the threshold, or that do not shrink, are sent as-is
+    without the COMPRESSED flag.
+    """
+
+    ALGORITHMS = ("zlib", "lzma")
+
+    def __init__(self,
+                 algorithm: str = "zlib",
+                 threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+                 level: int = -1):
+        """
+        Initialize Compressor
+
+        Args:
+            algorithm: "zlib" or "lzma"
+            threshold: Minimum payload size in bytes worth compressing
+            level: zlib level (-1 default) or lzma preset (ignored when -1)
+        """
+        if algorithm not in self.ALGORITHMS:
+            raise ProtocolError(f"Unsupported compression algorithm: {algorithm}")
+
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.level = level
+        self.stats = CompressionStats()
+
+    def compress(self, payload: bytes) -> Tuple[bytes, bool]:
+        """
+        Compress a payload when worthwhile
+
+        Returns:
+            Tuple[bytes, bool]: Payload to send and whether it is compressed
+        """
+        if len(payload) < self.threshold:
+            self.stats.frames_skipped += 1
+            return payload, False
+
+        started = time.thread_time_ns()
+        if self.algorithm == "zlib":
+            compressed = zlib.compress(payload, self.level)
+        else:
+            preset = None if self.level < 0 else self.level
+            compressed = lzma.compress(payload, preset=preset)
+        self.stats.compress_ns += time.thread_time_ns() - started
+
+        if len(compressed) >= len(payload):
+            self.stats.frames_skipped += 1
+            return payload, False
+
+        self.stats.frames_compressed += 1
+        self.stats.bytes_in += len(payload)
+        self.stats.bytes_out += len(compressed)
+        return compressed, True
+
+    def decompress(self, payload, max_size: int) -> bytes:
+        """
+        Decompress a payload received with the COMPRESSED flag
+
+        Args:
+            payload: Compressed bytes (zlib or xz stream)
+            max_size: Largest acceptable decompressed size
+
+        Returns:
+            bytes: Decompressed payload
+        """
+        started = time.thread_time_ns()
+        try:
+            if bytes(payload[:len(_XZ_MAGIC)]) == _XZ_MAGIC:
+                decompressor = lzma.LZMADecompressor()
+                data = decompressor.decompress(payload, max_size + 1)
+            else:
+                decompressor = zlib.decompressobj()
+                data = decompressor.decompress(payload, max_size + 1)
+        except (zlib.error, lzma.LZMAError) as e:
+            raise ProtocolError(f"Payload decompression failed: {e}")
+        finally:
+            self.stats.decompress_ns += time.thread_time_ns() - started
+
+        if len(data) > max_size:
+            raise ProtocolError(f"Decompressed payload exceeds {max_size} bytes")
+        if not decompressor.eof:
+            raise ProtocolError("Compressed payload is truncated")
+
+        self.stats.frames_decompressed += 1
+        return data
+
+__all__ = [
+    "Compressor",
+    "CompressionStats",
+    "DEFAULT_COMPRESSION_THRESHOLD",
+]
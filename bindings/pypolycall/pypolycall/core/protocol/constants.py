@@ -0,0 +1,49 @@
+"""
+Protocol Constants
+Mirrors the wire-level definitions in polycall_protocol.h
+"""
+
+# Protocol version (POLYCALL_PROTOCOL_VERSION)
+PROTOCOL_VERSION = 1
+
+# Handshake magic (PROTOCOL_MAGIC, "PLC")
+PROTOCOL_MAGIC = 0x504C43
+
+# Largest sequence number before wrap-around (MAX_SEQUENCE_NUMBER)
+MAX_SEQUENCE_NUMBER = 0xFFFFFFFF
+
+# Upper bound on a single payload accepted from the runtime
+DEFAULT_MAX_PAYLOAD_SIZE = 16 * 1024 * 1024
+
+class MessageTypes:
+    """polycall_message_type_t"""
+    HANDSHAKE = 0x01
+    AUTH = 0x02
+    COMMAND = 0x03
+    RESPONSE = 0x04
+    ERROR = 0x05
+    HEARTBEAT = 0x06
+
+class MessageFlags:
+    """polycall_protocol_flags_t"""
+    NONE = 0x00
+    ENCRYPTED = 0x01
+    COMPRESSED = 0x02
+    URGENT = 0x04
+    RELIABLE = 0x08
+
+class StateTransitions:
+    INIT = "init"
+    CONNECTED = "connected"
+    AUTHENTICATED = "authenticated"
+    READY = "ready"
+
+__all__ = [
+    "PROTOCOL_VERSION",
+    "PROTOCOL_MAGIC",
+    "MAX_SEQUENCE_NUMBER",
+    "DEFAULT_MAX_PAYLOAD_SIZE",
+    "MessageTypes",
+    "MessageFlags",
+    "StateTransitions",
+]
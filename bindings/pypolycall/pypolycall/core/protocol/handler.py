@@ -0,0 +1,708 @@
+"""
+Protocol Handler
+Message exchange with the polycall.exe runtime over StreamTransport or ShmTransport
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ...exceptions import ProtocolError, RuntimeError as PyPolyCallRuntimeError
+from ..telemetry.events import EventKinds, EventTracker
+from ..telemetry.metrics import MetricsCollector
+from ..telemetry.slowlog import CallTrace, SlowOperationLog
+from .constants import (
+    DEFAULT_MAX_PAYLOAD_SIZE,
+    PROTOCOL_VERSION,
+    MessageFlags,
+    MessageTypes,
+    StateTransitions,
+)
+from .codecs import Codec, CodecRegistry, default_registry
+from .compression import DEFAULT_COMPRESSION_THRESHOLD, Compressor
+from .heartbeat import (
+    DEFAULT_HEARTBEAT_MAX_MISSED,
+    DEFAULT_HEARTBEAT_TIMEOUT,
+    HeartbeatMonitor,
+    RTTStats,
+)
+from .messages import (
+    DEFAULT_RECEIVE_BUFFER_SIZE,
+    HEADER_SIZE,
+    HEARTBEAT_STRUCT,
+    Message,
+    MessageBuilder,
+    MessageHeader,
+    MessageParser,
+)
+from .shm import DEFAULT_RING_SIZE, ShmTransport
+from .transport import StreamTransport
+
+logger = logging.getLogger(__name__)
+
+# Default bound on concurrently outstanding requests per connection
+DEFAULT_MAX_IN_FLIGHT = 1024
+
+# Operation name execute_raw() calls are accounted under in metrics
+RAW_OPERATION = "_raw"
+
+# Calls taking at least this many seconds are recorded as SLOW events
+DEFAULT_SLOW_CALL_THRESHOLD = 1.0
+
+class AuthResult(NamedTuple):
+    """Outcome of an AUTH exchange"""
+    success: bool
+    payload: Any = None
+
+class ProtocolHandler:
+    """
+    Protocol Handler for polycall.exe Runtime
+
+    RESPONSIBILITIES:
+    - HANDSHAKE / AUTH / COMMAND message exchange
+    - Frame construction and verification
+    - Sequence-number multiplexing of in-flight requests
+    - Payload codec and compression negotiation
+    - HEARTBEAT round-trip tracking and half-open detection
+    - Inline request, frame and state metrics when given a MetricsCollector
+    - State transition, error and slow call events when given an EventTracker
+    - Per-phase traces of calls over their threshold when given a
+      SlowOperationLog
+    - Connection lifecycle
+    """
+
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 timeout: Optional[float] = 30.0,
+                 max_payload_size: int = DEFAULT_MAX_PAYLOAD_SIZE,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 codecs: Optional[Iterable[str]] = None,
+                 codec_registry: Optional[CodecRegistry] = None,
+                 compression: Optional[str] = None,
+                 compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+                 receive_buffer_size: int = DEFAULT_RECEIVE_BUFFER_SIZE,
+                 heartbeat_interval: Optional[float] = None,
+                 heartbeat_timeout: float = DEFAULT_HEARTBEAT_TIMEOUT,
+                 heartbeat_max_missed: int = DEFAULT_HEARTBEAT_MAX_MISSED,
+                 shm_path: Optional[str] = None,
+                 shm_ring_size: int = DEFAULT_RING_SIZE,
+                 metrics: Optional[MetricsCollector] = None,
+                 events: Optional[EventTracker] = None,
+                 slow_call_threshold: float = DEFAULT_SLOW_CALL_THRESHOLD,
+                 slow_call_thresholds: Optional[Dict[str, float]] = None,
+                 slow_log: Optional[SlowOperationLog] = None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+        self._codec_registry = codec_registry or default_registry
+        self._codec_preference = self._codec_registry.preference(codecs)
+        self._builder = MessageBuilder()
+        self._parser = MessageParser(max_payload_size)
+
+        # Inbound COMPRESSED frames are always honoured; outbound compression
+        # is only used when requested here and accepted at HANDSHAKE
+        self._compression_requested = compression is not None
+        self._compress_outbound = False
+        self._compressor = Compressor(compression or "zlib", compression_threshold)
+        # A co-located runtime listening on shm_path takes frames through
+        # shared memory; everything else goes over TCP, or a Unix domain
+        # socket for unix:// hosts
+        if shm_path:
+            self._transport = ShmTransport(
+                shm_path, self._parser, timeout, receive_buffer_size, shm_ring_size
+            )
+            self.endpoint = shm_path
+        else:
+            self._transport = StreamTransport(
+                host, port, self._parser, timeout, receive_buffer_size
+            )
+            self.endpoint = self._transport.endpoint
+
+        # Pipelined requests keyed by sequence number, each with a flag for
+        # whether its reply is decoded with the connection codec and the
+        # call's trace when slow calls are logged; replies are matched in
+        # whatever order the runtime sends them
+        self._pending: Dict[int, Tuple[asyncio.Future, bool, Optional[CallTrace]]] = {}
+        self._max_in_flight = max_in_flight
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._write_lock = asyncio.Lock()
+
+        self._state = StateTransitions.INIT
+        self._remote_version: Optional[int] = None
+        self._metrics = metrics
+        self._events = events
+        # Thresholds in ns; operations without their own use the default
+        self._slow_call_ns = int(slow_call_threshold * 1e9)
+        self._slow_call_ns_by_operation = {
+            operation: int(threshold * 1e9)
+            for operation, threshold in (slow_call_thresholds or {}).items()
+        }
+        self._slow_log = slow_log
+
+        # Called with the error when the runtime drops the connection;
+        # not called for disconnect()
+        self.connection_lost_callback: Optional[Callable[[Exception], None]] = None
+        self._closing = False
+
+        # Every HEARTBEAT reply feeds the RTT statistics; the monitor only
+        # runs when an interval is configured
+        self._rtt = RTTStats()
+        self._heartbeat_monitor: Optional[HeartbeatMonitor] = None
+        if heartbeat_interval:
+            self._heartbeat_monitor = HeartbeatMonitor(
+                self.heartbeat,
+                self.abort,
+                self._rtt,
+                interval=heartbeat_interval,
+                timeout=heartbeat_timeout,
+                max_missed=heartbeat_max_missed,
+            )
+
+    async def connect(self) -> None:
+        """Open the transport and perform the HANDSHAKE exchange"""
+        self._closing = False
+        await self._transport.open(self._on_frame, self._on_close)
+
+        handshake_flags = MessageFlags.NONE
+        if self._compression_requested:
+            handshake_flags |= MessageFlags.COMPRESSED
+
+        try:
+            reply = await self._request(
+                MessageTypes.HANDSHAKE,
+                self._builder.handshake_payload(
+                    flags=handshake_flags,
+                    codecs=[codec.codec_id for codec in self._codec_preference],
+                ),
+                MessageFlags.RELIABLE,
+            )
+            if reply.header.type != MessageTypes.HANDSHAKE:
+                raise ProtocolError(f"Unexpected handshake reply type: {reply.header.type}")
+
+            handshake = self._parser.parse_handshake(reply.payload)
+            self._remote_version = handshake.version
+            if self._remote_version != PROTOCOL_VERSION:
+                raise ProtocolError(
+                    f"Protocol version mismatch: expected {PROTOCOL_VERSION}, "
+                    f"got {self._remote_version}"
+                )
+
+            self._set_codec(self._select_codec(handshake.codecs))
+            self._compress_outbound = (
+                self._compression_requested
+                and bool(handshake.flags & MessageFlags.COMPRESSED)
+            )
+        except BaseException:
+            await self.disconnect()
+            raise
+
+        self._set_state(StateTransitions.CONNECTED)
+        if self._heartbeat_monitor is not None:
+            self._heartbeat_monitor.start()
+        logger.info(
+            f"Handshake complete with {self.endpoint} "
+            f"(codec={self._builder.codec.name}, compression={self._compress_outbound})"
+        )
+
+    def _select_codec(self, chosen_ids) -> Codec:
+        """Validate the codec the runtime picked from our offer"""
+        if not chosen_ids:
+            return self._codec_registry.get("json")
+
+        codec = self._codec_registry.by_id(chosen_ids[0])
+        if codec not in self._codec_preference:
+            raise ProtocolError(f"Runtime selected a codec that was not offered: {codec.name}")
+        return codec
+
+    def _set_state(self, state: str) -> None:
+        """Move to a protocol state, counting and logging the transition"""
+        if state != self._state:
+            if self._metrics is not None:
+                self._metrics.record_state_transition(self._state, state)
+            if self._events is not None:
+                self._events.record(EventKinds.STATE, f"{self._state}->{state}")
+        self._state = state
+
+    def _call_completed(self,
+                        operation: str,
+                        started: int,
+                        trace: Optional[CallTrace] = None) -> None:
+        """Record a reply's latency, logging an event and trace when it was slow"""
+        elapsed = time.perf_counter_ns() - started
+        if self._metrics is not None:
+            self._metrics.record_response(operation, elapsed)
+        threshold = self._slow_call_ns_by_operation.get(operation, self._slow_call_ns)
+        if elapsed >= threshold:
+            if self._events is not None:
+                self._events.record(EventKinds.SLOW, operation, duration=elapsed / 1e9)
+            if trace is not None:
+                self._slow_log.record(
+                    operation, trace, threshold / 1e9, self.codec, self.endpoint
+                )
+
+    def _call_failed(self,
+                     operation: str,
+                     error: Exception,
+                     trace: Optional[CallTrace] = None) -> None:
+        """Record an ERROR reply, timeout or connection failure"""
+        if self._metrics is not None:
+            self._metrics.record_error(operation)
+        if self._events is not None:
+            self._events.record(EventKinds.ERROR, operation, str(error) or type(error).__name__)
+        # A call that failed slowly, typically a timeout, is traced too
+        if trace is not None:
+            threshold = self._slow_call_ns_by_operation.get(operation, self._slow_call_ns)
+            if time.perf_counter_ns() - trace.started >= threshold:
+                self._slow_log.record(
+                    operation, trace, threshold / 1e9, self.codec, self.endpoint, error
+                )
+
+    def _trace(self) -> Optional[CallTrace]:
+        """Start tracing a call when slow calls are logged"""
+        return CallTrace() if self._slow_log is not None else None
+
+    def _encode(self, data: Any) -> bytes:
+        """Encode a payload with the connection codec, timing it for metrics"""
+        if self._metrics is None:
+            return self._builder.encode_payload(data)
+        started = time.perf_counter_ns()
+        payload = self._builder.encode_payload(data)
+        self._metrics.record_encode(time.perf_counter_ns() - started)
+        return payload
+
+    def _set_codec(self, codec: Codec) -> None:
+        """Switch payload encoding for both directions"""
+        self._builder.codec = codec
+        self._parser.codec = codec
+
+    async def authenticate(self, credentials: Dict[str, Any]) -> AuthResult:
+        """Send credentials in an AUTH message"""
+        payload = self._encode(credentials)
+        reply = await self._request(
+            MessageTypes.AUTH, payload, MessageFlags.RELIABLE, decode=True
+        )
+
+        if reply.header.type == MessageTypes.ERROR:
+            return AuthResult(False, reply.payload)
+
+        self._set_state(StateTransitions.AUTHENTICATED)
+        return AuthResult(True, reply.payload)
+
+    async def execute_operation(self,
+                                operation: str,
+                                params: Dict[str, Any],
+                                flags: int = MessageFlags.NONE) -> Any:
+        """
+        Send a COMMAND and wait for its RESPONSE
+
+        Args:
+            operation: Operation identifier
+            params: Operation parameters
+            flags: MessageFlags bit set, e.g. RELIABLE
+
+        Returns:
+            Any: Decoded RESPONSE payload
+        """
+        trace = self._trace()
+        payload = self._encode({"operation": operation, "params": params})
+        if self._metrics is not None:
+            self._metrics.record_request(operation)
+        started = time.perf_counter_ns()
+        if trace is not None:
+            trace.encoded = started
+        try:
+            reply = await self._request(
+                MessageTypes.COMMAND, payload, flags, decode=True, trace=trace
+            )
+        except Exception as e:
+            self._call_failed(operation, e, trace)
+            raise
+        result = reply.payload
+
+        if reply.header.type == MessageTypes.ERROR:
+            self._call_completed(operation, started)
+            error = ProtocolError(f"Operation '{operation}' failed: {result}")
+            self._call_failed(operation, error, trace)
+            raise error
+
+        self._call_completed(operation, started, trace)
+
+        return result
+
+    async def execute_many(self,
+                           operations: Iterable[Tuple[str, Dict[str, Any]]],
+                           return_exceptions: bool = False,
+                           flags: int = MessageFlags.NONE) -> List[Any]:
+        """
+        Send several COMMANDs in one write and collect their RESPONSEs
+
+        Frames are written back-to-back with a single writelines call and
+        results are returned in submission order.
+
+        Args:
+            operations: (operation, params) pairs
+            return_exceptions: Return ProtocolError instances in place of
+                failed results instead of raising the first one
+            flags: MessageFlags bit set applied to every COMMAND
+
+        Returns:
+            List[Any]: Decoded RESPONSE payloads
+        """
+        operations = list(operations)
+        requests = [
+            (MessageTypes.COMMAND,
+             self._encode({"operation": operation, "params": params}),
+             flags)
+            for operation, params in operations
+        ]
+
+        if self._metrics is not None:
+            for operation, _params in operations:
+                self._metrics.record_request(operation)
+        started = time.perf_counter_ns()
+        try:
+            replies = await self._request_many(requests, decode=True)
+        except Exception as e:
+            for operation, _params in operations:
+                self._call_failed(operation, e)
+            raise
+
+        # Every operation in the batch is charged the batch round trip
+        results = []
+        for (operation, _params), reply in zip(operations, replies):
+            result = reply.payload
+            self._call_completed(operation, started)
+            if reply.header.type == MessageTypes.ERROR:
+                error = ProtocolError(f"Operation '{operation}' failed: {result}")
+                self._call_failed(operation, error)
+                if not return_exceptions:
+                    raise error
+                result = error
+            results.append(result)
+        return results
+
+    async def execute_raw(self, payload: bytes, flags: int = MessageFlags.NONE) -> bytes:
+        """
+        Send a pre-encoded COMMAND payload and return the raw reply payload
+
+        Neither direction goes through the connection codec, for callers
+        that already hold serialized bytes. Metrics and events account
+        them under RAW_OPERATION.
+        """
+        trace = self._trace()
+        if self._metrics is not None:
+            self._metrics.record_request(RAW_OPERATION)
+        started = time.perf_counter_ns()
+        if trace is not None:
+            trace.encoded = started
+        try:
+            reply = await self._request(MessageTypes.COMMAND, payload, flags, trace=trace)
+        except Exception as e:
+            self._call_failed(RAW_OPERATION, e, trace)
+            raise
+
+        if reply.header.type == MessageTypes.ERROR:
+            self._call_completed(RAW_OPERATION, started)
+            error = ProtocolError(f"Raw command failed: {reply.payload!r}")
+            self._call_failed(RAW_OPERATION, error, trace)
+            raise error
+
+        self._call_completed(RAW_OPERATION, started, trace)
+
+        return reply.payload
+
+    async def heartbeat(self) -> float:
+        """
+        Send a HEARTBEAT and wait for the runtime to echo it
+
+        Returns:
+            float: Round-trip time in seconds
+        """
+        sent = time.perf_counter_ns()
+        reply = await self._request(MessageTypes.HEARTBEAT, HEARTBEAT_STRUCT.pack(sent))
+
+        if reply.header.type != MessageTypes.HEARTBEAT:
+            raise ProtocolError(f"Unexpected heartbeat reply type: {reply.header.type}")
+
+        rtt = (time.perf_counter_ns() - sent) / 1e9
+        self._rtt.record(rtt)
+        return rtt
+
+    async def get_runtime_info(self) -> Dict[str, Any]:
+        """Get information learned from the HANDSHAKE exchange"""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "protocol_version": self._remote_version,
+            "codec": self._builder.codec.name,
+            "compression": self._compressor.algorithm if self._compress_outbound else None,
+            "state": self._state,
+        }
+
+    async def disconnect(self) -> None:
+        """Fail outstanding requests and close the transport"""
+        self._closing = True
+        if self._heartbeat_monitor is not None:
+            await self._heartbeat_monitor.stop()
+        self._fail_pending(PyPolyCallRuntimeError("Connection closed"))
+        await self._transport.close()
+        self._set_state(StateTransitions.INIT)
+
+    async def _request(self,
+                       msg_type: int,
+                       payload: bytes,
+                       flags: int = MessageFlags.NONE,
+                       decode: bool = False,
+                       trace: Optional[CallTrace] = None) -> Message:
+        """
+        Send one frame and wait for the reply carrying the same sequence number
+
+        Any number of callers may be waiting at once, bounded by
+        max_in_flight; frames go out back-to-back without waiting for
+        earlier replies.
+
+        Args:
+            msg_type: MessageTypes value
+            payload: Encoded payload
+            flags: MessageFlags bit set
+            decode: Decode the reply payload with the connection codec;
+                otherwise the reply carries the payload bytes
+            trace: Stamped with the sequence number, frame sizes and the
+                time each phase of the exchange completes
+        """
+        if not self._transport.is_open:
+            raise PyPolyCallRuntimeError("Not connected to polycall.exe runtime")
+
+        async with self._in_flight:
+            sequence = self._builder.next_sequence()
+            future = asyncio.get_running_loop().create_future()
+            self._pending[sequence] = (future, decode, trace)
+            if trace is not None:
+                trace.acquired = time.perf_counter_ns()
+                trace.sequence = sequence
+
+            try:
+                payload, flags = self._compress(payload, flags)
+                frame = self._builder.build(msg_type, payload, flags, sequence)
+                if self._metrics is not None:
+                    self._metrics.record_frame_sent(len(frame))
+                async with self._write_lock:
+                    await self._transport.send(frame)
+                if trace is not None:
+                    trace.written = time.perf_counter_ns()
+                    trace.request_bytes = len(frame)
+                return await asyncio.wait_for(future, self.timeout)
+            finally:
+                self._pending.pop(sequence, None)
+
+    async def _request_many(self,
+                            requests: List[Tuple[int, bytes, int]],
+                            decode: bool = False) -> List[Message]:
+        """
+        Send (type, payload, flags) requests as back-to-back frames
+
+        Batches larger than max_in_flight go out in max_in_flight chunks.
+        """
+        replies: List[Message] = []
+        for start in range(0, len(requests), self._max_in_flight):
+            replies.extend(await self._request_chunk(
+                requests[start:start + self._max_in_flight], decode
+            ))
+        return replies
+
+    async def _request_chunk(self,
+                             requests: List[Tuple[int, bytes, int]],
+                             decode: bool) -> List[Message]:
+        """Send one chunk of at most max_in_flight requests in a single write"""
+        if not self._transport.is_open:
+            raise PyPolyCallRuntimeError("Not connected to polycall.exe runtime")
+
+        acquired = 0
+        sequences = []
+        try:
+            for _ in requests:
+                await self._in_flight.acquire()
+                acquired += 1
+
+            loop = asyncio.get_running_loop()
+            frames = []
+            futures = []
+            for msg_type, payload, flags in requests:
+                payload, flags = self._compress(payload, flags)
+                sequence = self._builder.next_sequence()
+                future = loop.create_future()
+                self._pending[sequence] = (future, decode, None)
+                sequences.append(sequence)
+                futures.append(future)
+                frames.append(self._builder.build(msg_type, payload, flags, sequence))
+
+            if self._metrics is not None:
+                for frame in frames:
+                    self._metrics.record_frame_sent(len(frame))
+            async with self._write_lock:
+                await self._transport.send_many(frames)
+            replies = await asyncio.wait_for(
+                asyncio.gather(*futures, return_exceptions=True), self.timeout
+            )
+            for reply in replies:
+                if isinstance(reply, BaseException):
+                    raise reply
+            return replies
+        finally:
+            for sequence in sequences:
+                self._pending.pop(sequence, None)
+            for _ in range(acquired):
+                self._in_flight.release()
+
+    def _on_frame(self, header: MessageHeader, payload) -> None:
+        """
+        Route an inbound frame to the request future waiting on it
+
+        Runs synchronously from the transport while payload still points
+        into the receive buffer, so the reply is decompressed, decoded or
+        copied here before it is handed over.
+        """
+        if self._metrics is not None:
+            self._metrics.record_frame_received(HEADER_SIZE + header.payload_length)
+        entry = self._pending.get(header.sequence)
+        if entry is None:
+            logger.debug(
+                f"Dropping unsolicited frame type={header.type} "
+                f"sequence={header.sequence}"
+            )
+            return
+
+        future, decode, trace = entry
+        if future.done():
+            return
+        if trace is not None:
+            trace.received = time.perf_counter_ns()
+            trace.reply_bytes = HEADER_SIZE + header.payload_length
+
+        try:
+            if header.flags & MessageFlags.COMPRESSED:
+                payload = self._compressor.decompress(
+                    payload, self._parser.max_payload_size
+                )
+            if decode:
+                if self._metrics is None:
+                    payload = self._parser.decode_payload(payload)
+                else:
+                    started = time.perf_counter_ns()
+                    payload = self._parser.decode_payload(payload)
+                    self._metrics.record_decode(time.perf_counter_ns() - started)
+            elif isinstance(payload, memoryview):
+                payload = payload.tobytes()
+            if trace is not None:
+                trace.decoded = time.perf_counter_ns()
+        except ProtocolError as e:
+            future.set_exception(e)
+            return
+        except Exception as e:
+            future.set_exception(ProtocolError(
+                f"Unable to decode {self._parser.codec.name} payload: {e}"
+            ))
+            return
+
+        future.set_result(Message(header, payload))
+
+    def _on_close(self, error: Optional[Exception]) -> None:
+        """Fail outstanding requests when the runtime ends the connection"""
+        if self._heartbeat_monitor is not None:
+            self._heartbeat_monitor.cancel()
+        if self._closing:
+            return
+
+        if error is None:
+            error = PyPolyCallRuntimeError("Connection closed by polycall.exe runtime")
+        elif not isinstance(error, PyPolyCallRuntimeError):
+            error = PyPolyCallRuntimeError(f"Connection lost: {error}")
+
+        logger.error(f"Connection to {self.endpoint} lost: {error}")
+        if self._events is not None:
+            self._events.record(EventKinds.ERROR, "connection", str(error))
+        self._fail_pending(error)
+        self._set_state(StateTransitions.INIT)
+
+        if self.connection_lost_callback is not None:
+            self.connection_lost_callback(error)
+
+    def abort(self, error: Exception) -> None:
+        """
+        Drop the connection as if the runtime had closed it
+
+        Outstanding requests fail with error and connection_lost_callback
+        is notified, so a supervising binding reconnects.
+        """
+        logger.warning(f"Aborting connection to {self.endpoint}: {error}")
+        self._transport.abort(error)
+
+    def _compress(self, payload: bytes, flags: int) -> Tuple[bytes, int]:
+        """Apply outbound compression, setting the COMPRESSED flag when used"""
+        if self._compress_outbound:
+            payload, compressed = self._compressor.compress(payload)
+            if compressed:
+                flags |= MessageFlags.COMPRESSED
+        return payload, flags
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Propagate a connection failure to every waiting request"""
+        for future, _decode, _trace in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    @property
+    def is_connected(self) -> bool:
+        """Check transport status"""
+        return self._transport.is_open
+
+    @property
+    def codec(self) -> str:
+        """Name of the negotiated payload codec"""
+        return self._builder.codec.name
+
+    @property
+    def compression_stats(self) -> Dict[str, Any]:
+        """Compression ratio, frame counts and CPU time"""
+        return self._compressor.stats.as_dict()
+
+    @property
+    def rtt(self) -> Optional[float]:
+        """Smoothed HEARTBEAT round-trip time in seconds, None before any sample"""
+        return self._rtt.srtt
+
+    @property
+    def rtt_stats(self) -> Dict[str, Any]:
+        """HEARTBEAT round-trip statistics and histogram"""
+        return self._rtt.as_dict()
+
+    @property
+    def metrics(self) -> Optional[MetricsCollector]:
+        """Collector fed by this handler, None when metrics are off"""
+        return self._metrics
+
+    @property
+    def events(self) -> Optional[EventTracker]:
+        """Event log fed by this handler, None when events are off"""
+        return self._events
+
+    @property
+    def slow_log(self) -> Optional[SlowOperationLog]:
+        """Slow call log fed by this handler, None when it is off"""
+        return self._slow_log
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests awaiting a reply"""
+        return len(self._pending)
+
+    @property
+    def state(self) -> str:
+        """Current protocol state"""
+        return self._state
+
+__all__ = ["ProtocolHandler", "AuthResult", "RAW_OPERATION", "DEFAULT_SLOW_CALL_THRESHOLD"]
@@ -0,0 +1,190 @@
+"""
+Protocol Heartbeat
+Round-trip time tracking and half-open connection detection
+"""
+
+import asyncio
+import logging
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ...exceptions import RuntimeError as PyPolyCallRuntimeError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_INTERVAL = 10.0
+DEFAULT_HEARTBEAT_TIMEOUT = 5.0
+DEFAULT_HEARTBEAT_MAX_MISSED = 2
+
+# Histogram buckets: bucket i counts RTTs below 2**i microseconds, the
+# last bucket everything slower (about 17 minutes and up)
+_HISTOGRAM_BUCKETS = 31
+
+class RTTStats:
+    """
+    HEARTBEAT round-trip statistics
+
+    Smoothed RTT and variance follow the TCP estimator (RFC 6298,
+    alpha 1/8, beta 1/4); the histogram uses power-of-two microsecond
+    buckets.
+    """
+
+    __slots__ = ("samples", "missed", "last", "srtt", "rttvar", "min", "max", "buckets")
+
+    ALPHA = 0.125
+    BETA = 0.25
+
+    def __init__(self):
+        self.samples = 0
+        self.missed = 0
+        self.last: Optional[float] = None
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.buckets: List[int] = [0] * _HISTOGRAM_BUCKETS
+
+    def record(self, rtt: float) -> None:
+        """Add one round-trip sample in seconds"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+            self.min = self.max = rtt
+        else:
+            self.rttvar += self.BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.ALPHA * (rtt - self.srtt)
+            self.min = min(self.min, rtt)
+            self.max = max(self.max, rtt)
+
+        self.samples += 1
+        self.last = rtt
+        micros = int(rtt * 1e6)
+        self.buckets[min(micros.bit_length(), _HISTOGRAM_BUCKETS - 1)] += 1
+
+    def record_miss(self) -> None:
+        """Count a HEARTBEAT that went unanswered"""
+        self.missed += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.samples:
+            return None
+
+        rank = max(1, math.ceil(fraction * self.samples))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min((1 << index) / 1e6, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Snapshot of the statistics"""
+        return {
+            "samples": self.samples,
+            "missed": self.missed,
+            "last": self.last,
+            "srtt": self.srtt,
+            "rttvar": self.rttvar,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "histogram": {
+                f"lt_{1 << index}us": count
+                for index, count in enumerate(self.buckets) if count
+            },
+        }
+
+class HeartbeatMonitor:
+    """
+    Background HEARTBEAT prober for one connection
+
+    Sends a HEARTBEAT every interval seconds. A reply slower than timeout
+    counts as a miss; max_missed consecutive misses mean the socket is
+    half-open and on_dead is called with the error.
+    """
+
+    def __init__(self,
+                 probe: Callable[[], Awaitable[float]],
+                 on_dead: Callable[[Exception], None],
+                 stats: RTTStats,
+                 interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+                 timeout: float = DEFAULT_HEARTBEAT_TIMEOUT,
+                 max_missed: int = DEFAULT_HEARTBEAT_MAX_MISSED):
+        """
+        Initialize Heartbeat Monitor
+
+        Args:
+            probe: Coroutine function sending one HEARTBEAT
+            on_dead: Called once when the connection is declared dead
+            stats: RTTStats receiving misses; probe records successes
+            interval: Seconds between HEARTBEATs
+            timeout: Seconds to wait for each reply
+            max_missed: Consecutive misses before the connection is dead
+        """
+        self._probe = probe
+        self._on_dead = on_dead
+        self.stats = stats
+        self.interval = interval
+        self.timeout = timeout
+        self.max_missed = max_missed
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start probing in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def cancel(self) -> None:
+        """Stop probing without waiting"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def stop(self) -> None:
+        """Stop probing and wait for the task to finish"""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        missed = 0
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.wait_for(self._probe(), self.timeout)
+                missed = 0
+                continue
+            except PyPolyCallRuntimeError:
+                # Connection already gone; the close path reports it
+                return
+            except asyncio.TimeoutError:
+                logger.warning(f"HEARTBEAT not answered within {self.timeout}s")
+            except Exception as e:
+                logger.warning(f"HEARTBEAT failed: {e}")
+
+            self.stats.record_miss()
+            missed += 1
+            if missed >= self.max_missed:
+                self._on_dead(PyPolyCallRuntimeError(
+                    f"Connection half-open: {missed} HEARTBEATs unanswered"
+                ))
+                return
+
+    @property
+    def running(self) -> bool:
+        """Check whether the probe task is active"""
+        return self._task is not None and not self._task.done()
+
+__all__ = [
+    "RTTStats",
+    "HeartbeatMonitor",
+    "DEFAULT_HEARTBEAT_INTERVAL",
+    "DEFAULT_HEARTBEAT_TIMEOUT",
+    "DEFAULT_HEARTBEAT_MAX_MISSED",
+]
@@ -0,0 +1,339 @@
+"""
+Protocol Messages
+Frame construction and parsing for polycall_message_header_t
+"""
+
+import struct
+from typing import Any, Callable, Iterable, NamedTuple, Optional, Tuple
+
+from ...exceptions import ProtocolError
+from .checksum import calculate_checksum
+from .codecs import Codec, default_registry
+from .constants import (
+    DEFAULT_MAX_PAYLOAD_SIZE,
+    MAX_SEQUENCE_NUMBER,
+    PROTOCOL_MAGIC,
+    PROTOCOL_VERSION,
+    MessageFlags,
+    MessageTypes,
+)
+
+# polycall_message_header_t: uint8 version, uint8 type, uint16 flags,
+# uint32 sequence, uint32 payload_length, uint32 checksum (16 bytes, no padding)
+HEADER_STRUCT = struct.Struct("<BBHIII")
+HEADER_SIZE = HEADER_STRUCT.size
+
+# Handshake payload from polycall_protocol_start_handshake:
+# uint32 magic, uint8 version, (1 byte padding), uint16 flags
+HANDSHAKE_STRUCT = struct.Struct("<IBxH")
+
+# Optional handshake extension: uint8 count followed by count codec ids,
+# in preference order. A reply carries the single codec chosen by the
+# runtime; runtimes that omit it are treated as JSON-only.
+
+# Heartbeat payload: uint64 sender timestamp in nanoseconds, echoed back
+HEARTBEAT_STRUCT = struct.Struct("<Q")
+
+# Receive buffer size; frames larger than this are read into a dedicated
+# buffer sized to the payload instead
+DEFAULT_RECEIVE_BUFFER_SIZE = 256 * 1024
+
+_MIN_MESSAGE_TYPE = MessageTypes.HANDSHAKE
+_MAX_MESSAGE_TYPE = max(
+    value for name, value in vars(MessageTypes).items() if name.isupper()
+)
+
+class MessageHeader(NamedTuple):
+    """Decoded polycall_message_header_t"""
+    version: int
+    type: int
+    flags: int
+    sequence: int
+    payload_length: int
+    checksum: int
+
+class Handshake(NamedTuple):
+    """Decoded HANDSHAKE payload"""
+    version: int
+    flags: int
+    codecs: Tuple[int, ...]
+
+class Message(NamedTuple):
+    """A complete frame received from the runtime"""
+    header: MessageHeader
+    payload: Any
+
+class MessageBuilder:
+    """
+    Frame builder for outbound protocol messages
+
+    Owns the sequence counter for a connection, starting at 1 like
+    polycall_protocol_init, and the payload codec agreed at HANDSHAKE.
+    """
+
+    def __init__(self, codec: Optional[Codec] = None):
+        self._next_sequence = 1
+        self.codec = codec or default_registry.get("json")
+
+    def next_sequence(self) -> int:
+        """Allocate the next sequence number, wrapping after MAX_SEQUENCE_NUMBER"""
+        sequence = self._next_sequence
+        self._next_sequence = 1 if sequence >= MAX_SEQUENCE_NUMBER else sequence + 1
+        return sequence
+
+    def build(self,
+              msg_type: int,
+              payload: bytes,
+              flags: int = MessageFlags.NONE,
+              sequence: Optional[int] = None) -> bytes:
+        """
+        Build a complete frame
+
+        Args:
+            msg_type: MessageTypes value
+            payload: Encoded payload bytes
+            flags: MessageFlags bit set
+            sequence: Explicit sequence number; allocated when omitted
+
+        Returns:
+            bytes: Header followed by payload
+        """
+        if sequence is None:
+            sequence = self.next_sequence()
+
+        header = HEADER_STRUCT.pack(
+            PROTOCOL_VERSION,
+            msg_type,
+            flags,
+            sequence,
+            len(payload),
+            calculate_checksum(payload),
+        )
+        return header + payload
+
+    @staticmethod
+    def handshake_payload(flags: int = MessageFlags.NONE,
+                          codecs: Iterable[int] = ()) -> bytes:
+        """
+        Encode the HANDSHAKE payload
+
+        Args:
+            flags: Handshake flags
+            codecs: Codec ids to advertise, most preferred first
+        """
+        codecs = bytes(codecs)
+        payload = HANDSHAKE_STRUCT.pack(PROTOCOL_MAGIC, PROTOCOL_VERSION, flags)
+        if codecs:
+            payload += bytes((len(codecs),)) + codecs
+        return payload
+
+    def encode_payload(self, data: Any) -> bytes:
+        """Serialize a payload object with the connection codec"""
+        return self.codec.encode(data)
+
+class MessageParser:
+    """
+    Frame parser for inbound protocol messages
+
+    Applies the same header validation as validate_message_header in
+    polycall_protocol.c, plus a payload size bound.
+    """
+
+    def __init__(self,
+                 max_payload_size: int = DEFAULT_MAX_PAYLOAD_SIZE,
+                 codec: Optional[Codec] = None):
+        self.max_payload_size = max_payload_size
+        self.codec = codec or default_registry.get("json")
+
+    def parse_header(self, data, offset: int = 0) -> MessageHeader:
+        """
+        Decode and validate a frame header
+
+        Args:
+            data: Buffer holding at least HEADER_SIZE bytes after offset
+            offset: Position of the header within data
+
+        Returns:
+            MessageHeader: Decoded header
+        """
+        header = MessageHeader._make(HEADER_STRUCT.unpack_from(data, offset))
+
+        if header.version != PROTOCOL_VERSION:
+            raise ProtocolError(
+                f"Protocol version mismatch: expected {PROTOCOL_VERSION}, got {header.version}"
+            )
+
+        if not _MIN_MESSAGE_TYPE <= header.type <= _MAX_MESSAGE_TYPE:
+            raise ProtocolError(f"Invalid message type: {header.type}")
+
+        if header.payload_length > self.max_payload_size:
+            raise ProtocolError(f"Message too large: {header.payload_length} bytes")
+
+        return header
+
+    def verify(self, header: MessageHeader, payload) -> None:
+        """Raise ProtocolError when the payload does not match its checksum"""
+        if calculate_checksum(payload) != header.checksum:
+            raise ProtocolError("Checksum verification failed")
+
+    @staticmethod
+    def parse_handshake(payload) -> Handshake:
+        """
+        Decode a HANDSHAKE payload
+
+        Returns:
+            Handshake: Protocol version, flags and advertised codec ids
+        """
+        if len(payload) < HANDSHAKE_STRUCT.size:
+            raise ProtocolError("Truncated handshake payload")
+
+        magic, version, flags = HANDSHAKE_STRUCT.unpack_from(payload)
+        if magic != PROTOCOL_MAGIC:
+            raise ProtocolError(f"Invalid handshake magic: {magic:#x}")
+
+        codecs: Tuple[int, ...] = ()
+        extension = bytes(payload[HANDSHAKE_STRUCT.size:])
+        if extension:
+            count = extension[0]
+            if len(extension) < 1 + count:
+                raise ProtocolError("Truncated handshake codec list")
+            codecs = tuple(extension[1:1 + count])
+
+        return Handshake(version, flags, codecs)
+
+    def decode_payload(self, payload) -> Any:
+        """Deserialize a payload object with the connection codec"""
+        if not payload:
+            return None
+        return self.codec.decode(payload)
+
+class FrameBuffer:
+    """
+    Incremental frame reassembly over a reusable receive buffer
+
+    Implements the get_buffer / buffer_updated half of
+    asyncio.BufferedProtocol: the event loop reads straight into the
+    buffer, partial frames stay in place until the rest arrives, and any
+    number of coalesced frames are delivered from a single read.
+
+    Payloads are handed to the frame callback as memoryviews into the
+    buffer. They are only valid for the duration of the callback, so the
+    callback must decode or copy whatever it keeps.
+    """
+
+    def __init__(self,
+                 parser: Optional[MessageParser] = None,
+                 size: int = DEFAULT_RECEIVE_BUFFER_SIZE):
+        if size < HEADER_SIZE:
+            raise ValueError(f"Receive buffer must hold at least one header ({HEADER_SIZE} bytes)")
+
+        self.parser = parser or MessageParser()
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        # Unconsumed bytes live in _buffer[_start:_end]
+        self._start = 0
+        self._end = 0
+
+        # Frame whose payload does not fit the receive buffer
+        self._large_header: Optional[MessageHeader] = None
+        self._large: Optional[bytearray] = None
+        self._large_filled = 0
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """Writable region for the next read"""
+        if self._large is not None:
+            return memoryview(self._large)[self._large_filled:]
+
+        if self._end == len(self._buffer):
+            self._compact()
+        return self._view[self._end:]
+
+    def buffer_updated(self,
+                       nbytes: int,
+                       on_frame: Callable[[MessageHeader, Any], None]) -> None:
+        """
+        Account for nbytes written into the last get_buffer region and
+        deliver every frame that is now complete
+
+        Args:
+            nbytes: Bytes written by the read
+            on_frame: Called with (header, payload) per complete frame
+        """
+        if self._large is not None:
+            self._large_filled += nbytes
+            if self._large_filled < len(self._large):
+                return
+            header, payload = self._large_header, self._large
+            self._large_header = self._large = None
+            self.parser.verify(header, payload)
+            on_frame(header, payload)
+            return
+
+        self._end += nbytes
+        self._drain(on_frame)
+
+    def _drain(self, on_frame: Callable[[MessageHeader, Any], None]) -> None:
+        """Deliver complete frames from the receive buffer"""
+        parser = self.parser
+        view = self._view
+        start = self._start
+        end = self._end
+
+        while end - start >= HEADER_SIZE:
+            header = parser.parse_header(self._buffer, start)
+            payload_start = start + HEADER_SIZE
+            frame_end = payload_start + header.payload_length
+
+            if frame_end > end:
+                if HEADER_SIZE + header.payload_length > len(self._buffer):
+                    # Move what has arrived of an oversized payload into its
+                    # own buffer and read the remainder directly into it
+                    received = end - payload_start
+                    self._large_header = header
+                    self._large = bytearray(header.payload_length)
+                    self._large[:received] = view[payload_start:end]
+                    self._large_filled = received
+                    start = end
+                break
+
+            payload = view[payload_start:frame_end]
+            try:
+                parser.verify(header, payload)
+                on_frame(header, payload)
+            finally:
+                payload.release()
+            start = frame_end
+
+        if start == end:
+            start = end = 0
+        self._start = start
+        self._end = end
+
+    def _compact(self) -> None:
+        """Move a trailing partial frame to the front of the buffer"""
+        pending = self._end - self._start
+        if self._start:
+            self._buffer[:pending] = self._view[self._start:self._end].tobytes()
+        self._start = 0
+        self._end = pending
+
+    @property
+    def buffered(self) -> int:
+        """Bytes received but not yet delivered as frames"""
+        if self._large is not None:
+            return HEADER_SIZE + self._large_filled
+        return self._end - self._start
+
+__all__ = [
+    "HEADER_STRUCT",
+    "HEADER_SIZE",
+    "HANDSHAKE_STRUCT",
+    "HEARTBEAT_STRUCT",
+    "DEFAULT_RECEIVE_BUFFER_SIZE",
+    "MessageHeader",
+    "Handshake",
+    "Message",
+    "MessageBuilder",
+    "MessageParser",
+    "FrameBuffer",
+]
@@ -0,0 +1,632 @@
+"""
+Shared Memory Transport
+Framed polycall messages over shared-memory rings for a co-located runtime
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+from ...exceptions import ProtocolError, RuntimeError as PyPolyCallRuntimeError
+from .messages import DEFAULT_RECEIVE_BUFFER_SIZE, FrameBuffer, MessageParser
+from .transport import CloseCallback, FrameCallback
+
+logger = logging.getLogger(__name__)
+
+# Bytes per direction
+DEFAULT_RING_SIZE = 1024 * 1024
+
+# Ring control block, one cache line: uint64 head, tail, consumer
+# sleeping flag, producer waiting flag
+_CONTROL_SIZE = 64
+_HEAD, _TAIL, _SLEEPING, _WAITING = range(4)
+
+# Connection hello on the doorbell socket: magic, version, client pid,
+# ring size, segment name length; followed by the segment name. The
+# server answers with _ACK once it has mapped the segment, or _NACK when
+# the rings do not fit it.
+_HELLO_STRUCT = struct.Struct("<4sIIQH")
+_HELLO_MAGIC = b"PCSM"
+_HELLO_VERSION = 1
+_ACK = b"\x01"
+_NACK = b"\x00"
+
+# Doorbells are skipped while the peer is busy draining. A consumer that
+# just drained data re-checks its ring once after this long, in case a
+# write landed as it went to sleep
+_POLL_INTERVAL = 0.05
+# The sleeping flag and the ring head are a store-then-load handshake
+# through shared memory with no fence between them, so a doorbell can
+# still be missed; idle channels re-check at this slower rate instead of
+# hanging
+_IDLE_POLL_INTERVAL = 1.0
+
+class ShmRing:
+    """
+    Single-producer single-consumer byte ring in a shared buffer
+
+    Head and tail are free-running byte counters, each written only by
+    its owner through aligned 64-bit stores.
+    """
+
+    def __init__(self, buffer: memoryview, size: int):
+        self.size = size
+        self._control = buffer[:_CONTROL_SIZE].cast("Q")
+        self._data = buffer[_CONTROL_SIZE:_CONTROL_SIZE + size]
+
+    @staticmethod
+    def footprint(size: int) -> int:
+        """Shared bytes needed for a ring of the given size"""
+        return _CONTROL_SIZE + size
+
+    def write(self, data: memoryview) -> int:
+        """Copy as much of data as fits, returning the byte count"""
+        control = self._control
+        head = control[_HEAD]
+        count = min(self.size - (head - control[_TAIL]), len(data))
+        if count:
+            position = head % self.size
+            first = min(count, self.size - position)
+            self._data[position:position + first] = data[:first]
+            if first < count:
+                self._data[:count - first] = data[first:count]
+            control[_HEAD] = head + count
+        return count
+
+    def readable(self) -> List[memoryview]:
+        """Views over the unread bytes, two when they wrap around"""
+        control = self._control
+        tail = control[_TAIL]
+        count = control[_HEAD] - tail
+        if not count:
+            return []
+
+        position = tail % self.size
+        first = min(count, self.size - position)
+        views = [self._data[position:position + first]]
+        if first < count:
+            views.append(self._data[:count - first])
+        return views
+
+    def consume(self, count: int) -> None:
+        """Mark count bytes as read"""
+        self._control[_TAIL] += count
+
+    @property
+    def available(self) -> int:
+        """Unread bytes"""
+        return self._control[_HEAD] - self._control[_TAIL]
+
+    @property
+    def free(self) -> int:
+        """Bytes that can be written without waiting"""
+        return self.size - self.available
+
+    @property
+    def sleeping(self) -> bool:
+        return bool(self._control[_SLEEPING])
+
+    @sleeping.setter
+    def sleeping(self, value: bool) -> None:
+        self._control[_SLEEPING] = int(value)
+
+    @property
+    def waiting(self) -> bool:
+        return bool(self._control[_WAITING])
+
+    @waiting.setter
+    def waiting(self, value: bool) -> None:
+        self._control[_WAITING] = int(value)
+
+    def release(self) -> None:
+        """Drop the views into the shared buffer"""
+        self._control.release()
+        self._data.release()
+
+class ShmChannel:
+    """
+    One end of a shared-memory connection
+
+    Bytes travel through two ShmRings; the socket only carries doorbell
+    wake-ups, rung when the peer is asleep, and its end-of-file marks
+    the connection as closed.
+    """
+
+    def __init__(self,
+                 sock: socket.socket,
+                 segment: shared_memory.SharedMemory,
+                 ring_size: int,
+                 client: bool,
+                 on_data: Callable[[memoryview], None],
+                 on_close: CloseCallback):
+        """
+        Initialize Shared Memory Channel
+
+        Args:
+            sock: Connected non-blocking doorbell socket
+            segment: Segment holding both rings
+            ring_size: Bytes per ring
+            client: Whether this end created the segment; the client
+                writes the first ring and reads the second
+            on_data: Called with views over inbound bytes, valid only
+                during the call
+            on_close: Called once with the error, if any, when the
+                channel closes
+        """
+        self._sock = sock
+        self._segment = segment
+        first = segment.buf[:ShmRing.footprint(ring_size)]
+        second = segment.buf[ShmRing.footprint(ring_size):2 * ShmRing.footprint(ring_size)]
+        rings = (ShmRing(first, ring_size), ShmRing(second, ring_size))
+        first.release()
+        second.release()
+        self._tx, self._rx = rings if client else rings[::-1]
+
+        self._on_data = on_data
+        self._on_close = on_close
+        self._loop = asyncio.get_running_loop()
+        self._write_lock = asyncio.Lock()
+        self._space = asyncio.Event()
+        self._poll_handle: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+        self._draining = False
+        self._error: Optional[Exception] = None
+
+    @staticmethod
+    def segment_size(ring_size: int) -> int:
+        """Shared bytes needed for a channel"""
+        return 2 * ShmRing.footprint(ring_size)
+
+    def start(self) -> None:
+        """Begin delivering inbound bytes"""
+        self._loop.add_reader(self._sock.fileno(), self._on_doorbell)
+        self._wake()
+
+    def _on_doorbell(self) -> None:
+        try:
+            data = self._sock.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._shutdown(e)
+            return
+        if not data:
+            self._shutdown(None)
+            return
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._poll_handle is not None:
+            self._poll_handle.cancel()
+            self._poll_handle = None
+        if self._closed:
+            return
+
+        self._space.set()
+        delay = _POLL_INTERVAL if self._drain() else _IDLE_POLL_INTERVAL
+        if not self._closed:
+            self._poll_handle = self._loop.call_later(delay, self._wake)
+
+    def _drain(self) -> bool:
+        """Deliver inbound bytes until the ring stays empty, returning whether any arrived"""
+        rx = self._rx
+        rx.sleeping = False
+        self._draining = True
+        delivered = False
+        try:
+            while not self._closed:
+                views = rx.readable()
+                if not views:
+                    # Publish sleeping before the final check so a write that
+                    # lands now either is seen here or rings the doorbell
+                    rx.sleeping = True
+                    if not rx.available:
+                        return delivered
+                    rx.sleeping = False
+                    continue
+
+                delivered = True
+
+                consumed = 0
+                try:
+                    for view in views:
+                        self._on_data(view)
+                        consumed += len(view)
+                        if self._closed:
+                            return delivered
+                finally:
+                    for view in views:
+                        view.release()
+                rx.consume(consumed)
+
+                if rx.waiting:
+                    rx.waiting = False
+                    self._ring()
+            return delivered
+        finally:
+            self._draining = False
+            if self._closed:
+                self._release()
+
+    def _ring(self) -> None:
+        try:
+            self._sock.send(b"\x00")
+        except (BlockingIOError, InterruptedError):
+            # A full socket buffer already holds plenty of wake-ups
+            pass
+        except OSError as e:
+            self._shutdown(e)
+
+    async def write(self, chunks: Iterable) -> None:
+        """Copy chunks into the outbound ring, waiting for space as needed"""
+        async with self._write_lock:
+            tx = self._tx
+            for chunk in chunks:
+                view = memoryview(chunk).cast("B")
+                while view:
+                    if self._closed:
+                        raise self._closed_error()
+
+                    written = tx.write(view)
+                    view = view[written:]
+                    if not view:
+                        break
+
+                    # Ring full: ask the consumer to ring back once it reads
+                    self._space.clear()
+                    tx.waiting = True
+                    if tx.free:
+                        continue
+                    self._ring_if_sleeping()
+                    try:
+                        await asyncio.wait_for(self._space.wait(), _POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+
+            self._ring_if_sleeping()
+            if self._closed:
+                raise self._closed_error()
+
+    def _ring_if_sleeping(self) -> None:
+        if self._tx.sleeping and not self._closed:
+            self._ring()
+
+    def _closed_error(self) -> PyPolyCallRuntimeError:
+        if self._error is not None:
+            return PyPolyCallRuntimeError(f"Connection lost: {self._error}")
+        return PyPolyCallRuntimeError("Connection closed by polycall.exe runtime")
+
+    def close(self) -> None:
+        """Close the channel; on_close is called with no error"""
+        self._shutdown(None)
+
+    def abort(self, error: Exception) -> None:
+        """Close the channel, reporting error to on_close"""
+        self._shutdown(error)
+
+    def _shutdown(self, error: Optional[Exception]) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._error = error
+
+        if self._poll_handle is not None:
+            self._poll_handle.cancel()
+            self._poll_handle = None
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._space.set()
+
+        if not self._draining:
+            self._release()
+        self._on_close(error)
+
+    def _release(self) -> None:
+        """Unmap the segment once no view into it is in use"""
+        if self._segment is not None:
+            self._tx.release()
+            self._rx.release()
+            self._segment.close()
+            self._segment = None
+
+    @property
+    def is_closing(self) -> bool:
+        """Check whether the channel has been closed"""
+        return self._closed
+
+async def _recv_exactly(loop: asyncio.AbstractEventLoop, sock: socket.socket, count: int) -> bytes:
+    data = b""
+    while len(data) < count:
+        chunk = await loop.sock_recv(sock, count - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed during shared memory hello")
+        data += chunk
+    return data
+
+class ShmTransport:
+    """
+    Shared-memory transport to a co-located polycall.exe runtime
+
+    Same interface as StreamTransport. The client creates the segment,
+    passes its name over the UNIX socket at path and unlinks it once the
+    runtime has mapped it, so nothing is left behind if either side dies.
+    """
+
+    def __init__(self,
+                 path: str,
+                 parser: Optional[MessageParser] = None,
+                 connect_timeout: Optional[float] = None,
+                 receive_buffer_size: int = DEFAULT_RECEIVE_BUFFER_SIZE,
+                 ring_size: int = DEFAULT_RING_SIZE):
+        self.path = path
+        self.parser = parser or MessageParser()
+        self.connect_timeout = connect_timeout
+        self.receive_buffer_size = receive_buffer_size
+        self.ring_size = ring_size
+
+        self._channel: Optional[ShmChannel] = None
+        self._closed: Optional[asyncio.Future] = None
+
+    async def open(self, on_frame: FrameCallback, on_close: CloseCallback) -> None:
+        """
+        Open the connection
+
+        Args:
+            on_frame: Called with (header, payload) for every verified frame
+            on_close: Called once with the error, if any, when the connection ends
+        """
+        loop = asyncio.get_running_loop()
+        frames = FrameBuffer(self.parser, self.receive_buffer_size)
+        closed = loop.create_future()
+
+        def on_data(view: memoryview) -> None:
+            try:
+                while view:
+                    buffer = frames.get_buffer(len(view))
+                    count = min(len(buffer), len(view))
+                    buffer[:count] = view[:count]
+                    frames.buffer_updated(count, on_frame)
+                    view = view[count:]
+            except ProtocolError as e:
+                # A corrupt stream cannot be resynchronised
+                channel.abort(e)
+
+        def on_channel_close(error: Optional[Exception]) -> None:
+            if error is None and frames.buffered and not closed.done():
+                error = PyPolyCallRuntimeError("Connection closed by polycall.exe runtime mid-frame")
+            if not closed.done():
+                closed.set_result(None)
+            on_close(error)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        segment = shared_memory.SharedMemory(
+            create=True, size=ShmChannel.segment_size(self.ring_size)
+        )
+        try:
+            await asyncio.wait_for(
+                self._hello(loop, sock, segment), timeout=self.connect_timeout
+            )
+            channel = ShmChannel(sock, segment, self.ring_size, True, on_data, on_channel_close)
+        except BaseException as e:
+            sock.close()
+            segment.close()
+            if isinstance(e, (OSError, asyncio.TimeoutError)):
+                raise PyPolyCallRuntimeError(f"Unable to reach polycall.exe at {self.path}: {e}")
+            raise
+        finally:
+            segment.unlink()
+
+        self._channel = channel
+        self._closed = closed
+        channel.start()
+        logger.debug(f"Shared memory transport open to {self.path}")
+
+    async def _hello(self,
+                     loop: asyncio.AbstractEventLoop,
+                     sock: socket.socket,
+                     segment: shared_memory.SharedMemory) -> None:
+        name = segment.name.encode("utf-8")
+        await loop.sock_connect(sock, self.path)
+        await loop.sock_sendall(sock, _HELLO_STRUCT.pack(
+            _HELLO_MAGIC, _HELLO_VERSION, os.getpid(), self.ring_size, len(name)
+        ) + name)
+        if await _recv_exactly(loop, sock, len(_ACK)) != _ACK:
+            raise ConnectionError("Runtime rejected the shared memory hello")
+
+    async def send(self, frame: bytes) -> None:
+        """Write a complete frame into the outbound ring"""
+        if not self.is_open:
+            raise PyPolyCallRuntimeError("Transport is not open")
+        await self._channel.write((frame,))
+
+    async def send_many(self, frames: List[bytes]) -> None:
+        """Write several frames back-to-back with a single doorbell"""
+        if not self.is_open:
+            raise PyPolyCallRuntimeError("Transport is not open")
+        await self._channel.write(frames)
+
+    async def close(self) -> None:
+        """Close the connection"""
+        channel, self._channel = self._channel, None
+        if channel is None:
+            return
+        channel.close()
+        await self._closed
+        logger.debug(f"Shared memory transport closed to {self.path}")
+
+    def abort(self, error: Exception) -> None:
+        """Drop the connection; on_close receives error"""
+        if self.is_open:
+            self._channel.abort(error)
+
+    @property
+    def is_open(self) -> bool:
+        """Check whether the connection is usable"""
+        return self._channel is not None and not self._channel.is_closing
+
+class ShmStreamWriter:
+    """asyncio.StreamWriter look-alike over the runtime end of a channel"""
+
+    def __init__(self, channel: ShmChannel):
+        self._channel = channel
+        self._pending: List[bytes] = []
+
+    @property
+    def transport(self) -> "ShmStreamWriter":
+        return self
+
+    def write(self, data: bytes) -> None:
+        self._pending.append(data)
+
+    def writelines(self, data: Iterable[bytes]) -> None:
+        self._pending.extend(data)
+
+    async def drain(self) -> None:
+        pending, self._pending = self._pending, []
+        await self._channel.write(pending)
+
+    def is_closing(self) -> bool:
+        return self._channel.is_closing
+
+    def close(self) -> None:
+        self._channel.close()
+
+    def abort(self) -> None:
+        self._channel.close()
+
+    async def wait_closed(self) -> None:
+        pass
+
+class ShmServer:
+    """
+    Runtime end of the shared-memory transport
+
+    Accepts connections on a UNIX socket and hands each one to
+    client_connected_cb as an (asyncio.StreamReader, ShmStreamWriter)
+    pair, like asyncio.start_unix_server, so a Python-hosted runtime or
+    bridge can serve ShmTransport clients.
+    """
+
+    def __init__(self,
+                 client_connected_cb: Callable[..., Awaitable[None]],
+                 path: str):
+        self.path = path
+        self._client_connected_cb = client_connected_cb
+        self._sock: Optional[socket.socket] = None
+        self._accept_task: Optional[asyncio.Task] = None
+        self._clients = set()
+
+    async def start(self) -> None:
+        """Listen on path"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.setblocking(False)
+        self._sock.bind(self.path)
+        self._sock.listen()
+        self._accept_task = asyncio.ensure_future(self._accept())
+
+    async def _accept(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            sock, _ = await loop.sock_accept(self._sock)
+            sock.setblocking(False)
+            task = asyncio.ensure_future(self._serve(loop, sock))
+            self._clients.add(task)
+            task.add_done_callback(self._clients.discard)
+
+    async def _serve(self, loop: asyncio.AbstractEventLoop, sock: socket.socket) -> None:
+        try:
+            magic, version, pid, ring_size, name_length = _HELLO_STRUCT.unpack(
+                await _recv_exactly(loop, sock, _HELLO_STRUCT.size)
+            )
+            if magic != _HELLO_MAGIC or version != _HELLO_VERSION:
+                raise ConnectionError("Invalid shared memory hello")
+            name = (await _recv_exactly(loop, sock, name_length)).decode("utf-8")
+            segment = shared_memory.SharedMemory(name=name)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            logger.warning(f"Rejected shared memory client: {e}")
+            sock.close()
+            return
+
+        if pid != os.getpid():
+            # The creating client owns the segment; stop this process's
+            # resource tracker from unlinking it again at exit. SharedMemory
+            # registers the POSIX name, which keeps the leading "/" that
+            # .name strips
+            resource_tracker.unregister("/" + segment.name, "shared_memory")
+
+        if ring_size <= 0 or ShmChannel.segment_size(ring_size) > segment.size:
+            logger.warning(
+                f"Rejected shared memory client: {ring_size}-byte rings do not fit "
+                f"a {segment.size}-byte segment"
+            )
+            segment.close()
+            try:
+                await loop.sock_sendall(sock, _NACK)
+            except OSError:
+                pass
+            sock.close()
+            return
+
+        reader = asyncio.StreamReader()
+
+        def on_data(view: memoryview) -> None:
+            reader.feed_data(bytes(view))
+
+        def on_close(error: Optional[Exception]) -> None:
+            if error is None:
+                reader.feed_eof()
+            else:
+                reader.set_exception(ConnectionError(str(error)))
+
+        channel = ShmChannel(sock, segment, ring_size, False, on_data, on_close)
+        writer = ShmStreamWriter(channel)
+        try:
+            await loop.sock_sendall(sock, _ACK)
+        except OSError:
+            channel.close()
+            return
+        channel.start()
+
+        try:
+            await self._client_connected_cb(reader, writer)
+        finally:
+            channel.close()
+
+    def close(self) -> None:
+        """Stop accepting connections"""
+        if self._accept_task is not None:
+            self._accept_task.cancel()
+            self._accept_task = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    async def wait_closed(self) -> None:
+        """Wait for connection handlers to finish"""
+        if self._clients:
+            await asyncio.gather(*self._clients, return_exceptions=True)
+
+async def start_shm_server(client_connected_cb: Callable[..., Awaitable[None]],
+                           path: str) -> ShmServer:
+    """Start a ShmServer listening on path"""
+    server = ShmServer(client_connected_cb, path)
+    await server.start()
+    return server
+
+__all__ = [
+    "ShmTransport",
+    "ShmServer",
+    "ShmChannel",
+    "ShmRing",
+    "start_shm_server",
+    "DEFAULT_RING_SIZE",
+]
@@ -0,0 +1,215 @@
+"""
+Protocol Transport
+asyncio buffered-protocol transport carrying framed polycall messages
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional
+
+from ...exceptions import ProtocolError, RuntimeError as PyPolyCallRuntimeError
+from .messages import (
+    DEFAULT_RECEIVE_BUFFER_SIZE,
+    FrameBuffer,
+    MessageHeader,
+    MessageParser,
+)
+
+logger = logging.getLogger(__name__)
+
+FrameCallback = Callable[[MessageHeader, Any], None]
+CloseCallback = Callable[[Optional[Exception]], None]
+
+# Host prefix selecting a Unix domain socket, e.g. unix:///run/polycall.sock
+UNIX_SCHEME = "unix://"
+
+def unix_socket_path(host: str) -> Optional[str]:
+    """Socket path of a unix:// host, None for TCP hosts"""
+    if host.startswith(UNIX_SCHEME):
+        return host[len(UNIX_SCHEME):]
+    return None
+
+class FrameProtocol(asyncio.BufferedProtocol):
+    """
+    BufferedProtocol feeding socket reads into a FrameBuffer
+
+    The event loop reads with recv_into directly into the FrameBuffer, so
+    frames are delivered without intermediate bytes objects.
+    """
+
+    def __init__(self,
+                 frames: FrameBuffer,
+                 on_frame: FrameCallback,
+                 on_close: CloseCallback):
+        self._frames = frames
+        self._on_frame = on_frame
+        self._on_close = on_close
+        self._error: Optional[Exception] = None
+
+        self.transport: Optional[asyncio.Transport] = None
+        self._closed = asyncio.get_running_loop().create_future()
+        self._paused = False
+        self._drain_waiters: List[asyncio.Future] = []
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._frames.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        try:
+            self._frames.buffer_updated(nbytes, self._on_frame)
+        except ProtocolError as e:
+            # A corrupt stream cannot be resynchronised
+            self._error = e
+            self.transport.abort()
+
+    def eof_received(self) -> bool:
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        error = self._error or exc
+        if error is None and self._frames.buffered:
+            error = PyPolyCallRuntimeError("Connection closed by polycall.exe runtime mid-frame")
+
+        self._wake_drain_waiters(error)
+        if not self._closed.done():
+            self._closed.set_result(None)
+        self._on_close(error)
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        self._wake_drain_waiters(None)
+
+    async def drain(self) -> None:
+        """Wait until the transport write buffer is below its high-water mark"""
+        if self.transport.is_closing():
+            # Let connection_lost run before reporting the failure
+            await asyncio.sleep(0)
+            raise PyPolyCallRuntimeError("Connection closed by polycall.exe runtime")
+        if not self._paused:
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    async def wait_closed(self) -> None:
+        await self._closed
+
+    def abort(self, error: Exception) -> None:
+        """Drop the connection immediately, reporting error to on_close"""
+        self._error = error
+        self.transport.abort()
+
+    def _wake_drain_waiters(self, error: Optional[Exception]) -> None:
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if error is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(PyPolyCallRuntimeError(f"Connection lost: {error}"))
+
+class StreamTransport:
+    """
+    Framed stream transport to the polycall.exe runtime
+
+    Connects over TCP, or over a Unix domain socket when host is a
+    unix:// URL; the port is then ignored. Each frame is a fixed-size
+    header followed by payload_length bytes.
+    Inbound frames are pushed to the on_frame callback as they complete;
+    payloads are memoryviews valid only for the duration of the callback.
+    """
+
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 parser: Optional[MessageParser] = None,
+                 connect_timeout: Optional[float] = None,
+                 receive_buffer_size: int = DEFAULT_RECEIVE_BUFFER_SIZE):
+        self.host = host
+        self.port = port
+        self.parser = parser or MessageParser()
+        self.connect_timeout = connect_timeout
+        self.receive_buffer_size = receive_buffer_size
+        self.path = unix_socket_path(host)
+        self.endpoint = host if self.path else f"{host}:{port}"
+
+        self._transport: Optional[asyncio.Transport] = None
+        self._protocol: Optional[FrameProtocol] = None
+
+    async def open(self, on_frame: FrameCallback, on_close: CloseCallback) -> None:
+        """
+        Open the connection
+
+        Args:
+            on_frame: Called with (header, payload) for every verified frame
+            on_close: Called once with the error, if any, when the connection ends
+        """
+        loop = asyncio.get_running_loop()
+        frames = FrameBuffer(self.parser, self.receive_buffer_size)
+
+        def factory() -> FrameProtocol:
+            return FrameProtocol(frames, on_frame, on_close)
+
+        if self.path:
+            connection = loop.create_unix_connection(factory, self.path)
+        else:
+            connection = loop.create_connection(factory, self.host, self.port)
+
+        try:
+            self._transport, self._protocol = await asyncio.wait_for(
+                connection, timeout=self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise PyPolyCallRuntimeError(
+                f"Unable to reach polycall.exe at {self.endpoint}: {e}"
+            )
+
+        logger.debug(f"Transport open to {self.endpoint}")
+
+    async def send(self, frame: bytes) -> None:
+        """Write a complete frame and wait for the buffer to drain"""
+        if not self.is_open:
+            raise PyPolyCallRuntimeError("Transport is not open")
+
+        self._transport.write(frame)
+        await self._protocol.drain()
+
+    async def send_many(self, frames: List[bytes]) -> None:
+        """Write several frames back-to-back with a single writelines/drain"""
+        if not self.is_open:
+            raise PyPolyCallRuntimeError("Transport is not open")
+
+        self._transport.writelines(frames)
+        await self._protocol.drain()
+
+    async def close(self) -> None:
+        """Close the connection"""
+        transport, self._transport = self._transport, None
+        protocol, self._protocol = self._protocol, None
+        if transport is None:
+            return
+
+        transport.close()
+        await protocol.wait_closed()
+
+        logger.debug(f"Transport closed to {self.endpoint}")
+
+    def abort(self, error: Exception) -> None:
+        """Drop the connection without flushing; on_close receives error"""
+        if self.is_open:
+            self._protocol.abort(error)
+
+    @property
+    def is_open(self) -> bool:
+        """Check whether the connection is usable"""
+        return self._transport is not None and not self._transport.is_closing()
+
+__all__ = ["StreamTransport", "FrameProtocol", "unix_socket_path", "UNIX_SCHEME"]
@@ -0,0 +1,10 @@
+"""
+Core State Layer
+State Management and Machine Implementation
+"""
+
+from .machine import ProtocolStates, StateMachine, protocol_state_machine
+from .manager import StateManager
+from .snapshot import StateSnapshotFile
+
+__all__ = ["StateMachine", "StateManager", "StateSnapshotFile", "ProtocolStates", "protocol_state_machine"]
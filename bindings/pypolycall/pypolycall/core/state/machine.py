@@ -0,0 +1,518 @@
+"""
+State Machine
+Table-driven states and transitions returning polycall_sm_status_t codes
+"""
+
+import logging
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ...exceptions import StateError
+from ..ffi.native import MAX_NAME_LENGTH, MAX_STATES, MAX_TRANSITIONS, SMStatus
+
+logger = logging.getLogger(__name__)
+
+StateRef = Union[int, str]
+StateAction = Callable[["StateMachine"], None]
+Guard = Callable[["State", "State"], bool]
+
+# Marks an empty cell of the transition table
+NO_TRANSITION = -1
+
+_SUCCESS = SMStatus.SUCCESS
+_INVALID_STATE = SMStatus.ERROR_INVALID_STATE
+_INVALID_TRANSITION = SMStatus.ERROR_INVALID_TRANSITION
+_STATE_LOCKED = SMStatus.ERROR_STATE_LOCKED
+
+class ProtocolStates:
+    """polycall_protocol_state_t"""
+    INIT = 0
+    HANDSHAKE = 1
+    AUTH = 2
+    READY = 3
+    ERROR = 4
+    CLOSED = 5
+
+    NAMES = ("INIT", "HANDSHAKE", "AUTH", "READY", "ERROR", "CLOSED")
+
+# polycall_protocol.c transition names and the moves they allow
+PROTOCOL_TRANSITIONS = (
+    ("to_handshake", "INIT", "HANDSHAKE"),
+    ("to_auth", "HANDSHAKE", "AUTH"),
+    ("to_ready", "AUTH", "READY"),
+    ("to_error", "READY", "ERROR"),
+    ("to_closed", "READY", "CLOSED"),
+    ("to_closed", "ERROR", "CLOSED"),
+)
+
+class State:
+    """PolyCall_State definition"""
+
+    __slots__ = ("name", "id", "on_enter", "on_exit", "is_final")
+
+    def __init__(self,
+                 name: str,
+                 state_id: int,
+                 on_enter: Optional[StateAction] = None,
+                 on_exit: Optional[StateAction] = None,
+                 is_final: bool = False):
+        self.name = name
+        self.id = state_id
+        self.on_enter = on_enter
+        self.on_exit = on_exit
+        self.is_final = is_final
+
+    def __repr__(self) -> str:
+        return f"State({self.name!r}, id={self.id})"
+
+class Transition:
+    """PolyCall_Transition definition"""
+
+    __slots__ = ("name", "id", "from_state", "to_state", "action", "guard")
+
+    def __init__(self,
+                 name: str,
+                 transition_id: int,
+                 from_state: int,
+                 to_state: int,
+                 action: Optional[StateAction] = None,
+                 guard: Optional[Guard] = None):
+        self.name = name
+        self.id = transition_id
+        self.from_state = from_state
+        self.to_state = to_state
+        self.action = action
+        self.guard = guard
+
+    def __repr__(self) -> str:
+        return f"Transition({self.name!r}, {self.from_state}->{self.to_state})"
+
+class TransitionTable:
+    """
+    Compiled lookup structures of a machine definition
+
+    moves[from * num_states + to] and named[name][from] hold a transition
+    id or NO_TRANSITION, so every lookup is two index operations. hooked
+    flags transitions with a guard or callbacks to run; the rest complete
+    without touching their definitions. Guard results are cached per
+    transition id. Tables are only built, never edited, and are shared by
+    copies of a machine.
+    """
+
+    __slots__ = ("num_states", "sources", "targets", "moves", "named", "hooked", "guard_results")
+
+    def __init__(self, states: Sequence[State], transitions: Sequence[Transition]):
+        count = len(states)
+        self.num_states = count
+        self.sources = array("h", (transition.from_state for transition in transitions))
+        self.targets = array("h", (transition.to_state for transition in transitions))
+        self.moves = array("h", [NO_TRANSITION]) * (count * count)
+        self.named: Dict[str, array] = {}
+        self.hooked = bytearray(
+            any((transition.guard, transition.action,
+                 states[transition.from_state].on_exit, states[transition.to_state].on_enter))
+            for transition in transitions
+        )
+        for transition in transitions:
+            # The first transition added between two states wins, as in
+            # the C library's linear scan
+            cell = transition.from_state * count + transition.to_state
+            if self.moves[cell] == NO_TRANSITION:
+                self.moves[cell] = transition.id
+            row = self.named.get(transition.name)
+            if row is None:
+                row = self.named[transition.name] = array("h", [NO_TRANSITION]) * count
+            row[transition.from_state] = transition.id
+        self.guard_results: List[Optional[bool]] = [None] * len(transitions)
+
+class StateMachine:
+    """
+    Python PolyCall_StateMachine
+
+    RESPONSIBILITIES:
+    - Hold states and named transitions with on_enter / on_exit / action
+      callbacks, guards and per-state locks
+    - Compile definitions into an integer transition table on first use,
+      so can_transition and transition are O(1) instead of the C
+      library's scans over transitions[POLYCALL_MAX_TRANSITIONS]
+    - Evaluate each guard once and reuse its result until
+      invalidate_guards(), unless cache_guards is off
+    - Report outcomes as polycall_sm_status_t codes (SMStatus)
+
+    The execute_* and try_* methods return SMStatus codes for hot paths;
+    the other transition methods raise StateError carrying the code.
+    Unlike the C library, a transition only runs from its source state.
+    """
+
+    def __init__(self, cache_guards: bool = True):
+        """
+        Initialize State Machine
+
+        Args:
+            cache_guards: Reuse a guard's first result for its transition;
+                turn off for guards that depend on outside conditions
+        """
+        self.cache_guards = cache_guards
+        self._states: List[State] = []
+        self._state_ids: Dict[str, int] = {}
+        self._transitions: List[Transition] = []
+        self._table: Optional[TransitionTable] = None
+
+        self._current = 0
+        self._locked = bytearray()
+        self._versions = array("I")
+        self._failed_transitions = 0
+        self._transition_count = 0
+
+    @classmethod
+    def build(cls,
+              states: Iterable[str],
+              transitions: Iterable[Tuple[str, StateRef, StateRef]],
+              final_states: Iterable[str] = (),
+              cache_guards: bool = True) -> "StateMachine":
+        """
+        Create a machine from state names and (name, from, to) transitions
+
+        Args:
+            states: State names in id order; the first is the initial state
+            transitions: (name, from_state, to_state) triples
+            final_states: Names of terminal states
+            cache_guards: See StateMachine
+
+        Returns:
+            StateMachine: Machine in its initial state
+        """
+        machine = cls(cache_guards)
+        final_states = set(final_states)
+        for name in states:
+            machine.add_state(name, is_final=name in final_states)
+        for name, from_state, to_state in transitions:
+            machine.add_transition(name, from_state, to_state)
+        return machine
+
+    def _fail(self, status: int, message: str) -> None:
+        raise StateError(f"{message}: {SMStatus.name_of(status)}", status)
+
+    def _compiled(self) -> TransitionTable:
+        table = self._table
+        if table is None:
+            table = self._table = TransitionTable(self._states, self._transitions)
+        return table
+
+    def _state_id(self, state: StateRef) -> Optional[int]:
+        if isinstance(state, int):
+            return state if 0 <= state < len(self._states) else None
+        return self._state_ids.get(state)
+
+    def _resolve(self, state: StateRef) -> int:
+        state_id = self._state_id(state)
+        if state_id is None:
+            self._fail(SMStatus.ERROR_INVALID_STATE, f"Unknown state {state!r}")
+        return state_id
+
+    def add_state(self,
+                  name: str,
+                  on_enter: Optional[StateAction] = None,
+                  on_exit: Optional[StateAction] = None,
+                  is_final: bool = False) -> int:
+        """
+        Add a state
+
+        Args:
+            name: State name, unique within the machine
+            on_enter: Called with the machine after entering the state
+            on_exit: Called with the machine before leaving the state
+            is_final: Whether the state is terminal
+
+        Returns:
+            int: State id; the first state added is the initial state
+        """
+        if len(self._states) >= MAX_STATES:
+            self._fail(SMStatus.ERROR_MAX_STATES_REACHED, f"Cannot add state {name!r}")
+        if not name or len(name.encode("utf-8")) >= MAX_NAME_LENGTH:
+            self._fail(SMStatus.ERROR_INVALID_STATE, f"State name must be 1-{MAX_NAME_LENGTH - 1} bytes")
+        if name in self._state_ids:
+            self._fail(SMStatus.ERROR_INVALID_STATE, f"Duplicate state {name!r}")
+
+        state = State(name, len(self._states), on_enter, on_exit, is_final)
+        self._states.append(state)
+        self._state_ids[name] = state.id
+        self._locked.append(0)
+        self._versions.append(1)
+        self._table = None
+        return state.id
+
+    def add_transition(self,
+                       name: str,
+                       from_state: StateRef,
+                       to_state: StateRef,
+                       action: Optional[StateAction] = None,
+                       guard: Optional[Guard] = None) -> int:
+        """
+        Add a named transition between two states
+
+        A name may be reused for moves from different source states, as
+        polycall_protocol.c does with to_closed.
+
+        Args:
+            name: Transition name
+            from_state: Source state, by id or name
+            to_state: Target state, by id or name
+            action: Called with the machine between on_exit and on_enter
+            guard: Called with the source and target State; the
+                transition is refused when it returns False
+
+        Returns:
+            int: Transition id
+        """
+        if len(self._transitions) >= MAX_TRANSITIONS:
+            self._fail(SMStatus.ERROR_MAX_TRANSITIONS_REACHED, f"Cannot add transition {name!r}")
+        if not name or len(name.encode("utf-8")) >= MAX_NAME_LENGTH:
+            self._fail(
+                SMStatus.ERROR_INVALID_TRANSITION,
+                f"Transition name must be 1-{MAX_NAME_LENGTH - 1} bytes",
+            )
+        source = self._resolve(from_state)
+        target = self._resolve(to_state)
+        if any(transition.name == name and transition.from_state == source
+               for transition in self._transitions):
+            self._fail(
+                SMStatus.ERROR_INVALID_TRANSITION,
+                f"Duplicate transition {name!r} from {self._states[source].name!r}",
+            )
+
+        transition = Transition(name, len(self._transitions), source, target, action, guard)
+        self._transitions.append(transition)
+        self._table = None
+        return transition.id
+
+    def _guard_allows(self, table: TransitionTable, index: int) -> bool:
+        transition = self._transitions[index]
+        if transition.guard is None:
+            return True
+        if self.cache_guards:
+            allowed = table.guard_results[index]
+            if allowed is None:
+                allowed = table.guard_results[index] = bool(transition.guard(
+                    self._states[transition.from_state], self._states[transition.to_state]
+                ))
+            return allowed
+        return bool(transition.guard(
+            self._states[transition.from_state], self._states[transition.to_state]
+        ))
+
+    def _check(self, table: TransitionTable, index: int) -> int:
+        if index == NO_TRANSITION:
+            return _INVALID_TRANSITION
+        if self._locked[table.sources[index]] or self._locked[table.targets[index]]:
+            return _STATE_LOCKED
+        if table.hooked[index] and not self._guard_allows(table, index):
+            return _INVALID_TRANSITION
+        return _SUCCESS
+
+    def _execute(self, table: TransitionTable, index: int) -> int:
+        if index == NO_TRANSITION:
+            self._failed_transitions += 1
+            return _INVALID_TRANSITION
+        target = table.targets[index]
+        if self._locked[table.sources[index]] or self._locked[target]:
+            return _STATE_LOCKED
+
+        if table.hooked[index]:
+            if not self._guard_allows(table, index):
+                self._failed_transitions += 1
+                return _INVALID_TRANSITION
+            transition = self._transitions[index]
+            source_state = self._states[transition.from_state]
+            target_state = self._states[target]
+            if source_state.on_exit is not None:
+                source_state.on_exit(self)
+            if transition.action is not None:
+                transition.action(self)
+            if target_state.on_enter is not None:
+                target_state.on_enter(self)
+
+        self._current = target
+        self._versions[target] += 1
+        self._transition_count += 1
+        return _SUCCESS
+
+    def _named_index(self, table: TransitionTable, name: str) -> int:
+        row = table.named.get(name)
+        if row is None:
+            return NO_TRANSITION
+        return row[self._current]
+
+    def _target_index(self, table: TransitionTable, state: StateRef) -> Optional[int]:
+        target = self._state_ids.get(state)
+        if target is None:
+            target = self._state_id(state)
+            if target is None:
+                return None
+        return table.moves[self._current * table.num_states + target]
+
+    def execute_transition(self, name: str) -> int:
+        """
+        Run a named transition from the current state
+
+        Returns:
+            int: SMStatus.SUCCESS, ERROR_INVALID_TRANSITION when no such
+                transition leaves the current state or its guard refuses,
+                ERROR_STATE_LOCKED when either state is locked
+        """
+        table = self._table or self._compiled()
+        return self._execute(table, self._named_index(table, name))
+
+    def try_transition_to(self, state: StateRef) -> int:
+        """
+        Move to a state through whichever transition connects it
+
+        Returns:
+            int: As execute_transition, or ERROR_INVALID_STATE for an
+                unknown state
+        """
+        table = self._table or self._compiled()
+        index = self._target_index(table, state)
+        if index is None:
+            return _INVALID_STATE
+        return self._execute(table, index)
+
+    def transition(self, name: str) -> str:
+        """Run a named transition, returning the new state; raises StateError"""
+        status = self.execute_transition(name)
+        if status != SMStatus.SUCCESS:
+            self._fail(status, f"Transition {name!r} from {self.current_state!r} failed")
+        return self._states[self._current].name
+
+    def transition_to(self, state: StateRef) -> str:
+        """Move to a state, returning its name; raises StateError"""
+        status = self.try_transition_to(state)
+        if status != SMStatus.SUCCESS:
+            self._fail(status, f"Transition {self.current_state!r} -> {state!r} failed")
+        return self._states[self._current].name
+
+    def can_transition(self, name: str) -> bool:
+        """Whether a named transition would succeed from the current state"""
+        table = self._compiled()
+        return self._check(table, self._named_index(table, name)) == SMStatus.SUCCESS
+
+    def can_transition_to(self, state: StateRef) -> bool:
+        """Whether the current state may move to a state"""
+        table = self._compiled()
+        index = self._target_index(table, state)
+        return index is not None and self._check(table, index) == SMStatus.SUCCESS
+
+    def lock_state(self, state: StateRef) -> None:
+        """Block transitions into and out of a state"""
+        self._locked[self._resolve(state)] = 1
+
+    def unlock_state(self, state: StateRef) -> None:
+        """Allow transitions into and out of a state again"""
+        self._locked[self._resolve(state)] = 0
+
+    def is_locked(self, state: StateRef) -> bool:
+        """Whether a state is locked"""
+        return bool(self._locked[self._resolve(state)])
+
+    def get_state_version(self, state: StateRef) -> int:
+        """Version counter of a state, bumped each time it is entered"""
+        return self._versions[self._resolve(state)]
+
+    def invalidate_guards(self) -> None:
+        """Evaluate every guard again on its next use"""
+        table = self._compiled()
+        table.guard_results[:] = [None] * len(table.guard_results)
+
+    def reset(self, state: StateRef = 0) -> None:
+        """Jump to a state without running callbacks or guards"""
+        self._current = self._resolve(state)
+
+    def restore_transition_count(self, count: int) -> None:
+        """Set the completed transition count, e.g. when restoring a session"""
+        if count < 0:
+            raise ValueError(f"Transition count must not be negative: {count}")
+        self._transition_count = count
+
+    def copy(self) -> "StateMachine":
+        """
+        New machine with the same definition, in its initial state
+
+        The compiled table and cached guard results are shared; locks,
+        versions and counters are not. Definitions added to either
+        machine afterwards only affect that machine.
+        """
+        machine = type(self)(self.cache_guards)
+        machine._states = list(self._states)
+        machine._state_ids = dict(self._state_ids)
+        machine._transitions = list(self._transitions)
+        machine._table = self._compiled()
+        machine._locked = bytearray(len(self._states))
+        machine._versions = array("I", [1]) * len(self._states)
+        return machine
+
+    @property
+    def current_state(self) -> Optional[str]:
+        """Name of the current state, None before any state is added"""
+        if not self._states:
+            return None
+        return self._states[self._current].name
+
+    @property
+    def current_state_id(self) -> int:
+        """Id of the current state"""
+        return self._current
+
+    @property
+    def is_final(self) -> bool:
+        """Whether the current state is terminal"""
+        return bool(self._states) and self._states[self._current].is_final
+
+    @property
+    def states(self) -> List[str]:
+        """State names in id order"""
+        return [state.name for state in self._states]
+
+    @property
+    def transitions(self) -> List[Tuple[str, str, str]]:
+        """(name, from_state, to_state) in id order"""
+        return [
+            (transition.name,
+             self._states[transition.from_state].name,
+             self._states[transition.to_state].name)
+            for transition in self._transitions
+        ]
+
+    @property
+    def failed_transitions(self) -> int:
+        """Transitions rejected as invalid or by a guard"""
+        return self._failed_transitions
+
+    @property
+    def transition_count(self) -> int:
+        """Transitions completed"""
+        return self._transition_count
+
+def protocol_state_machine(cache_guards: bool = True) -> StateMachine:
+    """
+    Machine of the polycall_protocol_state_t lifecycle
+
+    State ids equal the C enum values and transitions carry the
+    POLYCALL_TRANSITION_TO_* names.
+    """
+    return StateMachine.build(
+        ProtocolStates.NAMES,
+        PROTOCOL_TRANSITIONS,
+        final_states=("CLOSED",),
+        cache_guards=cache_guards,
+    )
+
+__all__ = [
+    "StateMachine",
+    "State",
+    "Transition",
+    "TransitionTable",
+    "ProtocolStates",
+    "PROTOCOL_TRANSITIONS",
+    "NO_TRANSITION",
+    "protocol_state_machine",
+]
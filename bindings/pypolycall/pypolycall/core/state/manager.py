@@ -0,0 +1,443 @@
+"""
+State Manager
+Per-session state machines sharing one compiled transition table
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ...exceptions import StateError
+from ..ffi.native import SMStatus
+from ..telemetry.metrics import MetricsCollector
+from .machine import StateMachine, StateRef, protocol_state_machine
+from .snapshot import (
+    DEFAULT_SNAPSHOT_CAPACITY,
+    StateSnapshotFile,
+    encode_key,
+    lock_mask,
+    template_fingerprint,
+)
+from .vector import DEFAULT_VECTOR_CAPACITY, SessionStateVector
+
+logger = logging.getLogger(__name__)
+
+class StateManager:
+    """
+    Session state management
+
+    RESPONSIBILITIES:
+    - Create one StateMachine per session key as a copy of a template,
+      so the transition table is compiled once for every session
+    - Or, when vectorized, keep every session's state in one NumPy int8
+      array instead of per-session machines
+    - Route transitions to a session, or to every matching session at
+      once with transition_many
+    - Count sessions per state and report transitions to a MetricsCollector
+    - Snapshot every session to a checksummed StateSnapshotFile, flush
+      only the sessions changed since, and restore them on a warm restart
+
+    Vectorized sessions follow the template's guards and state locks but
+    run no state callbacks, and get() returns None for them; machine
+    sessions each keep their own locks, which are snapshotted with them.
+    Lock changes made through get() reach the snapshot on the session's
+    next transition or touch().
+    """
+
+    def __init__(self,
+                 template: Optional[StateMachine] = None,
+                 metrics: Optional[MetricsCollector] = None,
+                 vectorized: bool = False,
+                 capacity: int = DEFAULT_VECTOR_CAPACITY):
+        """
+        Initialize State Manager
+
+        Args:
+            template: Definition copied for each session, the
+                polycall_protocol_state_t lifecycle by default
+            metrics: Collector receiving per-transition counts
+            vectorized: Store states in a SessionStateVector; requires numpy
+            capacity: Initial vector slots when vectorized
+        """
+        self.template = template if template is not None else protocol_state_machine()
+        self.metrics = metrics
+        self._machines: Dict[Hashable, StateMachine] = {}
+        self._touched: Dict[Hashable, float] = {}
+        self._vector: Optional[SessionStateVector] = (
+            SessionStateVector(self.template, capacity) if vectorized else None
+        )
+        self.integrity_violations = 0
+        self._snapshot: Optional[StateSnapshotFile] = None
+        # Machine sessions: record index per key, record indexes free for
+        # reuse, and changes not yet flushed; vector sessions use their slot
+        self._records: Dict[Hashable, int] = {}
+        self._free_records: List[int] = []
+        self._released: List[int] = []
+        self._dirty: Set[Hashable] = set()
+
+    def _unknown(self, key: Hashable) -> None:
+        raise StateError(
+            f"Unknown session {key!r}: {SMStatus.name_of(SMStatus.ERROR_INVALID_CONTEXT)}",
+            SMStatus.ERROR_INVALID_CONTEXT,
+        )
+
+    def _record(self, source: int, target: int, count: int = 1) -> None:
+        if self.metrics is not None:
+            names = self.template.states
+            self.metrics.record_state_transition(names[source], names[target], count)
+
+    def create(self, key: Hashable, state: Optional[StateRef] = None) -> Optional[StateMachine]:
+        """
+        Start tracking a session
+
+        Args:
+            key: Session identifier
+            state: Starting state, the template's initial state by default
+
+        Returns:
+            Optional[StateMachine]: The session's machine, None when vectorized
+        """
+        if key in self:
+            raise StateError(
+                f"Session {key!r} already exists: {SMStatus.name_of(SMStatus.ERROR_INVALID_CONTEXT)}",
+                SMStatus.ERROR_INVALID_CONTEXT,
+            )
+        if self._snapshot is not None:
+            encode_key(key)
+        if self._vector is not None:
+            self._vector.add(key, 0 if state is None else self.template._resolve(state))
+            return None
+
+        machine = self.template.copy()
+        if state is not None:
+            machine.reset(state)
+        self._machines[key] = machine
+        self._touched[key] = time.monotonic()
+        if self._snapshot is not None:
+            self._dirty.add(key)
+        return machine
+
+    def get(self, key: Hashable) -> Optional[StateMachine]:
+        """Machine of a session, None when not tracked or vectorized"""
+        return self._machines.get(key)
+
+    def remove(self, key: Hashable) -> bool:
+        """Stop tracking a session"""
+        if self._vector is not None:
+            return self._vector.remove(key)
+        if self._snapshot is not None:
+            index = self._records.pop(key, None)
+            if index is not None:
+                self._released.append(index)
+            self._dirty.discard(key)
+        self._touched.pop(key, None)
+        return self._machines.pop(key, None) is not None
+
+    def touch(self, key: Hashable) -> None:
+        """Mark a session active now, for transition_many(idle=...)"""
+        if self._vector is not None:
+            self._vector.touch(key)
+        elif key in self._machines:
+            self._touched[key] = time.monotonic()
+            if self._snapshot is not None:
+                self._dirty.add(key)
+
+    def _run(self, key: Hashable, name: Optional[str], state: Optional[StateRef]) -> int:
+        """Run a named transition or move to a state, returning an SMStatus code"""
+        if self._vector is not None:
+            if name is not None:
+                status, source, target = self._vector.execute(key, name)
+            else:
+                target_id = self.template._state_id(state)
+                if target_id is None:
+                    return SMStatus.ERROR_INVALID_STATE
+                status, source, target = self._vector.move(key, target_id)
+        else:
+            machine = self._machines.get(key)
+            if machine is None:
+                return SMStatus.ERROR_INVALID_CONTEXT
+            source = machine.current_state_id
+            if name is not None:
+                status = machine.execute_transition(name)
+            else:
+                status = machine.try_transition_to(state)
+            target = machine.current_state_id
+            if status == SMStatus.SUCCESS:
+                self._touched[key] = time.monotonic()
+                if self._snapshot is not None:
+                    self._dirty.add(key)
+
+        if status == SMStatus.SUCCESS:
+            self._record(source, target)
+        return status
+
+    def execute_transition(self, key: Hashable, name: str) -> int:
+        """Run a named transition on a session, returning an SMStatus code"""
+        return self._run(key, name, None)
+
+    def transition_to(self, key: Hashable, state: StateRef) -> str:
+        """Move a session to a state; raises StateError"""
+        status = self._run(key, None, state)
+        if status == SMStatus.ERROR_INVALID_CONTEXT:
+            self._unknown(key)
+        if status != SMStatus.SUCCESS:
+            raise StateError(
+                f"Session {key!r} cannot move to {state!r}: {SMStatus.name_of(status)}", status
+            )
+        return self.state_of(key)
+
+    def transition_many(self,
+                        state: StateRef,
+                        source: Optional[StateRef] = None,
+                        idle: Optional[float] = None,
+                        keys: Optional[Iterable[Hashable]] = None) -> Dict[Tuple[str, str], int]:
+        """
+        Move every matching session that can reach a state
+
+        Vectorized managers do this with a few array operations over all
+        sessions; otherwise each matching machine is transitioned in turn.
+
+        Args:
+            state: Target state
+            source: Only sessions currently in this state
+            idle: Only sessions inactive for at least this many seconds
+            keys: Only these sessions
+
+        Returns:
+            Dict[Tuple[str, str], int]: Sessions moved per (from, to) state
+                names; each count is also reported to metrics
+        """
+        target = self.template._resolve(state)
+        source_id = None if source is None else self.template._resolve(source)
+
+        if self._vector is not None:
+            moved = self._vector.apply(target, source_id, idle, keys)
+        else:
+            moved = {}
+            cutoff = None if idle is None else time.monotonic() - idle
+            now = time.monotonic()
+            for key in (self._machines if keys is None else keys):
+                machine = self._machines.get(key)
+                if machine is None:
+                    continue
+                from_state = machine.current_state_id
+                if source_id is not None and from_state != source_id:
+                    continue
+                if cutoff is not None and self._touched[key] > cutoff:
+                    continue
+                if machine.try_transition_to(target) == SMStatus.SUCCESS:
+                    self._touched[key] = now
+                    if self._snapshot is not None:
+                        self._dirty.add(key)
+                    moved[(from_state, target)] = moved.get((from_state, target), 0) + 1
+
+        for (from_state, to_state), count in moved.items():
+            self._record(from_state, to_state, count)
+        names = self.template.states
+        return {
+            (names[from_state], names[to_state]): count
+            for (from_state, to_state), count in moved.items()
+        }
+
+    def state_of(self, key: Hashable) -> Optional[str]:
+        """Current state of a session, None when not tracked"""
+        if self._vector is not None:
+            state = self._vector.state(key)
+            return None if state is None else self.template.states[state]
+        machine = self._machines.get(key)
+        return None if machine is None else machine.current_state
+
+    def counts(self) -> Dict[str, int]:
+        """Sessions per state, for every template state"""
+        if self._vector is not None:
+            return dict(zip(self.template.states, self._vector.counts()))
+        counts = dict.fromkeys(self.template.states, 0)
+        for machine in self._machines.values():
+            counts[machine.current_state] += 1
+        return counts
+
+    def invalidate(self) -> None:
+        """Pick up template lock and guard changes in vectorized lookups"""
+        if self._vector is not None:
+            self._vector.invalidate()
+
+    def _write_record(self, snapshot: StateSnapshotFile, index: int, key: Hashable) -> None:
+        machine = self._machines[key]
+        snapshot.write(
+            index, key, machine.current_state_id, lock_mask(machine), machine.transition_count
+        )
+
+    def snapshot(self, path: str) -> int:
+        """
+        Write every session to a snapshot file and keep it attached
+
+        The file is built next to path and renamed over it, so a crash
+        mid-snapshot leaves the previous snapshot intact. Later changes
+        are written by flush().
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            int: Sessions written
+        """
+        self.close_snapshot()
+        fingerprint = template_fingerprint(self.template)
+        pending = f"{path}.tmp"
+        if self._vector is not None:
+            snapshot = StateSnapshotFile(pending, fingerprint, self._vector.capacity)
+        else:
+            snapshot = StateSnapshotFile(
+                pending, fingerprint, max(len(self._machines), DEFAULT_SNAPSHOT_CAPACITY)
+            )
+        try:
+            if self._vector is not None:
+                self._vector.take_dirty()
+                for key in self._vector:
+                    slot = self._vector.slot_of(key)
+                    snapshot.write(slot, key, self._vector.entry(slot)[1])
+            else:
+                self._records = {key: index for index, key in enumerate(self._machines)}
+                self._free_records = []
+                self._released = []
+                self._dirty.clear()
+                for key, index in self._records.items():
+                    self._write_record(snapshot, index, key)
+            snapshot.flush()
+            os.replace(pending, path)
+        except BaseException:
+            snapshot.close()
+            os.unlink(pending)
+            raise
+
+        snapshot.path = path
+        self._snapshot = snapshot
+        logger.debug(f"Snapshot of {len(self)} sessions written to {path}")
+        return len(self)
+
+    def flush(self) -> int:
+        """
+        Write sessions changed since the last snapshot or flush
+
+        Only their records are rewritten; removed sessions' records are
+        freed.
+
+        Returns:
+            int: Records written or freed
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise StateError(
+                f"No snapshot attached: {SMStatus.name_of(SMStatus.ERROR_NOT_INITIALIZED)}",
+                SMStatus.ERROR_NOT_INITIALIZED,
+            )
+
+        if self._vector is not None:
+            slots = self._vector.take_dirty()
+            for slot in slots:
+                key, state = self._vector.entry(slot)
+                if key is None:
+                    snapshot.clear(slot)
+                else:
+                    snapshot.write(slot, key, state)
+            written = len(slots)
+        else:
+            for index in self._released:
+                snapshot.clear(index)
+            self._free_records.extend(self._released)
+            written = len(self._released) + len(self._dirty)
+            self._released = []
+            for key in self._dirty:
+                index = self._records.get(key)
+                if index is None:
+                    if self._free_records:
+                        index = self._free_records.pop()
+                    else:
+                        index = len(self._records) + len(self._free_records)
+                    self._records[key] = index
+                self._write_record(snapshot, index, key)
+            self._dirty.clear()
+
+        snapshot.flush()
+        return written
+
+    def restore(self, path: str) -> int:
+        """
+        Recreate sessions from a snapshot file, then attach it
+
+        Records failing their checksum are skipped and counted in
+        integrity_violations. Machine sessions get back their locks and
+        transition count. The file is rewritten compactly afterwards.
+
+        Args:
+            path: Snapshot written by snapshot()
+
+        Returns:
+            int: Sessions restored
+
+        Raises:
+            StateError: The manager already has sessions, or the file is
+                not a snapshot of this manager's template
+        """
+        if len(self):
+            raise StateError(
+                f"Sessions can only be restored into an empty manager: "
+                f"{SMStatus.name_of(SMStatus.ERROR_INVALID_CONTEXT)}",
+                SMStatus.ERROR_INVALID_CONTEXT,
+            )
+        self.close_snapshot()
+
+        num_states = len(self.template.states)
+        restored = 0
+        with StateSnapshotFile(path, template_fingerprint(self.template), create=False) as snapshot:
+            for record in snapshot.records():
+                if record.state >= num_states or record.key in self:
+                    snapshot.corrupt += 1
+                    continue
+                machine = self.create(record.key, record.state)
+                if machine is not None:
+                    for state in range(num_states):
+                        if record.locks >> state & 1:
+                            machine.lock_state(state)
+                    machine.restore_transition_count(record.transitions)
+                restored += 1
+            if snapshot.corrupt:
+                logger.warning(f"{snapshot.corrupt} corrupt records skipped restoring {path}")
+            self.integrity_violations += snapshot.corrupt
+
+        self.snapshot(path)
+        return restored
+
+    def close_snapshot(self) -> None:
+        """Flush and detach the snapshot file"""
+        if self._snapshot is None:
+            return
+        self.flush()
+        snapshot, self._snapshot = self._snapshot, None
+        snapshot.close()
+        self._records = {}
+        self._free_records = []
+
+    @property
+    def snapshot_path(self) -> Optional[str]:
+        """File of the attached snapshot"""
+        return None if self._snapshot is None else self._snapshot.path
+
+    @property
+    def vectorized(self) -> bool:
+        """Whether states are held in a SessionStateVector"""
+        return self._vector is not None
+
+    def __len__(self) -> int:
+        return len(self._vector) if self._vector is not None else len(self._machines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        if self._vector is not None:
+            return key in self._vector
+        return key in self._machines
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._vector if self._vector is not None else self._machines)
+
+__all__ = ["StateManager"]
@@ -0,0 +1,257 @@
+"""
+State Snapshot File
+Fixed-record session state persistence through mmap
+"""
+
+import logging
+import mmap
+import struct
+import time
+import zlib
+from typing import Hashable, Iterator, NamedTuple, Optional, Tuple
+
+from ...exceptions import StateError
+from ..ffi.native import SMStatus
+from .machine import StateMachine
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"PCSM"
+SNAPSHOT_VERSION = 1
+
+# magic, format version, record size, capacity, template fingerprint,
+# header checksum; padded to HEADER_SIZE
+HEADER_STRUCT = struct.Struct("<4sHHIII")
+HEADER_SIZE = 32
+
+# flags, key kind, state id, locked-state bitmask, transition count,
+# timestamp in ns, key, record checksum
+RECORD_STRUCT = struct.Struct("<BBBxIIQ32sI")
+RECORD_SIZE = RECORD_STRUCT.size
+MAX_KEY_SIZE = 32
+
+DEFAULT_SNAPSHOT_CAPACITY = 1024
+
+class RecordFlags:
+    FREE = 0x00
+    USED = 0x01
+
+class KeyKinds:
+    STR = 0
+    INT = 1
+    BYTES = 2
+
+_INT_KEY = struct.Struct("<q")
+
+class SnapshotRecord(NamedTuple):
+    """One session read back from a snapshot"""
+    index: int
+    key: Hashable
+    state: int
+    locks: int
+    transitions: int
+    timestamp: int
+
+def template_fingerprint(template: StateMachine) -> int:
+    """CRC32 of a machine's states, final flags and transitions"""
+    definition = [
+        [(state.name, state.is_final) for state in template._states],
+        [(t.name, t.from_state, t.to_state) for t in template._transitions],
+    ]
+    return zlib.crc32(repr(definition).encode("utf-8"))
+
+def lock_mask(machine: StateMachine) -> int:
+    """Bitmask of a machine's locked state ids"""
+    return sum(1 << state for state in range(len(machine.states)) if machine.is_locked(state))
+
+def encode_key(key: Hashable) -> Tuple[int, bytes]:
+    """Key kind and bytes of a session key; str, int and bytes keys are supported"""
+    if isinstance(key, str):
+        kind, data = KeyKinds.STR, key.encode("utf-8")
+    elif isinstance(key, int):
+        kind, data = KeyKinds.INT, _INT_KEY.pack(key)
+    elif isinstance(key, bytes):
+        kind, data = KeyKinds.BYTES, key
+    else:
+        raise ValueError(f"Session key {key!r} cannot be snapshotted")
+    if len(data) > MAX_KEY_SIZE:
+        raise ValueError(f"Session key must be at most {MAX_KEY_SIZE} bytes: {key!r}")
+    return kind, data
+
+def decode_key(kind: int, data: bytes) -> Hashable:
+    """Inverse of encode_key"""
+    if kind == KeyKinds.INT:
+        return _INT_KEY.unpack_from(data)[0]
+    data = data.rstrip(b"\0")
+    return data.decode("utf-8") if kind == KeyKinds.STR else data
+
+class StateSnapshotFile:
+    """
+    Memory-mapped array of PolyCall_StateSnapshot-style records
+
+    RESPONSIBILITIES:
+    - Lay sessions out as fixed RECORD_SIZE records after a header naming
+      the template fingerprint, so record i is at a known offset and can
+      be rewritten alone
+    - Checksum every record, so a torn or corrupted record is skipped on
+      restore instead of restoring a wrong state
+    - Grow the file by doubling when a record index is past its end
+
+    Records are written into the shared mapping; flush() pushes dirty
+    pages to disk.
+    """
+
+    def __init__(self,
+                 path: str,
+                 fingerprint: int,
+                 capacity: int = DEFAULT_SNAPSHOT_CAPACITY,
+                 create: bool = True):
+        """
+        Initialize State Snapshot File
+
+        Args:
+            path: Snapshot file
+            fingerprint: Template fingerprint stored in, or expected from,
+                the header
+            capacity: Records allocated when creating
+            create: Create or truncate the file; otherwise open an existing
+                snapshot, raising StateError when it is not one for this
+                template
+
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.corrupt = 0
+        self._file = open(path, "w+b" if create else "r+b")
+        self._map: Optional[mmap.mmap] = None
+
+        if create:
+            self.capacity = max(1, capacity)
+            self._file.truncate(HEADER_SIZE + self.capacity * RECORD_SIZE)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            self._write_header()
+        else:
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0)
+                self.capacity = self._read_header()
+            except BaseException:
+                self.close()
+                raise
+
+    def _write_header(self) -> None:
+        fields = (SNAPSHOT_MAGIC, SNAPSHOT_VERSION, RECORD_SIZE, self.capacity, self.fingerprint)
+        header = HEADER_STRUCT.pack(*fields, 0)
+        HEADER_STRUCT.pack_into(self._map, 0, *fields, zlib.crc32(header[:-4]))
+
+    def _read_header(self) -> int:
+        if len(self._map) < HEADER_SIZE:
+            raise StateError(f"{self.path} is not a state snapshot", SMStatus.ERROR_INVALID_CONTEXT)
+        magic, version, record_size, capacity, fingerprint, checksum = HEADER_STRUCT.unpack_from(self._map)
+        if magic != SNAPSHOT_MAGIC:
+            raise StateError(f"{self.path} is not a state snapshot", SMStatus.ERROR_INVALID_CONTEXT)
+        if zlib.crc32(self._map[:HEADER_STRUCT.size - 4]) != checksum:
+            raise StateError(
+                f"Snapshot header of {self.path} is corrupt", SMStatus.ERROR_INTEGRITY_CHECK_FAILED
+            )
+        if version != SNAPSHOT_VERSION or record_size != RECORD_SIZE:
+            raise StateError(
+                f"Snapshot format {version} with {record_size}-byte records is not supported",
+                SMStatus.ERROR_VERSION_MISMATCH,
+            )
+        if fingerprint != self.fingerprint:
+            raise StateError(
+                f"Snapshot {self.path} was taken from a different state machine",
+                SMStatus.ERROR_VERSION_MISMATCH,
+            )
+        return min(capacity, (len(self._map) - HEADER_SIZE) // RECORD_SIZE)
+
+    def _grow(self, index: int) -> None:
+        capacity = self.capacity
+        while capacity <= index:
+            capacity *= 2
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(HEADER_SIZE + capacity * RECORD_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self.capacity = capacity
+        self._write_header()
+
+    def write(self,
+              index: int,
+              key: Hashable,
+              state: int,
+              locks: int = 0,
+              transitions: int = 0) -> None:
+        """
+        Store one session at a record index
+
+        Args:
+            index: Record slot
+            key: Session key, see encode_key
+            state: State id
+            locks: Bitmask of locked state ids
+            transitions: Transitions the session has completed
+        """
+        if index >= self.capacity:
+            self._grow(index)
+        kind, data = encode_key(key)
+        offset = HEADER_SIZE + index * RECORD_SIZE
+        fields = (RecordFlags.USED, kind, state, locks, transitions & 0xFFFFFFFF, time.time_ns(), data)
+        RECORD_STRUCT.pack_into(self._map, offset, *fields, 0)
+        checksum = zlib.crc32(self._map[offset:offset + RECORD_SIZE - 4])
+        struct.pack_into("<I", self._map, offset + RECORD_SIZE - 4, checksum)
+
+    def clear(self, index: int) -> None:
+        """Mark a record slot free"""
+        if index < self.capacity:
+            offset = HEADER_SIZE + index * RECORD_SIZE
+            self._map[offset:offset + RECORD_SIZE] = bytes(RECORD_SIZE)
+
+    def records(self) -> Iterator[SnapshotRecord]:
+        """Used records whose checksum verifies; corrupt ones are counted in corrupt"""
+        view = self._map
+        for index in range(self.capacity):
+            offset = HEADER_SIZE + index * RECORD_SIZE
+            flags, kind, state, locks, transitions, timestamp, data, checksum = (
+                RECORD_STRUCT.unpack_from(view, offset)
+            )
+            if flags == RecordFlags.FREE and not checksum:
+                continue
+            if (flags != RecordFlags.USED
+                    or zlib.crc32(view[offset:offset + RECORD_SIZE - 4]) != checksum):
+                self.corrupt += 1
+                logger.warning(f"Skipping corrupt record {index} in {self.path}")
+                continue
+            yield SnapshotRecord(index, decode_key(kind, data), state, locks, transitions, timestamp)
+
+    def flush(self) -> None:
+        """Write modified pages to disk"""
+        if self._map is not None:
+            self._map.flush()
+
+    def close(self) -> None:
+        """Flush and release the mapping"""
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "StateSnapshotFile":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+__all__ = [
+    "StateSnapshotFile",
+    "SnapshotRecord",
+    "DEFAULT_SNAPSHOT_CAPACITY",
+    "RECORD_SIZE",
+    "HEADER_SIZE",
+    "MAX_KEY_SIZE",
+    "template_fingerprint",
+    "lock_mask",
+    "encode_key",
+    "decode_key",
+]
@@ -0,0 +1,251 @@
+"""
+Session State Vector
+Every session's state in one NumPy int8 array, transitioned in bulk
+"""
+
+import logging
+import time
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from ...exceptions import ConfigurationError
+from ..ffi.native import SMStatus
+from .machine import NO_TRANSITION, StateMachine
+
+logger = logging.getLogger(__name__)
+
+# NumPy is imported when the first vector is created, keeping it off the
+# import path of the package
+np = None
+
+# Sessions a vector holds before its arrays double
+DEFAULT_VECTOR_CAPACITY = 1024
+
+# State of a free slot
+FREE_SLOT = -1
+
+def _load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ConfigurationError("Vectorized session states require the numpy package") from None
+        np = numpy
+    return np
+
+class SessionStateVector:
+    """
+    Vectorized session states
+
+    RESPONSIBILITIES:
+    - Keep each session's state id in one int8 array slot and its last
+      activity time in a parallel float64 array
+    - Apply a transition to every session matching a source state, an
+      idle time and a key set with a few array operations
+    - Resolve transitions through the template's compiled table, honouring
+      its guards and state locks
+    - Flag slots changed since the last take_dirty(), for incremental
+      snapshots
+
+    Sessions have no StateMachine of their own, so on_enter, on_exit and
+    action callbacks cannot run; templates that define them are refused.
+    """
+
+    def __init__(self, template: StateMachine, capacity: int = DEFAULT_VECTOR_CAPACITY):
+        """
+        Initialize Session State Vector
+
+        Args:
+            template: Machine whose states and transitions sessions follow
+            capacity: Initial number of slots; grows by doubling
+        """
+        _load_numpy()
+        if (any(state.on_enter or state.on_exit for state in template._states)
+                or any(transition.action for transition in template._transitions)):
+            raise ConfigurationError("Vectorized session states cannot run state callbacks")
+
+        self.template = template
+        self.failed_transitions = 0
+        self._states = np.full(max(1, capacity), FREE_SLOT, dtype=np.int8)
+        self._touched = np.zeros(len(self._states), dtype=np.float64)
+        self._dirty = np.zeros(len(self._states), dtype=bool)
+        self._slots: Dict[Hashable, int] = {}
+        self._keys: List[Optional[Hashable]] = [None] * len(self._states)
+        self._free = list(range(len(self._states) - 1, -1, -1))
+        # Source -> target arrays per target state and per transition name,
+        # with a trailing FREE_SLOT entry so a free slot's -1 stays free
+        self._lookups: Dict[Tuple[str, object], object] = {}
+
+    def _grow(self) -> None:
+        size = len(self._states)
+        self._states = np.concatenate([self._states, np.full(size, FREE_SLOT, dtype=np.int8)])
+        self._touched = np.concatenate([self._touched, np.zeros(size, dtype=np.float64)])
+        self._dirty = np.concatenate([self._dirty, np.zeros(size, dtype=bool)])
+        self._keys.extend([None] * size)
+        self._free.extend(range(2 * size - 1, size - 1, -1))
+
+    def _lookup(self, kind: str, key: object):
+        """Source -> target array for a target state or transition name"""
+        lookup = self._lookups.get((kind, key))
+        if lookup is not None:
+            return lookup
+
+        template = self.template
+        table = template._compiled()
+        count = table.num_states
+        if kind == "name":
+            row = table.named.get(key)
+            indexes = [NO_TRANSITION] * count if row is None else list(row)
+        else:
+            indexes = [table.moves[source * count + key] for source in range(count)]
+        targets = [
+            table.targets[index]
+            if index != NO_TRANSITION and template._check(table, index) == SMStatus.SUCCESS
+            else FREE_SLOT
+            for index in indexes
+        ]
+        lookup = np.array(targets + [FREE_SLOT], dtype=np.int8)
+        # Template locks and guard results are baked in until invalidate()
+        self._lookups[(kind, key)] = lookup
+        return lookup
+
+    def invalidate(self) -> None:
+        """Re-resolve lookups after locking states or invalidating guards"""
+        self._lookups.clear()
+
+    def add(self, key: Hashable, state: int = 0) -> int:
+        """Track a session in a state id, returning its slot"""
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._states[slot] = state
+        self._touched[slot] = time.monotonic()
+        self._dirty[slot] = True
+        self._slots[key] = slot
+        self._keys[slot] = key
+        return slot
+
+    def remove(self, key: Hashable) -> bool:
+        """Stop tracking a session"""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        self._states[slot] = FREE_SLOT
+        self._keys[slot] = None
+        self._dirty[slot] = True
+        self._free.append(slot)
+        return True
+
+    def state(self, key: Hashable) -> Optional[int]:
+        """State id of a session, None when not tracked"""
+        slot = self._slots.get(key)
+        return None if slot is None else int(self._states[slot])
+
+    def touch(self, key: Hashable) -> None:
+        """Mark a session active now"""
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._touched[slot] = time.monotonic()
+
+    def _move(self, key: Hashable, lookup) -> Tuple[int, int, int]:
+        slot = self._slots.get(key)
+        if slot is None:
+            return SMStatus.ERROR_INVALID_CONTEXT, FREE_SLOT, FREE_SLOT
+        source = int(self._states[slot])
+        target = int(lookup[source])
+        if target == FREE_SLOT:
+            self.failed_transitions += 1
+            return SMStatus.ERROR_INVALID_TRANSITION, source, target
+        self._states[slot] = target
+        self._touched[slot] = time.monotonic()
+        self._dirty[slot] = True
+        return SMStatus.SUCCESS, source, target
+
+    def execute(self, key: Hashable, name: str) -> Tuple[int, int, int]:
+        """
+        Run a named transition on one session
+
+        Returns:
+            Tuple[int, int, int]: SMStatus code, source and target state ids
+        """
+        return self._move(key, self._lookup("name", name))
+
+    def move(self, key: Hashable, state: int) -> Tuple[int, int, int]:
+        """Move one session to a state id; returns as execute"""
+        return self._move(key, self._lookup("state", state))
+
+    def apply(self,
+              state: int,
+              source: Optional[int] = None,
+              idle: Optional[float] = None,
+              keys: Optional[Iterable[Hashable]] = None) -> Dict[Tuple[int, int], int]:
+        """
+        Move every matching session to a state in one step
+
+        Sessions without a transition to state are left alone.
+
+        Args:
+            state: Target state id
+            source: Only sessions currently in this state id
+            idle: Only sessions inactive for at least this many seconds
+            keys: Only these sessions
+
+        Returns:
+            Dict[Tuple[int, int], int]: Sessions moved per (source, target)
+        """
+        states = self._states
+        targets = self._lookup("state", state)[states]
+        moving = targets != FREE_SLOT
+        if source is not None:
+            moving &= states == source
+        if idle is not None:
+            moving &= self._touched <= time.monotonic() - idle
+        if keys is not None:
+            selected = np.zeros(len(states), dtype=bool)
+            selected[[self._slots[key] for key in keys if key in self._slots]] = True
+            moving &= selected
+
+        moved = np.bincount(states[moving], minlength=self.template._compiled().num_states)
+        states[moving] = targets[moving]
+        self._dirty |= moving
+        return {
+            (from_state, state): int(count)
+            for from_state, count in enumerate(moved) if count
+        }
+
+    def counts(self) -> List[int]:
+        """Sessions per state id"""
+        states = self._states
+        return np.bincount(
+            states[states != FREE_SLOT], minlength=self.template._compiled().num_states
+        ).tolist()
+
+    def slot_of(self, key: Hashable) -> Optional[int]:
+        """Slot of a session, None when not tracked"""
+        return self._slots.get(key)
+
+    def entry(self, slot: int) -> Tuple[Optional[Hashable], int]:
+        """Key and state id in a slot; a free slot has no key and FREE_SLOT"""
+        return self._keys[slot], int(self._states[slot])
+
+    def take_dirty(self) -> List[int]:
+        """Slots changed since the last call, clearing their flags"""
+        slots = np.flatnonzero(self._dirty)
+        self._dirty[slots] = False
+        return slots.tolist()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._slots)
+
+    @property
+    def capacity(self) -> int:
+        """Slots allocated"""
+        return len(self._states)
+
+__all__ = ["SessionStateVector", "DEFAULT_VECTOR_CAPACITY", "FREE_SLOT"]
@@ -0,0 +1,221 @@
+"""
+Synchronous Binding - Blocking facade over ProtocolBinding
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
+
+from .binding import ProtocolBinding
+from .loop import configured_event_loop, new_event_loop, resolve_event_loop
+
+logger = logging.getLogger(__name__)
+
+class EventLoopThread:
+    """
+    Long-lived asyncio event loop running in a daemon thread
+
+    Coroutines are submitted with run_coroutine_threadsafe, so blocking
+    callers share one loop instead of paying asyncio.run() per call.
+    """
+
+    def __init__(self, name: str = "pypolycall-loop", event_loop: Optional[str] = None):
+        """
+        Initialize Event Loop Thread
+
+        Args:
+            name: Thread name
+            event_loop: "uvloop" or "asyncio", the configured backend by default
+        """
+        self.name = name
+        self.event_loop = resolve_event_loop(event_loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if needed and return its loop"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                loop = new_event_loop(self.event_loop)
+                ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run, args=(loop, ready), name=self.name, daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def _run(self, loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the loop and block for its result
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait before cancelling it
+
+        Returns:
+            Any: The coroutine's result
+        """
+        loop = self.start()
+        if self._thread is threading.current_thread():
+            coro.close()
+            raise RuntimeError("Blocking call made from the binding event loop thread")
+
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Stop the loop and wait for the thread to exit"""
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = self._loop = None
+
+        if thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """Running loop, None before start()"""
+        return self._loop
+
+    @property
+    def thread_id(self) -> Optional[int]:
+        """Identifier of the loop thread, e.g. for SamplingProfiler"""
+        return self._thread.ident if self._thread is not None else None
+
+    @property
+    def is_running(self) -> bool:
+        """Check whether the loop thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+# Loops shared by every SyncBinding that is not given its own, per backend
+_shared_loops: Dict[str, EventLoopThread] = {}
+_shared_loops_lock = threading.Lock()
+
+def shared_loop(event_loop: Optional[str] = None) -> EventLoopThread:
+    """
+    Process-wide loop thread for a backend
+
+    Args:
+        event_loop: "uvloop" or "asyncio", the configured backend by default
+
+    Returns:
+        EventLoopThread: Shared loop thread, started on first use
+    """
+    backend = resolve_event_loop(event_loop)
+    with _shared_loops_lock:
+        if backend not in _shared_loops:
+            _shared_loops[backend] = EventLoopThread(event_loop=backend)
+        return _shared_loops[backend]
+
+class SyncBinding:
+    """
+    Blocking ProtocolBinding for scripts and synchronous workers
+
+    RESPONSIBILITIES:
+    - Mirror the ProtocolBinding API with blocking methods
+    - Run every call on one long-lived background event loop
+    - Keep the connection open across calls
+    """
+
+    def __init__(self,
+                 polycall_host: str = "localhost",
+                 polycall_port: int = 8084,
+                 binding_config: Optional[Dict[str, Any]] = None,
+                 loop_thread: Optional[EventLoopThread] = None,
+                 call_timeout: Optional[float] = None):
+        """
+        Initialize Sync Binding
+
+        Args:
+            polycall_host: polycall.exe runtime host
+            polycall_port: polycall.exe runtime port
+            binding_config: Configuration passed to ProtocolBinding
+            loop_thread: Loop to run on; the process-wide shared loop for the
+                configured ``event_loop`` backend by default
+            call_timeout: Seconds each blocking call may take, None to wait forever
+        """
+        self._loop_thread = loop_thread or shared_loop(configured_event_loop(binding_config))
+        self.call_timeout = call_timeout
+        self._binding = ProtocolBinding(polycall_host, polycall_port, binding_config)
+
+    def _run(self, coro: Awaitable[Any]) -> Any:
+        return self._loop_thread.run(coro, self.call_timeout)
+
+    def connect(self) -> bool:
+        """Connect to polycall.exe runtime"""
+        return self._run(self._binding.connect())
+
+    def authenticate(self, credentials: Dict[str, Any]) -> bool:
+        """Authenticate with polycall.exe runtime"""
+        return self._run(self._binding.authenticate(credentials))
+
+    def execute_operation(self,
+                          operation: str,
+                          params: Dict[str, Any],
+                          reliable: bool = False) -> Any:
+        """Execute operation through polycall.exe runtime"""
+        return self._run(self._binding.execute_operation(operation, params, reliable))
+
+    def execute_many(self,
+                     operations: Iterable[Tuple[str, Dict[str, Any]]],
+                     return_exceptions: bool = False,
+                     reliable: bool = False) -> List[Any]:
+        """Execute (operation, params) pairs in one write, results in order"""
+        return self._run(self._binding.execute_many(list(operations), return_exceptions, reliable))
+
+    def execute_raw(self, payload: bytes) -> bytes:
+        """Execute a pre-encoded command payload without codec round-trips"""
+        return self._run(self._binding.execute_raw(payload))
+
+    def heartbeat(self) -> float:
+        """Probe runtime liveness, returning the round-trip time in seconds"""
+        return self._run(self._binding.heartbeat())
+
+    def shutdown(self) -> None:
+        """Close the connection; the shared loop keeps running for other bindings"""
+        if self._loop_thread.is_running:
+            self._run(self._binding.shutdown())
+
+    def __enter__(self) -> "SyncBinding":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown()
+
+    @property
+    def binding(self) -> ProtocolBinding:
+        """Underlying async binding; only use it on the loop thread"""
+        return self._binding
+
+    @property
+    def is_connected(self) -> bool:
+        """Check runtime connection status"""
+        return self._binding.is_connected
+
+    @property
+    def is_authenticated(self) -> bool:
+        """Check authentication status"""
+        return self._binding.is_authenticated
+
+__all__ = ["SyncBinding", "EventLoopThread", "shared_loop"]
@@ -2,28 +2,75 @@
 Core Telemetry Layer
 """
 
+import importlib
+
+from .events import EventKinds, EventTracker, ProtocolEvent
+from .exporter import MetricsExporter
+from .metrics import Counters, Histogram, MetricsCollector
+from .slowlog import CallTrace, SlowOperationLog
+
 class TelemetryObserver:
     """Telemetry observer for protocol monitoring"""
     
     def __init__(self):
         self._observing = False
+        self._protocol_handler = None
     
     async def start_observation(self, protocol_handler):
         """Start telemetry observation"""
+        self._protocol_handler = protocol_handler
         self._observing = True
     
     async def stop_observation(self):
         """Stop telemetry observation"""
         self._observing = False
-
-class MetricsCollector:
-    """Metrics collection for telemetry"""
+        self._protocol_handler = None
     
-    def __init__(self):
-        self._metrics = {}
-    
-    def get_current_metrics(self):
-        """Get collected metrics"""
-        return self._metrics
+    def get_metrics(self):
+        """Get observed connection metrics"""
+        if not self._observing or self._protocol_handler is None:
+            return {}
+        
+        return {
+            "heartbeat": self._protocol_handler.rtt_stats,
+            "in_flight": self._protocol_handler.in_flight,
+            "state": self._protocol_handler.state,
+            "metrics": (
+                self._protocol_handler.metrics.get_current_metrics()
+                if self._protocol_handler.metrics is not None else {}
+            ),
+            "slow_log": (
+                self._protocol_handler.slow_log.stats
+                if self._protocol_handler.slow_log is not None else {}
+            ),
+        }
+
+# The profiler is only needed while profiling, so it loads on first access
+_LAZY_IMPORTS = {
+    "SamplingProfiler": ".profiler",
+    "profile": ".profiler",
+}
+
+def __getattr__(name: str):
+    """Import a public name on first access"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
-__all__ = ["TelemetryObserver", "MetricsCollector"]
+__all__ = [
+    "TelemetryObserver",
+    "MetricsCollector",
+    "MetricsExporter",
+    "EventTracker",
+    "ProtocolEvent",
+    "EventKinds",
+    "SlowOperationLog",
+    "CallTrace",
+    "SamplingProfiler",
+    "profile",
+    "Histogram",
+    "Counters",
+]
@@ -0,0 +1,222 @@
+"""
+Event Tracker
+Bounded ring of protocol events with async-iterator subscriptions
+"""
+
+import asyncio
+import collections
+import time
+from typing import Any, Deque, Dict, List, Optional, Set
+
+# Events retained by a tracker; older ones are overwritten
+DEFAULT_EVENT_CAPACITY = 1024
+# Events queued per subscriber before the oldest are dropped
+DEFAULT_SUBSCRIBER_QUEUE = 256
+
+class EventKinds:
+    STATE = "state"
+    ERROR = "error"
+    SLOW = "slow"
+
+class ProtocolEvent:
+    """One recorded protocol event"""
+
+    __slots__ = ("sequence", "timestamp", "kind", "name", "detail", "duration")
+
+    def __init__(self,
+                 sequence: int,
+                 timestamp: float,
+                 kind: str,
+                 name: str,
+                 detail: Optional[str] = None,
+                 duration: Optional[float] = None):
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.kind = kind
+        self.name = name
+        self.detail = detail
+        self.duration = duration
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Event fields as a dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"ProtocolEvent(#{self.sequence} {self.kind} {self.name})"
+
+class EventSubscription:
+    """
+    Async iterator over events recorded after subscribing
+
+    Holds at most maxsize undelivered events; when a slow consumer falls
+    behind, the oldest are dropped and counted in dropped.
+    """
+
+    def __init__(self, tracker: "EventTracker", maxsize: int):
+        self._tracker = tracker
+        self._queue: Deque[ProtocolEvent] = collections.deque(maxlen=maxsize)
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed = False
+        self.dropped = 0
+
+    def _push(self, event: ProtocolEvent) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(event)
+        self._wake()
+
+    def _wake(self) -> None:
+        waiter = self._waiter
+        if waiter is None or waiter.done():
+            return
+        loop = waiter.get_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            waiter.set_result(None)
+        else:
+            loop.call_soon_threadsafe(self._wake)
+
+    def __aiter__(self) -> "EventSubscription":
+        return self
+
+    async def __anext__(self) -> ProtocolEvent:
+        while not self._queue:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._queue.popleft()
+
+    def close(self) -> None:
+        """Stop receiving events; iteration ends once the queue is drained"""
+        if not self._closed:
+            self._closed = True
+            self._tracker._subscribers.discard(self)
+            self._wake()
+
+    async def __aenter__(self) -> "EventSubscription":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """Events queued but not yet consumed"""
+        return len(self._queue)
+
+class EventTracker:
+    """
+    Bounded protocol event log
+
+    RESPONSIBILITIES:
+    - Keep the last capacity state transitions, errors and slow calls in
+      a fixed ring, so long-running processes do not grow it
+    - Fan each event out to async subscribers with drop-oldest backpressure
+    """
+
+    def __init__(self, capacity: int = DEFAULT_EVENT_CAPACITY):
+        """
+        Initialize Event Tracker
+
+        Args:
+            capacity: Events retained for recent()
+        """
+        if capacity < 1:
+            raise ValueError(f"Event capacity must be positive: {capacity}")
+        self.capacity = capacity
+        self._ring: List[Optional[ProtocolEvent]] = [None] * capacity
+        self._recorded = 0
+        self._subscribers: Set[EventSubscription] = set()
+
+    def record(self,
+               kind: str,
+               name: str,
+               detail: Optional[str] = None,
+               duration: Optional[float] = None) -> ProtocolEvent:
+        """
+        Record an event
+
+        Args:
+            kind: EventKinds value
+            name: Operation or transition the event concerns
+            detail: Error message or other context
+            duration: Call duration in seconds, for slow calls
+
+        Returns:
+            ProtocolEvent: The stored event
+        """
+        self._recorded += 1
+        event = ProtocolEvent(self._recorded, time.time(), kind, name, detail, duration)
+        self._ring[(self._recorded - 1) % self.capacity] = event
+        for subscription in tuple(self._subscribers):
+            subscription._push(event)
+        return event
+
+    def recent(self, count: Optional[int] = None) -> List[ProtocolEvent]:
+        """
+        Retained events, oldest first
+
+        Args:
+            count: Only the newest count events
+        """
+        retained = min(self._recorded, self.capacity)
+        if count is not None:
+            retained = min(retained, max(0, count))
+        return [
+            self._ring[index % self.capacity]
+            for index in range(self._recorded - retained, self._recorded)
+        ]
+
+    def subscribe(self,
+                  maxsize: int = DEFAULT_SUBSCRIBER_QUEUE,
+                  replay: int = 0) -> EventSubscription:
+        """
+        Subscribe to events recorded from now on
+
+        Args:
+            maxsize: Undelivered events kept before dropping the oldest
+            replay: Retained events to deliver first
+
+        Returns:
+            EventSubscription: Async iterator of ProtocolEvent
+        """
+        subscription = EventSubscription(self, maxsize)
+        for event in self.recent(replay):
+            subscription._push(event)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def close(self) -> None:
+        """End every subscription"""
+        for subscription in tuple(self._subscribers):
+            subscription.close()
+
+    @property
+    def recorded(self) -> int:
+        """Events recorded since creation"""
+        return self._recorded
+
+    @property
+    def overwritten(self) -> int:
+        """Events no longer retained"""
+        return max(0, self._recorded - self.capacity)
+
+    @property
+    def subscribers(self) -> int:
+        """Open subscriptions"""
+        return len(self._subscribers)
+
+__all__ = [
+    "EventTracker",
+    "EventSubscription",
+    "ProtocolEvent",
+    "EventKinds",
+    "DEFAULT_EVENT_CAPACITY",
+]
@@ -0,0 +1,355 @@
+"""
+Metrics Exporter
+OpenMetrics text exposition over a stdlib asyncio HTTP endpoint
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .metrics import PERCENTILES, Counters, Histogram, MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+# Environment fallbacks for the enable_metrics, metrics_host and
+# metrics_port settings
+METRICS_ENABLED_ENV = "PYPOLYCALL_ENABLE_METRICS"
+METRICS_HOST_ENV = "PYPOLYCALL_METRICS_HOST"
+METRICS_PORT_ENV = "PYPOLYCALL_METRICS_PORT"
+
+# Port polycall.exe declares for metrics in config.Polycallfile
+DEFAULT_METRICS_PORT = 9090
+DEFAULT_METRICS_HOST = "127.0.0.1"
+# Scrapes within this many seconds of a render are served from cache
+DEFAULT_CACHE_TTL = 1.0
+# Seconds a client may take to send its request head
+REQUEST_TIMEOUT = 5.0
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRICS_PATHS = (b"/metrics", b"/")
+
+# (counter slot, family name, unit, help) for MetricsCollector.counters
+_COUNTER_FAMILIES = (
+    (Counters.REQUESTS, "pypolycall_requests", None, "Requests sent to the runtime"),
+    (Counters.RESPONSES, "pypolycall_responses", None, "Replies received from the runtime"),
+    (Counters.ERRORS, "pypolycall_errors", None, "ERROR replies, timeouts and connection failures"),
+    (Counters.FRAMES_SENT, "pypolycall_frames_sent", None, "Frames written"),
+    (Counters.FRAMES_RECEIVED, "pypolycall_frames_received", None, "Frames read"),
+    (Counters.BYTES_SENT, "pypolycall_sent_bytes", "bytes", "Frame bytes written"),
+    (Counters.BYTES_RECEIVED, "pypolycall_received_bytes", "bytes", "Frame bytes read"),
+)
+
+def _escape(value: Any) -> str:
+    """Escape a label value"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format(value: Any) -> str:
+    """Format a sample value"""
+    if isinstance(value, float):
+        return repr(value)
+    return str(int(value))
+
+class OpenMetricsWriter:
+    """Accumulates metric families in OpenMetrics text format"""
+
+    def __init__(self):
+        self._lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str, unit: Optional[str] = None) -> None:
+        """Start a metric family; its samples must follow before the next one"""
+        self._lines.append(f"# TYPE {name} {kind}")
+        if unit:
+            self._lines.append(f"# UNIT {name} {unit}")
+        self._lines.append(f"# HELP {name} {help_text}.")
+
+    def sample(self, name: str, value: Any, labels: Optional[Dict[str, Any]] = None) -> None:
+        """Add one sample line"""
+        if labels:
+            rendered = ",".join(f"{key}=\"{_escape(val)}\"" for key, val in labels.items())
+            self._lines.append(f"{name}{{{rendered}}} {_format(value)}")
+        else:
+            self._lines.append(f"{name} {_format(value)}")
+
+    def summary(self,
+                name: str,
+                histogram: Histogram,
+                scale: float = 1,
+                labels: Optional[Dict[str, Any]] = None) -> None:
+        """Add quantile, sum and count samples for a histogram"""
+        labels = labels or {}
+        if histogram.count:
+            for _name, fraction in PERCENTILES:
+                self.sample(
+                    name, histogram.percentile(fraction) * scale, {**labels, "quantile": fraction}
+                )
+        self.sample(f"{name}_sum", histogram.total * scale, labels)
+        self.sample(f"{name}_count", histogram.count, labels)
+
+    def render(self) -> bytes:
+        """Exposition text terminated by # EOF"""
+        return ("\n".join(self._lines) + "\n# EOF\n").encode("utf-8")
+
+class MetricsExporter:
+    """
+    OpenMetrics endpoint for Prometheus scrapes
+
+    RESPONSIBILITIES:
+    - Serve GET /metrics with asyncio.start_server, no extra dependencies
+    - Render MetricsCollector counters, latency, frame size, codec time
+      and state transitions
+    - Report in-flight requests, RTT and compression per binding
+    - Report BindingPool occupancy
+    - Cache the rendered text for cache_ttl seconds between scrapes
+    """
+
+    def __init__(self,
+                 metrics: MetricsCollector,
+                 pool: Optional[Any] = None,
+                 bindings: Iterable[Any] = (),
+                 host: str = DEFAULT_METRICS_HOST,
+                 port: int = DEFAULT_METRICS_PORT,
+                 cache_ttl: float = DEFAULT_CACHE_TTL):
+        """
+        Initialize Metrics Exporter
+
+        Args:
+            metrics: Collector to expose, e.g. ProtocolBinding.metrics
+            pool: BindingPool whose occupancy is reported
+            bindings: ProtocolBindings whose connections are reported
+            host: Interface to listen on
+            port: TCP port, 0 for any free port
+            cache_ttl: Seconds a render is reused for
+        """
+        self.metrics = metrics
+        self.pool = pool
+        self.bindings = list(bindings)
+        self.host = host
+        self.port = port
+        self.cache_ttl = cache_ttl
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._cache = b""
+        self._rendered_at: Optional[float] = None
+        self.renders = 0
+        self.scrapes = 0
+
+    @classmethod
+    def from_config(cls,
+                    config: Dict[str, Any],
+                    metrics: MetricsCollector,
+                    pool: Optional[Any] = None,
+                    bindings: Iterable[Any] = ()) -> "MetricsExporter":
+        """Create an exporter from the metrics_host and metrics_port settings or their env vars"""
+        port = config.get("metrics_port")
+        if port is None:
+            port = int(os.getenv(METRICS_PORT_ENV, DEFAULT_METRICS_PORT))
+        return cls(
+            metrics,
+            pool,
+            bindings,
+            host=config.get("metrics_host") or os.getenv(METRICS_HOST_ENV, DEFAULT_METRICS_HOST),
+            port=port,
+            cache_ttl=config.get("metrics_cache_ttl", DEFAULT_CACHE_TTL),
+        )
+
+    @staticmethod
+    def enabled(config: Dict[str, Any]) -> bool:
+        """Whether enable_metrics, or PYPOLYCALL_ENABLE_METRICS when it is unset, is true"""
+        enabled = config.get("enable_metrics")
+        if enabled is None:
+            return os.getenv(METRICS_ENABLED_ENV, "false").lower() == "true"
+        return bool(enabled)
+
+    @classmethod
+    async def serve(cls,
+                    config: Dict[str, Any],
+                    metrics: Optional[MetricsCollector],
+                    pool: Optional[Any] = None,
+                    bindings: Iterable[Any] = ()) -> Optional["MetricsExporter"]:
+        """
+        Start an exporter when the configuration enables one
+
+        Returns:
+            Optional[MetricsExporter]: The listening exporter, None when
+                metrics are disabled, not collected or the port is taken
+        """
+        if metrics is None or not cls.enabled(config):
+            return None
+        exporter = cls.from_config(config, metrics, pool, bindings)
+        try:
+            await exporter.start()
+        except OSError as e:
+            logger.error(f"Unable to serve metrics on {exporter.host}:{exporter.port}: {e}")
+            return None
+        return exporter
+
+    async def start(self) -> None:
+        """Start listening; port is updated when 0 was requested"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Serving OpenMetrics on http://{self.host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        """Stop listening"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MetricsExporter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def render(self) -> bytes:
+        """Exposition text, re-rendered at most once per cache_ttl"""
+        now = time.monotonic()
+        if self._rendered_at is None or now - self._rendered_at >= self.cache_ttl:
+            self._cache = self._render()
+            self._rendered_at = now
+            self.renders += 1
+        return self._cache
+
+    def _render(self) -> bytes:
+        writer = OpenMetricsWriter()
+        metrics = self.metrics
+
+        for slot, name, unit, help_text in _COUNTER_FAMILIES:
+            writer.family(name, "counter", help_text, unit)
+            writer.sample(f"{name}_total", metrics.counters[slot])
+
+        operations = metrics.operations()
+        writer.family("pypolycall_operation_requests", "counter", "Requests per operation")
+        for operation, stats in operations.items():
+            writer.sample("pypolycall_operation_requests_total", stats["requests"], {"operation": operation})
+        writer.family("pypolycall_operation_errors", "counter", "Errors per operation")
+        for operation, stats in operations.items():
+            writer.sample("pypolycall_operation_errors_total", stats["errors"], {"operation": operation})
+        writer.family(
+            "pypolycall_operation_latency_seconds", "summary", "Request round-trip time", "seconds"
+        )
+        for operation in operations:
+            writer.summary(
+                "pypolycall_operation_latency_seconds",
+                metrics.latency(operation), 1e-9, {"operation": operation},
+            )
+
+        writer.family("pypolycall_frame_size_bytes", "summary", "Frame size including header", "bytes")
+        writer.summary("pypolycall_frame_size_bytes", metrics.frames_sent, labels={"direction": "sent"})
+        writer.summary("pypolycall_frame_size_bytes", metrics.frames_received, labels={"direction": "received"})
+
+        writer.family("pypolycall_codec_seconds", "summary", "Payload codec time", "seconds")
+        writer.summary("pypolycall_codec_seconds", metrics.encode_time, 1e-9, {"direction": "encode"})
+        writer.summary("pypolycall_codec_seconds", metrics.decode_time, 1e-9, {"direction": "decode"})
+
+        writer.family("pypolycall_state_transitions", "counter", "Protocol state changes")
+        for (from_state, to_state), count in metrics.transitions().items():
+            writer.sample("pypolycall_state_transitions_total", count, {"from": from_state, "to": to_state})
+
+        self._render_bindings(writer)
+        if self.pool is not None:
+            self._render_pool(writer)
+        return writer.render()
+
+    def _render_bindings(self, writer: OpenMetricsWriter) -> None:
+        handlers = [
+            binding.protocol_handler for binding in self.bindings
+            if binding.protocol_handler is not None
+        ]
+        writer.family("pypolycall_in_flight", "gauge", "Requests awaiting a reply")
+        for handler in handlers:
+            writer.sample("pypolycall_in_flight", handler.in_flight, {"endpoint": handler.endpoint})
+        writer.family("pypolycall_rtt_seconds", "gauge", "Smoothed HEARTBEAT round-trip time", "seconds")
+        for handler in handlers:
+            if handler.rtt is not None:
+                writer.sample("pypolycall_rtt_seconds", handler.rtt, {"endpoint": handler.endpoint})
+        writer.family("pypolycall_heartbeat_missed", "counter", "HEARTBEATs that went unanswered")
+        for handler in handlers:
+            writer.sample(
+                "pypolycall_heartbeat_missed_total", handler.rtt_stats["missed"], {"endpoint": handler.endpoint}
+            )
+        writer.family("pypolycall_compression_seconds", "counter", "Compression CPU time", "seconds")
+        for handler in handlers:
+            stats = handler.compression_stats
+            for direction, key in (("compress", "compress_ns"), ("decompress", "decompress_ns")):
+                writer.sample(
+                    "pypolycall_compression_seconds_total", stats[key] / 1e9,
+                    {"endpoint": handler.endpoint, "direction": direction},
+                )
+        writer.family(
+            "pypolycall_compression_bytes", "counter",
+            "Payload bytes of compressed frames before (in) and after (out) compression", "bytes",
+        )
+        for handler in handlers:
+            stats = handler.compression_stats
+            for direction, key in (("in", "bytes_in"), ("out", "bytes_out")):
+                writer.sample(
+                    "pypolycall_compression_bytes_total", stats[key],
+                    {"endpoint": handler.endpoint, "direction": direction},
+                )
+        writer.family("pypolycall_compression_ratio", "gauge", "Uncompressed over compressed payload bytes")
+        for handler in handlers:
+            writer.sample(
+                "pypolycall_compression_ratio", handler.compression_stats["ratio"], {"endpoint": handler.endpoint}
+            )
+
+    def _render_pool(self, writer: OpenMetricsWriter) -> None:
+        stats = self.pool.get_stats()
+        for key, help_text in (
+            ("size", "Open pooled connections"),
+            ("max_size", "Pool connection limit"),
+            ("leases", "Leases held on pooled connections"),
+            ("idle", "Pooled connections without leases"),
+            ("waiters", "Callers waiting for a connection"),
+            ("in_flight", "Requests awaiting a reply across the pool"),
+        ):
+            writer.family(f"pypolycall_pool_{key}", "gauge", help_text)
+            writer.sample(f"pypolycall_pool_{key}", stats[key])
+        writer.family("pypolycall_pool_evictions", "counter", "Connections evicted by health checks")
+        writer.sample("pypolycall_pool_evictions_total", stats["evictions"])
+        writer.family("pypolycall_pool_rtt_seconds", "gauge", "Smoothed RTT per pooled connection", "seconds")
+        for index, rtt in enumerate(stats["rtt"]):
+            if rtt is not None:
+                writer.sample("pypolycall_pool_rtt_seconds", rtt, {"connection": index})
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer one HTTP request and close the connection"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            while True:
+                line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.split()
+            if len(parts) < 2 or parts[0] not in (b"GET", b"HEAD"):
+                status, body, content_type = "405 Method Not Allowed", b"", "text/plain"
+            elif parts[1].split(b"?", 1)[0] not in METRICS_PATHS:
+                status, body, content_type = "404 Not Found", b"", "text/plain"
+            else:
+                self.scrapes += 1
+                status, body, content_type = "200 OK", self.render(), CONTENT_TYPE
+
+            head = (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n"
+            ).encode("ascii")
+            writer.write(head if parts[:1] == [b"HEAD"] else head + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            logger.debug(f"Metrics request dropped: {e}")
+        finally:
+            writer.close()
+
+__all__ = [
+    "MetricsExporter",
+    "OpenMetricsWriter",
+    "DEFAULT_METRICS_PORT",
+    "CONTENT_TYPE",
+]
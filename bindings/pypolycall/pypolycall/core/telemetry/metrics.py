@@ -0,0 +1,288 @@
+"""
+Metrics Collector
+Fixed-memory counters and log-bucketed histograms for protocol telemetry
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+# Histogram resolution: 2**SUB_BUCKET_BITS linear sub-buckets per power of
+# two bounds the relative error of a reported percentile to 1/16
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Values at or above 2**MAX_VALUE_BITS land in the last bucket; in
+# nanoseconds that is about 18 minutes
+MAX_VALUE_BITS = 40
+MAX_VALUE = (1 << MAX_VALUE_BITS) - 1
+HISTOGRAM_BUCKETS = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+# Distinct operations tracked before new names share OTHER_OPERATION
+DEFAULT_MAX_OPERATIONS = 256
+OTHER_OPERATION = "_other"
+
+PERCENTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999))
+
+class Histogram:
+    """
+    Log-linear histogram of non-negative integers
+
+    Buckets are exact below SUB_BUCKETS and then split every power of two
+    into SUB_BUCKETS linear steps, HDR histogram style, so storage is one
+    fixed array and record() only touches integers.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * HISTOGRAM_BUCKETS))
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every sample"""
+        for index in range(HISTOGRAM_BUCKETS):
+            self.counts[index] = 0
+        self.count = 0
+        self.total = 0
+        self.min = MAX_VALUE
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        """Add one sample"""
+        if value < 0:
+            value = 0
+        elif value > MAX_VALUE:
+            value = MAX_VALUE
+
+        if value < SUB_BUCKETS:
+            index = value
+        else:
+            shift = value.bit_length() - SUB_BUCKET_BITS - 1
+            index = (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+        self.counts[index] += 1
+
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @staticmethod
+    def bucket_upper_bound(index: int) -> int:
+        """Largest value recorded into a bucket"""
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        top = SUB_BUCKETS + index % SUB_BUCKETS
+        return ((top + 1) << shift) - 1
+
+    def percentile(self, fraction: float) -> Optional[int]:
+        """
+        Value below which the given fraction of samples fall
+
+        Args:
+            fraction: Quantile in (0, 1]
+
+        Returns:
+            Optional[int]: Upper bound of the bucket holding that rank,
+                clamped to the observed range; None before any sample
+        """
+        if not self.count:
+            return None
+
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return max(self.min, min(self.bucket_upper_bound(index), self.max))
+        return self.max
+
+    def as_dict(self, scale: float = 1.0) -> Dict[str, Any]:
+        """
+        Snapshot of count, range, mean and percentiles
+
+        Args:
+            scale: Factor applied to every value, e.g. 1e-9 for ns to seconds
+        """
+        if not self.count:
+            return {"count": 0}
+
+        snapshot = {
+            "count": self.count,
+            "sum": self.total * scale,
+            "min": self.min * scale,
+            "max": self.max * scale,
+            "mean": self.total / self.count * scale,
+        }
+        for name, fraction in PERCENTILES:
+            snapshot[name] = self.percentile(fraction) * scale
+        return snapshot
+
+class Counters:
+    """Slots of MetricsCollector.counters"""
+    REQUESTS = 0
+    RESPONSES = 1
+    ERRORS = 2
+    FRAMES_SENT = 3
+    FRAMES_RECEIVED = 4
+    BYTES_SENT = 5
+    BYTES_RECEIVED = 6
+    STATE_TRANSITIONS = 7
+
+    NAMES = (
+        "requests",
+        "responses",
+        "errors",
+        "frames_sent",
+        "frames_received",
+        "bytes_sent",
+        "bytes_received",
+        "state_transitions",
+    )
+
+class MetricsCollector:
+    """
+    Metrics collection for telemetry
+
+    RESPONSIBILITIES:
+    - Global counters in one fixed array
+    - Per-operation request, error and latency accounting
+    - Outbound and inbound frame size histograms
+    - Payload encode and decode time histograms
+    - State transition counts
+
+    Every record_* method is synchronous and only updates preallocated
+    arrays, so it can be called inline on the request path. Memory is
+    bounded by max_operations; further operation names are accounted
+    under OTHER_OPERATION.
+    """
+
+    def __init__(self, max_operations: int = DEFAULT_MAX_OPERATIONS):
+        """
+        Initialize Metrics Collector
+
+        Args:
+            max_operations: Distinct operation names tracked individually
+        """
+        self.max_operations = max(1, max_operations)
+        self.counters = array("Q", bytes(8 * len(Counters.NAMES)))
+        self.frames_sent = Histogram()
+        self.frames_received = Histogram()
+        self.encode_time = Histogram()
+        self.decode_time = Histogram()
+
+        # Operation slot 0 is OTHER_OPERATION; histograms are created with
+        # their slot so recording never allocates
+        self._operations: Dict[str, int] = {OTHER_OPERATION: 0}
+        self._requests = array("Q", bytes(8 * (self.max_operations + 1)))
+        self._errors = array("Q", bytes(8 * (self.max_operations + 1)))
+        self._latencies = [Histogram()]
+        self._transitions: Dict[Tuple[str, str], int] = {}
+
+    def _slot(self, operation: str) -> int:
+        """Array slot of an operation, assigned on first use"""
+        slot = self._operations.get(operation)
+        if slot is None:
+            if len(self._operations) > self.max_operations:
+                return 0
+            slot = len(self._operations)
+            self._operations[operation] = slot
+            self._latencies.append(Histogram())
+        return slot
+
+    def record_request(self, operation: str) -> None:
+        """Count a request about to be sent"""
+        self.counters[Counters.REQUESTS] += 1
+        self._requests[self._slot(operation)] += 1
+
+    def record_response(self, operation: str, latency_ns: int) -> None:
+        """Count a reply and record its latency in nanoseconds"""
+        self.counters[Counters.RESPONSES] += 1
+        self._latencies[self._slot(operation)].record(latency_ns)
+
+    def record_error(self, operation: str) -> None:
+        """Count an ERROR reply, timeout or connection failure"""
+        self.counters[Counters.ERRORS] += 1
+        self._errors[self._slot(operation)] += 1
+
+    def record_frame_sent(self, size: int) -> None:
+        """Count an outbound frame of size bytes"""
+        self.counters[Counters.FRAMES_SENT] += 1
+        self.counters[Counters.BYTES_SENT] += size
+        self.frames_sent.record(size)
+
+    def record_frame_received(self, size: int) -> None:
+        """Count an inbound frame of size bytes"""
+        self.counters[Counters.FRAMES_RECEIVED] += 1
+        self.counters[Counters.BYTES_RECEIVED] += size
+        self.frames_received.record(size)
+
+    def record_encode(self, elapsed_ns: int) -> None:
+        """Record the time spent encoding one payload"""
+        self.encode_time.record(elapsed_ns)
+
+    def record_decode(self, elapsed_ns: int) -> None:
+        """Record the time spent decoding one payload"""
+        self.decode_time.record(elapsed_ns)
+
+    def record_state_transition(self, from_state: str, to_state: str, count: int = 1) -> None:
+        """Count a state change, or count of them applied as one batch"""
+        self.counters[Counters.STATE_TRANSITIONS] += count
+        key = (from_state, to_state)
+        self._transitions[key] = self._transitions.get(key, 0) + count
+
+    def latency(self, operation: str) -> Optional[Histogram]:
+        """Latency histogram of an operation in nanoseconds, None if never seen"""
+        slot = self._operations.get(operation)
+        return None if slot is None else self._latencies[slot]
+
+    def operations(self) -> Dict[str, Dict[str, Any]]:
+        """Per-operation requests, errors and latency in seconds"""
+        return {
+            operation: {
+                "requests": self._requests[slot],
+                "errors": self._errors[slot],
+                "latency": self._latencies[slot].as_dict(1e-9),
+            }
+            for operation, slot in self._operations.items()
+            if self._requests[slot] or self._errors[slot] or self._latencies[slot].count
+        }
+
+    def transitions(self) -> Dict[Tuple[str, str], int]:
+        """State transition counts keyed by (from_state, to_state)"""
+        return dict(self._transitions)
+
+    def get_current_metrics(self) -> Dict[str, Any]:
+        """Get collected metrics"""
+        return {
+            "counters": dict(zip(Counters.NAMES, self.counters)),
+            "operations": self.operations(),
+            "frames_sent": self.frames_sent.as_dict(),
+            "frames_received": self.frames_received.as_dict(),
+            "encode_time": self.encode_time.as_dict(1e-9),
+            "decode_time": self.decode_time.as_dict(1e-9),
+            "state_transitions": {
+                f"{from_state}->{to_state}": count
+                for (from_state, to_state), count in self._transitions.items()
+            },
+        }
+
+    def reset(self) -> None:
+        """Zero every counter and histogram, keeping operation slots"""
+        for array_ in (self.counters, self._requests, self._errors):
+            for index in range(len(array_)):
+                array_[index] = 0
+        for histogram in (self.frames_sent, self.frames_received,
+                          self.encode_time, self.decode_time, *self._latencies):
+            histogram.reset()
+        self._transitions.clear()
+
+__all__ = [
+    "Histogram",
+    "Counters",
+    "MetricsCollector",
+    "OTHER_OPERATION",
+    "DEFAULT_MAX_OPERATIONS",
+]
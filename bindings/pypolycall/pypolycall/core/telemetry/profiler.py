@@ -0,0 +1,280 @@
+"""
+Sampling Profiler
+Phase-attributed stack sampling of the binding event loop thread
+"""
+
+import collections
+import contextlib
+import inspect
+import logging
+import os
+import sys
+import sysconfig
+import threading
+from types import CodeType, FrameType
+from typing import AbstractSet, Counter, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.001
+
+PHASES = ("encode", "checksum", "write", "wait", "decode", "callback", "other")
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + os.sep
+_PROTOCOL_DIR = os.path.join(_PACKAGE_DIR, "core", "protocol") + os.sep
+_STDLIB_DIRS = tuple({sysconfig.get_paths()[key] + os.sep for key in ("stdlib", "platstdlib")})
+_SITE_DIRS = tuple({sysconfig.get_paths()[key] + os.sep for key in ("purelib", "platlib")})
+
+# (file, function) -> phase, checked from the innermost frame outwards;
+# a function of None matches the whole file
+_PHASE_RULES: Dict[Tuple[str, Optional[str]], str] = {
+    ("checksum.py", None): "checksum",
+    ("codecs.py", "encode"): "encode",
+    ("codecs.py", "decode"): "decode",
+    ("compression.py", "compress"): "encode",
+    ("compression.py", "decompress"): "decode",
+    ("messages.py", "encode_payload"): "encode",
+    ("messages.py", "build"): "encode",
+    ("messages.py", "decode_payload"): "decode",
+    ("messages.py", "parse_header"): "decode",
+    ("messages.py", "verify"): "decode",
+    ("messages.py", "buffer_updated"): "decode",
+    ("messages.py", "_drain"): "decode",
+    ("handler.py", "_encode"): "encode",
+    ("handler.py", "_on_frame"): "decode",
+    ("transport.py", "send"): "write",
+    ("transport.py", "send_many"): "write",
+    ("transport.py", "drain"): "write",
+    ("shm.py", "send"): "write",
+    ("shm.py", "send_many"): "write",
+    ("shm.py", "write"): "write",
+}
+
+# The asyncio loop's dispatch frame and the frame it runs each callback
+# from; the loop is idle when the first is reached without the second
+_RUN_ONCE = ("base_events.py", "_run_once")
+_HANDLE_RUN = ("events.py", "_run")
+
+_COROUTINE_FLAGS = inspect.CO_COROUTINE | inspect.CO_ITERABLE_COROUTINE | inspect.CO_ASYNC_GENERATOR
+
+def _loop_entry(frame: Optional[FrameType]) -> Optional[CodeType]:
+    """
+    Code of the frame a native event loop (uvloop) runs coroutines from
+
+    A native loop has no Python dispatch frame: coroutines link straight
+    back to the frame that called run_forever() or run_until_complete(),
+    which is then the innermost frame whenever the loop is idle.
+
+    Returns:
+        Optional[CodeType]: None for a stack without coroutines or one
+            driven by the asyncio loop
+    """
+    outermost = None
+    while frame is not None:
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) == _RUN_ONCE:
+            return None
+        if code.co_flags & _COROUTINE_FLAGS:
+            outermost = frame
+        frame = frame.f_back
+    if outermost is None or outermost.f_back is None:
+        return None
+    return outermost.f_back.f_code
+
+def _idle(stack: Tuple[CodeType, ...], loop_entries: AbstractSet[CodeType]) -> bool:
+    """Whether a sampled stack is an event loop waiting for events"""
+    for code in stack:
+        location = (os.path.basename(code.co_filename), code.co_name)
+        if location == _HANDLE_RUN:
+            return False
+        if location == _RUN_ONCE:
+            return True
+    return stack[0] in loop_entries or os.path.basename(stack[0].co_filename) == "selectors.py"
+
+def classify(stack: Tuple[CodeType, ...], loop_entries: AbstractSet[CodeType] = frozenset()) -> str:
+    """
+    Attribute a sampled stack to a request phase
+
+    Args:
+        stack: Code objects, innermost first
+        loop_entries: Codes that enter a native event loop, see _loop_entry
+
+    Returns:
+        str: One of PHASES. "wait" is an idle loop, either the asyncio
+            loop in _run_once outside any callback or a native loop back in
+            the frame that entered it; "callback" is code outside the
+            binding and the stdlib running on the loop, "other" is the
+            remaining loop and binding overhead
+    """
+    for code in stack:
+        filename = code.co_filename
+        if filename.startswith(_PROTOCOL_DIR):
+            basename = os.path.basename(filename)
+            phase = _PHASE_RULES.get((basename, code.co_name)) or _PHASE_RULES.get((basename, None))
+            if phase is not None:
+                return phase
+
+    if _idle(stack, loop_entries):
+        return "wait"
+    leaf = stack[0].co_filename
+    if leaf.startswith(_PACKAGE_DIR) or leaf.startswith("<"):
+        return "other"
+    if leaf.startswith(_STDLIB_DIRS) and not leaf.startswith(_SITE_DIRS):
+        return "other"
+    return "callback"
+
+def _frame_label(code: CodeType) -> str:
+    label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label.replace(";", ":")
+
+class SamplingProfiler:
+    """
+    Statistical profiler for one thread
+
+    RESPONSIBILITIES:
+    - Sample the target thread's stack from a timer thread through
+      sys._current_frames, without tracing hooks on the hot path
+    - Attribute samples to encode, checksum, write, wait, decode and
+      callback phases, telling idle time apart on both the asyncio loop
+      and native loops such as uvloop
+    - Write collapsed-stack output for flamegraph.pl, speedscope or
+      inferno, with the phase as the root frame
+
+    The sampler needs the GIL to read frames, so while it runs the
+    interpreter switch interval is lowered to a fraction of the sampling
+    interval; otherwise samples would only land where the target thread
+    blocks in a system call.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_id: Optional[int] = None):
+        """
+        Initialize Sampling Profiler
+
+        Args:
+            interval: Seconds between samples
+            thread_id: Thread to sample, e.g. EventLoopThread.thread_id;
+                the thread calling start() by default
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self._stacks: Counter[Tuple[CodeType, ...]] = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval: Optional[float] = None
+        self._loop_entries: Set[CodeType] = set()
+
+    def start(self) -> None:
+        """Start sampling"""
+        if self._thread is not None:
+            return
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        if self.thread_id == threading.get_ident():
+            entry = _loop_entry(sys._getframe())
+            if entry is not None:
+                self._loop_entries.add(entry)
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 4))
+        self._thread = threading.Thread(
+            target=self._sample, name="pypolycall-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the timer thread"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        sys.setswitchinterval(self._switch_interval)
+        self._switch_interval = None
+        logger.debug(f"Profiler collected {self.samples} samples")
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _sample(self) -> None:
+        stacks = self._stacks
+        thread_id = self.thread_id
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            entry = _loop_entry(frame)
+            if entry is not None:
+                self._loop_entries.add(entry)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                stacks[tuple(stack)] += 1
+
+    def _snapshot(self) -> List[Tuple[Tuple[CodeType, ...], int]]:
+        """Sampled stacks, safe to read while the sampler is running"""
+        return list(self._stacks.copy().items())
+
+    @property
+    def samples(self) -> int:
+        """Number of stacks sampled"""
+        return sum(count for _stack, count in self._snapshot())
+
+    def phases(self) -> Dict[str, int]:
+        """Sample counts per phase, in PHASES order"""
+        counts = dict.fromkeys(PHASES, 0)
+        loop_entries = frozenset(self._loop_entries)
+        for stack, count in self._snapshot():
+            counts[classify(stack, loop_entries)] += count
+        return counts
+
+    def collapsed(self) -> List[str]:
+        """Collapsed stacks, "phase;outer;...;inner count" per line"""
+        lines: Counter[str] = collections.Counter()
+        loop_entries = frozenset(self._loop_entries)
+        for stack, count in self._snapshot():
+            frames = ";".join(_frame_label(code) for code in reversed(stack))
+            lines[f"{classify(stack, loop_entries)};{frames}"] += count
+        return [f"{stack} {count}" for stack, count in sorted(lines.items())]
+
+    def write_collapsed(self, path: str) -> None:
+        """Write collapsed stacks to a file"""
+        with open(path, "w", encoding="utf-8") as output:
+            for line in self.collapsed():
+                output.write(line + "\n")
+
+    def reset(self) -> None:
+        """Discard collected samples"""
+        self._stacks.clear()
+
+@contextlib.contextmanager
+def profile(output: Optional[str] = None,
+            interval: float = DEFAULT_INTERVAL,
+            thread_id: Optional[int] = None) -> Iterator[SamplingProfiler]:
+    """
+    Sample a workload for the duration of a with block
+
+    Works with async code too: the sampler is a thread, so the block may
+    await binding calls running on the same loop.
+
+    Args:
+        output: Collapsed-stack file written on exit
+        interval: Seconds between samples
+        thread_id: Thread to sample, the current thread by default
+
+    Yields:
+        SamplingProfiler: The running profiler
+    """
+    profiler = SamplingProfiler(interval, thread_id)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        if output is not None:
+            profiler.write_collapsed(output)
+
+__all__ = ["SamplingProfiler", "profile", "classify", "PHASES", "DEFAULT_INTERVAL"]
@@ -0,0 +1,218 @@
+"""
+Slow Operation Log
+Per-phase traces of calls over their latency threshold, as rotating JSONL
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fallback for the slow_log_path setting
+SLOW_LOG_ENV = "PYPOLYCALL_SLOW_LOG"
+
+DEFAULT_SLOW_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_SLOW_LOG_BACKUP_COUNT = 5
+# Entries waiting for the writer thread before new ones are dropped
+DEFAULT_SLOW_LOG_QUEUE = 1024
+
+# Phase name -> (start mark, end mark) on CallTrace
+TRACE_PHASES = (
+    ("encode", "started", "encoded"),
+    ("queue", "encoded", "acquired"),
+    ("write", "acquired", "written"),
+    ("wait", "written", "received"),
+    ("decode", "received", "decoded"),
+)
+
+class CallTrace:
+    """
+    Phase timestamps of one call, in perf_counter_ns
+
+    The handler stamps each mark as the call passes it: encoded once the
+    payload is serialized, acquired once an in-flight slot is free,
+    written once the frame is handed to the transport, received and
+    decoded around reply decoding in the frame callback. Marks a failed
+    call never reached stay None.
+    """
+
+    __slots__ = (
+        "started", "encoded", "acquired", "written", "received", "decoded",
+        "sequence", "request_bytes", "reply_bytes",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter_ns()
+        self.encoded: Optional[int] = None
+        self.acquired: Optional[int] = None
+        self.written: Optional[int] = None
+        self.received: Optional[int] = None
+        self.decoded: Optional[int] = None
+        self.sequence: Optional[int] = None
+        self.request_bytes: Optional[int] = None
+        self.reply_bytes: Optional[int] = None
+
+    def phases(self, finished: int) -> Dict[str, Optional[float]]:
+        """
+        Seconds spent in each phase
+
+        Args:
+            finished: perf_counter_ns when the caller resumed
+
+        Returns:
+            Dict[str, Optional[float]]: encode, queue, write, wait and
+                decode durations, None for phases not completed, plus
+                resume, the delay between the reply being decoded and the
+                caller running again on the loop
+        """
+        phases = {}
+        for name, start, end in TRACE_PHASES:
+            start_ns = getattr(self, start)
+            end_ns = getattr(self, end)
+            phases[name] = None if start_ns is None or end_ns is None else (end_ns - start_ns) / 1e9
+        phases["resume"] = None if self.decoded is None else (finished - self.decoded) / 1e9
+        return phases
+
+class _JSONLineFormatter(logging.Formatter):
+    """Serialize the entry dict carried as a record's msg"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, separators=(",", ":"), default=str)
+
+class SlowOperationLog:
+    """
+    Slow call capture
+
+    RESPONSIBILITIES:
+    - Turn a CallTrace over its threshold into one JSON line with the
+      sequence number, payload sizes, codec, connection and phase times
+    - Serialize and write entries on a background thread so the event
+      loop only pays for building a dict and a queue put
+    - Rotate the file at max_bytes, keeping backup_count old files
+    - Drop entries, counting them, rather than block when the writer
+      falls behind
+    """
+
+    def __init__(self,
+                 path: str,
+                 max_bytes: int = DEFAULT_SLOW_LOG_MAX_BYTES,
+                 backup_count: int = DEFAULT_SLOW_LOG_BACKUP_COUNT,
+                 max_pending: int = DEFAULT_SLOW_LOG_QUEUE):
+        """
+        Initialize Slow Operation Log
+
+        Args:
+            path: JSONL file to append to
+            max_bytes: File size that triggers a rotation
+            backup_count: Rotated files kept as path.1 .. path.N
+            max_pending: Entries queued for the writer before dropping
+        """
+        self.path = path
+        self.max_pending = max_pending
+        self.recorded = 0
+        self.dropped = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+        self._handler.setFormatter(_JSONLineFormatter())
+        self._queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._listener: Optional[logging.handlers.QueueListener] = logging.handlers.QueueListener(
+            self._queue, self._handler
+        )
+        self._listener.start()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SlowOperationLog"]:
+        """
+        Create a log from the slow_log_* settings
+
+        slow_log_path falls back to PYPOLYCALL_SLOW_LOG; None is returned
+        when neither is set.
+        """
+        path = config.get("slow_log_path") or os.getenv(SLOW_LOG_ENV)
+        if not path:
+            return None
+        return cls(
+            path,
+            max_bytes=config.get("slow_log_max_bytes", DEFAULT_SLOW_LOG_MAX_BYTES),
+            backup_count=config.get("slow_log_backup_count", DEFAULT_SLOW_LOG_BACKUP_COUNT),
+        )
+
+    def record(self,
+               operation: str,
+               trace: CallTrace,
+               threshold: float,
+               codec: str,
+               connection: str,
+               error: Optional[BaseException] = None) -> None:
+        """
+        Queue one slow call for writing
+
+        Args:
+            operation: Operation name
+            trace: Phase marks of the call
+            threshold: Threshold in seconds the call exceeded
+            codec: Payload codec of the connection
+            connection: Endpoint the call was sent to
+            error: Exception the call failed with, if any
+        """
+        finished = time.perf_counter_ns()
+        if self._listener is None:
+            return
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+
+        entry = {
+            "timestamp": time.time(),
+            "operation": operation,
+            "sequence": trace.sequence,
+            "duration": (finished - trace.started) / 1e9,
+            "threshold": threshold,
+            "request_bytes": trace.request_bytes,
+            "reply_bytes": trace.reply_bytes,
+            "codec": codec,
+            "connection": connection,
+            "phases": trace.phases(finished),
+        }
+        if error is not None:
+            entry["error"] = str(error) or type(error).__name__
+        self.recorded += 1
+        self._queue.put_nowait(logging.makeLogRecord({"msg": entry}))
+
+    def close(self) -> None:
+        """Write queued entries and close the file"""
+        listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        listener.stop()
+        self._handler.close()
+        logger.debug(f"Slow operation log {self.path} closed after {self.recorded} entries")
+
+    def __enter__(self) -> "SlowOperationLog":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Entries recorded and dropped"""
+        return {"path": self.path, "recorded": self.recorded, "dropped": self.dropped}
+
+__all__ = [
+    "SlowOperationLog",
+    "CallTrace",
+    "TRACE_PHASES",
+    "SLOW_LOG_ENV",
+    "DEFAULT_SLOW_LOG_MAX_BYTES",
+    "DEFAULT_SLOW_LOG_BACKUP_COUNT",
+]
@@ -0,0 +1,50 @@
+"""
+Exception Hierarchy
+Clean exception handling for PyPolyCall architecture
+"""
+
+class PyPolyCallError(Exception):
+    """Base exception for PyPolyCall"""
+    pass
+
+class ProtocolError(PyPolyCallError):
+    """Protocol-related errors"""
+    pass
+
+class RuntimeError(PyPolyCallError):
+    """Runtime connection and execution errors"""
+    pass
+
+class ConfigurationError(PyPolyCallError):
+    """Configuration-related errors"""
+    pass
+
+class ValidationError(PyPolyCallError):
+    """Input validation errors"""
+    pass
+
+class TelemetryError(PyPolyCallError):
+    """Telemetry collection errors"""
+    pass
+
+class FFIError(PyPolyCallError):
+    """FFI bridge errors"""
+    pass
+
+class StateError(PyPolyCallError):
+    """State machine errors, carrying the polycall_sm_status_t code"""
+    
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+__all__ = [
+    "PyPolyCallError",
+    "ProtocolError", 
+    "RuntimeError",
+    "ConfigurationError",
+    "ValidationError",
+    "TelemetryError",
+    "FFIError",
+    "StateError"
+]
@@ -17,6 +17,12 @@ class Validator:
         if not host or not isinstance(host, str):
             raise ValidationError("Host must be a non-empty string")
         
+        # unix:///path/to/polycall.sock selects the Unix domain socket transport
+        if host.startswith("unix://"):
+            if not host[len("unix://"):].startswith("/"):
+                raise ValidationError(f"Unix socket endpoint needs an absolute path: {host}")
+            return
+        
         if not re.match(r'^[a-zA-Z0-9.-]+$', host):
             raise ValidationError(f"Invalid host format: {host}")
     
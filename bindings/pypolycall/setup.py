@@ -77,6 +77,10 @@ setup(
             "cryptography>=41.0.0",
             "pycryptodome>=3.18.0",
         ],
+        "speedups": [
+            "numpy>=1.20.0",
+            "uvloop>=0.17.0; sys_platform != 'win32'",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -4,6 +4,7 @@ PyPolyCall Test Setup
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
 import os
 
@@ -26,3 +27,185 @@ def polycall_config():
         "port": POLYCALL_TEST_PORT,
         "timeout": 5.0
     }
+
+class FakeRuntime:
+    """Minimal polycall.exe stand-in speaking the framed protocol"""
+    
+    def __init__(self):
+        self.received = []
+        self.server = None
+        
+        # Codec names this runtime accepts during HANDSHAKE; None replies
+        # without a codec extension like a legacy runtime
+        self.codecs = ["msgpack", "json"]
+        
+        # Accept COMPRESSED at HANDSHAKE and compress replies in kind
+        self.compression = False
+        
+        # When > 0, hold COMMAND replies until this many are queued and
+        # then send them in reverse order
+        self.hold_replies = 0
+        self._held = []
+        
+        # Close the connection instead of answering the next N COMMANDs
+        self.drop_commands = 0
+        
+        # Leave the next N HEARTBEATs unanswered, like a half-open socket
+        self.ignore_heartbeats = 0
+        self._writers = set()
+    
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+    
+    async def start_unix(self, path):
+        """Listen on a Unix domain socket at path, returning its unix:// URL"""
+        self.server = await asyncio.start_unix_server(self._serve, path)
+        return f"unix://{path}"
+    
+    async def start_shm(self, path):
+        """Serve the shared-memory transport on a UNIX socket at path"""
+        from pypolycall.core.protocol.shm import start_shm_server
+        
+        self.server = await start_shm_server(self._serve, path)
+        return path
+    
+    async def stop(self):
+        self.server.close()
+        self.disconnect_clients()
+        await self.server.wait_closed()
+    
+    def disconnect_clients(self):
+        """Drop every client connection without a goodbye"""
+        for writer in list(self._writers):
+            writer.transport.abort()
+    
+    async def _serve(self, reader, writer):
+        from pypolycall.core.protocol import MessageBuilder, MessageParser, MessageTypes, MessageFlags
+        from pypolycall.core.protocol.compression import Compressor
+        from pypolycall.core.protocol.messages import HEADER_SIZE
+        
+        builder = MessageBuilder()
+        parser = MessageParser()
+        compressor = Compressor(threshold=64)
+        compress_replies = False
+        self._writers.add(writer)
+        
+        try:
+            while True:
+                header = parser.parse_header(await reader.readexactly(HEADER_SIZE))
+                payload = await reader.readexactly(header.payload_length)
+                parser.verify(header, payload)
+                self.received.append((header, payload))
+                
+                if self.drop_commands and header.type == MessageTypes.COMMAND:
+                    self.drop_commands -= 1
+                    break
+                if self.ignore_heartbeats and header.type == MessageTypes.HEARTBEAT:
+                    self.ignore_heartbeats -= 1
+                    continue
+                
+                if header.flags & MessageFlags.COMPRESSED:
+                    payload = compressor.decompress(payload, parser.max_payload_size)
+                
+                reply_type, reply = self.reply(builder, parser, header, payload)
+                
+                reply_flags = MessageFlags.NONE
+                if header.type == MessageTypes.HANDSHAKE:
+                    compress_replies = bool(
+                        parser.parse_handshake(reply).flags & MessageFlags.COMPRESSED
+                    )
+                elif compress_replies:
+                    reply, compressed = compressor.compress(reply)
+                    if compressed:
+                        reply_flags = MessageFlags.COMPRESSED
+                
+                frame = builder.build(reply_type, reply, reply_flags, sequence=header.sequence)
+                
+                if self.hold_replies and header.type == MessageTypes.COMMAND:
+                    self._held.append(frame)
+                    if len(self._held) < self.hold_replies:
+                        continue
+                    frames, self._held = self._held[::-1], []
+                else:
+                    frames = [frame]
+                
+                writer.writelines(frames)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+    
+    def reply(self, builder, parser, header, payload):
+        """Build the (type, payload) answer to one request frame"""
+        from pypolycall.core.protocol import MessageTypes, MessageFlags, default_registry
+        
+        if header.type == MessageTypes.HANDSHAKE:
+            handshake = parser.parse_handshake(payload)
+            flags = handshake.flags & MessageFlags.COMPRESSED if self.compression else 0
+            if self.codecs is None:
+                return MessageTypes.HANDSHAKE, builder.handshake_payload(flags)
+            
+            offered = handshake.codecs
+            accepted = [default_registry.get(name).codec_id for name in self.codecs
+                        if name in default_registry.available()]
+            codec = default_registry.negotiate(i for i in offered if i in accepted)
+            builder.codec = parser.codec = codec
+            return MessageTypes.HANDSHAKE, builder.handshake_payload(flags, [codec.codec_id])
+        
+        if header.type == MessageTypes.HEARTBEAT:
+            return MessageTypes.HEARTBEAT, payload
+        
+        if payload.startswith(b"RAW:"):
+            return MessageTypes.RESPONSE, payload[::-1]
+        
+        request = parser.decode_payload(payload)
+        if header.type == MessageTypes.AUTH:
+            return MessageTypes.RESPONSE, builder.encode_payload({"authenticated": True})
+        
+        if request.get("operation") == "fail":
+            return MessageTypes.ERROR, builder.encode_payload({"error": "requested failure"})
+        
+        return MessageTypes.RESPONSE, builder.encode_payload({
+            "status": "success",
+            "operation": request["operation"],
+            "params": request["params"],
+        })
+
+@pytest.fixture
+def threaded_runtime():
+    """Run a FakeRuntime on its own loop thread, for blocking clients"""
+    from pypolycall.core.sync import EventLoopThread
+    
+    loop_thread = EventLoopThread(name="fake-runtime")
+    runtime = FakeRuntime()
+    runtime.port = loop_thread.run(runtime.start())
+    yield runtime
+    loop_thread.run(runtime.stop())
+    loop_thread.stop()
+
+@pytest_asyncio.fixture
+async def unix_runtime(tmp_path):
+    """Run a FakeRuntime on a Unix domain socket"""
+    runtime = FakeRuntime()
+    runtime.url = await runtime.start_unix(str(tmp_path / "polycall.sock"))
+    yield runtime
+    await runtime.stop()
+
+@pytest_asyncio.fixture
+async def shm_runtime(tmp_path):
+    """Run a FakeRuntime behind the shared-memory transport"""
+    runtime = FakeRuntime()
+    runtime.path = await runtime.start_shm(str(tmp_path / "polycall.sock"))
+    yield runtime
+    await runtime.stop()
+
+@pytest_asyncio.fixture
+async def polycall_runtime():
+    """Run a FakeRuntime on an ephemeral loopback port"""
+    runtime = FakeRuntime()
+    runtime.port = await runtime.start()
+    yield runtime
+    await runtime.stop()
@@ -4,15 +4,20 @@ Protocol Binding Integration Tests
 
 import pytest
 import asyncio
+import json
 from pypolycall.core.binding import ProtocolBinding
+from pypolycall.exceptions import ProtocolError, RuntimeError as PyPolyCallRuntimeError
 
 class TestProtocolBindingIntegration:
     """Test protocol binding integration"""
     
     @pytest.mark.asyncio
-    async def test_binding_lifecycle(self):
+    async def test_binding_lifecycle(self, polycall_runtime):
         """Test complete binding lifecycle"""
-        binding = ProtocolBinding()
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port
+        )
         
         # Test connection
         connected = await binding.connect()
@@ -28,6 +33,7 @@ class TestProtocolBindingIntegration:
         result = await binding.execute_operation("test_op", {"param": "value"})
         assert result is not None
         assert result["status"] == "success"
+        assert result["params"] == {"param": "value"}
         
         # Test shutdown
         await binding.shutdown()
@@ -45,3 +51,474 @@ class TestProtocolBindingIntegration:
         assert binding.polycall_port == 9999
         assert not binding.is_connected
         assert not binding.is_authenticated
+
+    @pytest.mark.asyncio
+    async def test_runtime_error_frame(self, polycall_runtime):
+        """Test ERROR replies surface as ProtocolError"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        with pytest.raises(ProtocolError):
+            await binding.execute_operation("fail", {})
+        
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_connect_without_runtime(self, unused_tcp_port):
+        """Test connection failure when no runtime is listening"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=unused_tcp_port
+        )
+        
+        assert await binding.connect() == False
+        assert not binding.is_connected
+    
+    @pytest.mark.asyncio
+    async def test_pipelined_operations(self, polycall_runtime):
+        """Test many in-flight operations share one connection"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        # Replies only flow once all requests are in flight, newest first
+        polycall_runtime.hold_replies = 20
+        results = await asyncio.gather(*[
+            binding.execute_operation("op", {"index": i}) for i in range(20)
+        ])
+        
+        assert [r["params"]["index"] for r in results] == list(range(20))
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_pending_fail_on_shutdown(self, polycall_runtime):
+        """Test outstanding operations fail when the connection closes"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        polycall_runtime.hold_replies = 10
+        pending = asyncio.ensure_future(binding.execute_operation("op", {}))
+        await asyncio.sleep(0.05)
+        await binding.shutdown()
+        
+        with pytest.raises(PyPolyCallRuntimeError):
+            await pending
+    
+    @pytest.mark.asyncio
+    async def test_execute_many(self, polycall_runtime):
+        """Test batched operations are written together and returned in order"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={"max_in_flight": 8}
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        operations = [("op", {"index": i}) for i in range(20)]
+        results = await binding.execute_many(operations)
+        assert [r["params"]["index"] for r in results] == list(range(20))
+        
+        results = await binding.execute_many(
+            [("op", {}), ("fail", {}), ("op", {})], return_exceptions=True
+        )
+        assert isinstance(results[1], ProtocolError)
+        assert results[2]["status"] == "success"
+        
+        with pytest.raises(ProtocolError):
+            await binding.execute_many([("op", {}), ("fail", {})])
+        
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_operation_batcher(self, polycall_runtime):
+        """Test the auto-batcher coalesces concurrent submissions"""
+        from pypolycall.core.batching import OperationBatcher
+        
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        batcher = OperationBatcher(binding, max_batch_size=10, max_delay=0.01)
+        results = await asyncio.gather(
+            *[batcher.submit("op", {"index": i}) for i in range(25)],
+            batcher.submit("fail", {}),
+            return_exceptions=True
+        )
+        
+        assert [r["params"]["index"] for r in results[:25]] == list(range(25))
+        assert isinstance(results[25], ProtocolError)
+        assert batcher.batches_sent == 3
+        assert batcher.operations_sent == 26
+        
+        await batcher.close()
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("runtime_codecs,expected", [
+        (["msgpack", "json"], "msgpack"),
+        (["json"], "json"),
+        (None, "json"),
+    ])
+    async def test_codec_negotiation(self, polycall_runtime, runtime_codecs, expected):
+        """Test the codec agreed at HANDSHAKE carries operations"""
+        if expected == "msgpack":
+            pytest.importorskip("msgpack")
+        
+        polycall_runtime.codecs = runtime_codecs
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        assert binding._protocol_handler.codec == expected
+        result = await binding.execute_operation("op", {"nested": {"list": [1, 2]}})
+        assert result["params"] == {"nested": {"list": [1, 2]}}
+        
+        assert await binding.execute_raw(b"RAW:abc") == b"cba:WAR"
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", ["zlib", "lzma"])
+    async def test_negotiated_compression(self, polycall_runtime, algorithm):
+        """Test large payloads travel compressed once both sides agree"""
+        from pypolycall.core.protocol import MessageFlags
+        
+        polycall_runtime.compression = True
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={"compression": algorithm, "compression_threshold": 256}
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        snapshot = {"rows": [{"id": i, "state": "ready"} for i in range(500)]}
+        result = await binding.execute_operation("op", snapshot)
+        assert result["params"] == snapshot
+        
+        small = await binding.execute_operation("op", {"a": 1})
+        assert small["params"] == {"a": 1}
+        
+        flags = [header.flags for header, _ in polycall_runtime.received[-2:]]
+        assert flags[0] & MessageFlags.COMPRESSED
+        assert not flags[1] & MessageFlags.COMPRESSED
+        
+        stats = binding._protocol_handler.compression_stats
+        assert stats["frames_compressed"] >= 1
+        assert stats["frames_decompressed"] >= 1
+        assert stats["ratio"] > 1.0
+        
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_compression_not_accepted(self, polycall_runtime):
+        """Test frames stay uncompressed when the runtime declines"""
+        from pypolycall.core.protocol import MessageFlags
+        
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={"compression": "zlib", "compression_threshold": 0}
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        await binding.execute_operation("op", {"data": "x" * 4096})
+        header, _ = polycall_runtime.received[-1]
+        assert not header.flags & MessageFlags.COMPRESSED
+        
+        await binding.shutdown()
+
+class TestReconnect:
+    """Test reconnect supervision after the runtime drops the connection"""
+    
+    RETRY_CONFIG = {"retry_attempts": 3, "retry_backoff": 0.01, "retry_backoff_max": 0.05}
+    
+    async def connect(self, runtime, config=None):
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=runtime.port,
+            binding_config=config or self.RETRY_CONFIG,
+        )
+        assert await binding.connect()
+        assert await binding.authenticate({"user": "test"})
+        return binding
+    
+    @pytest.mark.asyncio
+    async def test_reliable_operation_replayed(self, polycall_runtime):
+        """Test RELIABLE operations survive a dropped connection"""
+        from pypolycall.core.protocol import MessageFlags, MessageTypes
+        
+        binding = await self.connect(polycall_runtime)
+        polycall_runtime.drop_commands = 1
+        
+        result = await binding.execute_operation("transfer", {"id": 7}, reliable=True)
+        
+        assert result["params"] == {"id": 7}
+        assert binding.reconnects == 1
+        assert binding.is_connected
+        
+        types = [header.type for header, _payload in polycall_runtime.received]
+        assert types.count(MessageTypes.AUTH) == 2
+        commands = [header for header, _payload in polycall_runtime.received
+                    if header.type == MessageTypes.COMMAND]
+        assert len(commands) == 2
+        assert all(header.flags & MessageFlags.RELIABLE for header in commands)
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_unreliable_operation_fails(self, polycall_runtime):
+        """Test ordinary operations fail fast while the connection recovers"""
+        binding = await self.connect(polycall_runtime)
+        polycall_runtime.drop_commands = 1
+        
+        with pytest.raises(PyPolyCallRuntimeError):
+            await binding.execute_operation("transfer", {})
+        
+        assert binding.is_reconnecting
+        while binding.is_reconnecting:
+            await asyncio.sleep(0.01)
+        
+        result = await binding.execute_operation("balance", {})
+        assert result["status"] == "success"
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_gives_up(self, polycall_runtime):
+        """Test reliable operations fail once every reconnect attempt has failed"""
+        binding = await self.connect(polycall_runtime)
+        await polycall_runtime.stop()
+        
+        with pytest.raises(PyPolyCallRuntimeError):
+            await binding.execute_operation("transfer", {}, reliable=True)
+        
+        assert not binding.is_reconnecting
+        assert not binding.is_authenticated
+        await binding.shutdown()
+    
+    def test_backoff_bounds(self):
+        """Test backoff is jittered below an exponentially growing ceiling"""
+        binding = ProtocolBinding(binding_config={"retry_backoff": 0.1, "retry_backoff_max": 1.0})
+        
+        for attempt, ceiling in enumerate([0.1, 0.2, 0.4, 0.8, 1.0, 1.0]):
+            delays = [binding._backoff(attempt) for _ in range(50)]
+            assert all(0 <= delay <= ceiling for delay in delays)
+            assert len(set(delays)) > 1
+
+class TestHeartbeat:
+    """Test background HEARTBEAT monitoring"""
+    
+    CONFIG = {
+        "heartbeat_interval": 0.02,
+        "heartbeat_timeout": 0.05,
+        "heartbeat_max_missed": 2,
+        "retry_backoff": 0.01,
+    }
+    
+    @pytest.mark.asyncio
+    async def test_rtt_sampled(self, polycall_runtime):
+        """Test the monitor feeds RTT statistics visible to telemetry and the pool"""
+        from pypolycall.core.telemetry import TelemetryObserver
+        
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config=self.CONFIG,
+        )
+        await binding.connect()
+        observer = TelemetryObserver()
+        await observer.start_observation(binding.protocol_handler)
+        
+        while binding.protocol_handler.rtt_stats["samples"] < 3:
+            await asyncio.sleep(0.01)
+        
+        stats = observer.get_metrics()["heartbeat"]
+        assert stats["missed"] == 0
+        assert 0 < stats["min"] <= stats["srtt"] <= stats["max"]
+        assert sum(stats["histogram"].values()) == stats["samples"]
+        assert binding.rtt is not None
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_half_open_detected(self, polycall_runtime):
+        """Test unanswered HEARTBEATs drop the connection and trigger a reconnect"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config=self.CONFIG,
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        
+        polycall_runtime.ignore_heartbeats = 2
+        while binding.reconnects < 1:
+            await asyncio.sleep(0.01)
+        assert binding.is_connected
+        result = await binding.execute_operation("op", {})
+        assert result["status"] == "success"
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_off_by_default(self, polycall_runtime):
+        """Test a runtime that never echoes HEARTBEAT is not probed or dropped"""
+        from pypolycall.core.protocol import MessageTypes
+        
+        polycall_runtime.ignore_heartbeats = 10 ** 9
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={"retry_backoff": 0.01},
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        await asyncio.sleep(0.2)
+        
+        assert binding.protocol_handler._heartbeat_monitor is None
+        assert binding.is_connected and binding.reconnects == 0
+        assert not [h for h, _ in polycall_runtime.received if h.type == MessageTypes.HEARTBEAT]
+        result = await binding.execute_operation("op", {})
+        assert result["status"] == "success"
+        await binding.shutdown()
+
+class TestUnixSocket:
+    """Test unix:// hosts select the Unix domain socket transport"""
+    
+    @pytest.mark.asyncio
+    async def test_lifecycle(self, unix_runtime):
+        """Test the full exchange over a Unix domain socket"""
+        binding = ProtocolBinding(polycall_host=unix_runtime.url)
+        assert await binding.connect()
+        assert binding.protocol_handler.endpoint == unix_runtime.url
+        assert await binding.authenticate({"user": "test"})
+        
+        result = await binding.execute_operation("test_op", {"param": "value"})
+        assert result["params"] == {"param": "value"}
+        results = await binding.execute_many([("op", {"index": i}) for i in range(50)])
+        assert [r["params"]["index"] for r in results] == list(range(50))
+        
+        await binding.shutdown()
+        assert not binding.is_connected
+    
+    @pytest.mark.asyncio
+    async def test_missing_socket(self, tmp_path):
+        """Test an absent socket fails the connection attempt"""
+        binding = ProtocolBinding(
+            polycall_host=f"unix://{tmp_path / 'missing.sock'}",
+            binding_config={"retry_attempts": 0},
+        )
+        assert not await binding.connect()
+
+class TestBindingMetrics:
+    """Test inline metrics collection on the request path"""
+    
+    @pytest.mark.asyncio
+    async def test_operations_recorded(self, polycall_runtime):
+        """Test operations, frames and state transitions reach the collector"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        for i in range(5):
+            await binding.execute_operation("get", {"i": i})
+        await binding.execute_many([("get", {}), ("fail", {})], return_exceptions=True)
+        with pytest.raises(ProtocolError):
+            await binding.execute_operation("fail", {})
+        await binding.shutdown()
+        
+        snapshot = binding.metrics.get_current_metrics()
+        assert snapshot["operations"]["get"]["requests"] == 6
+        assert snapshot["operations"]["get"]["latency"]["count"] == 6
+        assert 0 < snapshot["operations"]["get"]["latency"]["p50"] < 1
+        assert snapshot["operations"]["fail"]["errors"] == 2
+        assert snapshot["counters"]["frames_sent"] == snapshot["counters"]["frames_received"]
+        assert snapshot["state_transitions"] == {
+            "init->connected": 1,
+            "connected->authenticated": 1,
+            "authenticated->init": 1,
+        }
+    
+    @pytest.mark.asyncio
+    async def test_metrics_disabled(self, polycall_runtime):
+        """Test metrics=None turns collection off"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={"metrics": None},
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        assert await binding.execute_operation("get", {}) is not None
+        assert binding.protocol_handler.metrics is None
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_events_recorded(self, polycall_runtime):
+        """Test state changes, errors and slow calls reach the event log"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={"slow_call_threshold": 0},
+        )
+        subscription = binding.events.subscribe()
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        await binding.execute_operation("get", {})
+        with pytest.raises(ProtocolError):
+            await binding.execute_operation("fail", {})
+        await binding.shutdown()
+        subscription.close()
+        
+        events = [(event.kind, event.name) async for event in subscription]
+        assert events[:2] == [("state", "init->connected"), ("state", "connected->authenticated")]
+        assert ("slow", "get") in events
+        assert ("error", "fail") in events
+        assert events[-1] == ("state", "authenticated->init")
+    
+    
+    @pytest.mark.asyncio
+    async def test_slow_calls_logged(self, polycall_runtime, tmp_path):
+        """Test calls over their per-operation threshold are traced to the slow log"""
+        path = tmp_path / "slow.jsonl"
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={
+                "slow_call_threshold": 60,
+                "slow_call_thresholds": {"get": 0},
+                "slow_log_path": str(path),
+            },
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        await binding.execute_operation("get", {"i": 1})
+        await binding.execute_operation("put", {"i": 2})
+        await binding.shutdown()
+        
+        entries = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [entry["operation"] for entry in entries] == ["get"]
+        entry = entries[0]
+        assert entry["sequence"] > 0 and entry["threshold"] == 0
+        assert entry["request_bytes"] > 0 and entry["reply_bytes"] > 0
+        assert entry["codec"] == binding.protocol_handler.codec
+        assert entry["connection"] == binding.protocol_handler.endpoint
+        assert all(value is not None and value >= 0 for value in entry["phases"].values())
+        assert sum(entry["phases"].values()) <= entry["duration"] + 1e-6
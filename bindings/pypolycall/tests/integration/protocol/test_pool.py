@@ -0,0 +1,201 @@
+"""
+Binding Pool Integration Tests
+"""
+
+import pytest
+import asyncio
+from pypolycall.core.pool import BindingPool
+
+def make_pool(runtime, **kwargs):
+    return BindingPool(
+        polycall_host="127.0.0.1",
+        polycall_port=runtime.port,
+        credentials={"user": "test"},
+        **kwargs
+    )
+
+class TestBindingPool:
+    """Test pooled connections to the runtime"""
+    
+    @pytest.mark.asyncio
+    async def test_start_opens_min_size(self, polycall_runtime):
+        """Test the pool opens min_size connections up front"""
+        pool = make_pool(polycall_runtime, min_size=2, max_size=4)
+        await pool.start()
+        
+        assert pool.size == 2
+        result = await pool.execute_operation("op", {"a": 1})
+        assert result["params"] == {"a": 1}
+        
+        await pool.close()
+        assert pool.size == 0
+    
+    @pytest.mark.asyncio
+    async def test_spreads_and_grows(self, polycall_runtime):
+        """Test saturated connections cause the pool to grow up to max_size"""
+        pool = make_pool(polycall_runtime, min_size=1, max_size=3, max_leases_per_binding=2)
+        await pool.start()
+        
+        leases = [await pool.acquire() for _ in range(6)]
+        assert pool.size == 3
+        assert sorted(entry.leases for entry in set(leases)) == [2, 2, 2]
+        
+        # Seventh acquirer must wait for a release
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        
+        pool.release(leases[0])
+        entry = await asyncio.wait_for(waiter, 1.0)
+        assert entry is leases[0]
+        
+        for lease in leases[1:] + [entry]:
+            pool.release(lease)
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_fifo_waiters(self, polycall_runtime):
+        """Test waiters are served in arrival order"""
+        pool = make_pool(polycall_runtime, min_size=1, max_size=1, max_leases_per_binding=1)
+        await pool.start()
+        
+        held = await pool.acquire()
+        order = []
+        
+        async def acquire_and_record(index):
+            entry = await pool.acquire()
+            order.append(index)
+            pool.release(entry)
+        
+        tasks = [asyncio.ensure_future(acquire_and_record(i)) for i in range(5)]
+        await asyncio.sleep(0.01)
+        pool.release(held)
+        await asyncio.gather(*tasks)
+        
+        assert order == [0, 1, 2, 3, 4]
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_passes_wakeup(self, polycall_runtime):
+        """Test a waiter cancelled after being woken hands the wakeup on"""
+        pool = make_pool(polycall_runtime, min_size=1, max_size=1, max_leases_per_binding=1)
+        await pool.start()
+        
+        held = await pool.acquire()
+        first = asyncio.ensure_future(pool.acquire())
+        second = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0)
+        pool.release(held)
+        first.cancel()
+        
+        lease = await asyncio.wait_for(second, 1.0)
+        assert first.cancelled()
+        pool.release(lease)
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_reconnect_wakes_waiters(self, polycall_runtime):
+        """Test waiters are served once a dropped pooled connection comes back"""
+        pool = make_pool(polycall_runtime, min_size=1, max_size=1)
+        await pool.start()
+        binding = pool._entries[0].binding
+        # Fixed delay so the drop is observed before the reconnect lands
+        binding._backoff = lambda attempt: 0.2
+        
+        polycall_runtime.disconnect_clients()
+        while binding.is_connected:
+            await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        
+        lease = await asyncio.wait_for(waiter, 2.0)
+        assert lease.binding is binding and binding.reconnects == 1
+        pool.release(lease)
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_eviction_wakes_waiters(self, polycall_runtime):
+        """Test evicting a dead connection lets a waiter open a replacement"""
+        pool = make_pool(polycall_runtime, min_size=0, max_size=1)
+        await pool.start()
+        pool.release(await pool.acquire())
+        dead = pool._entries[0]
+        await dead.binding.shutdown()
+        
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        
+        await pool._check_health()
+        lease = await asyncio.wait_for(waiter, 1.0)
+        assert lease is not dead and lease.binding.is_connected
+        pool.release(lease)
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_idle_eviction(self, polycall_runtime):
+        """Test idle connections above min_size are closed"""
+        pool = make_pool(polycall_runtime, min_size=1, max_size=3,
+                         max_leases_per_binding=1, idle_timeout=0.0)
+        await pool.start()
+        
+        leases = [await pool.acquire() for _ in range(3)]
+        for lease in leases:
+            pool.release(lease)
+        
+        await pool._check_health()
+        assert pool.size == 1
+        
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_heartbeat_eviction(self, polycall_runtime):
+        """Test dead connections are evicted and min_size replenished"""
+        pool = make_pool(polycall_runtime, min_size=2, max_size=2)
+        await pool.start()
+        
+        dead = pool._entries[0]
+        await dead.binding.shutdown()
+        await pool._check_health()
+        
+        assert pool.size == 2
+        assert dead not in pool._entries
+        assert pool.get_stats()["evictions"] == 1
+        
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_silent_runtime_kept(self, polycall_runtime):
+        """Test sweeps keep connections to a runtime that never echoes HEARTBEAT"""
+        polycall_runtime.ignore_heartbeats = 10 ** 9
+        pool = make_pool(polycall_runtime, min_size=2, max_size=2, heartbeat_timeout=0.05)
+        await pool.start()
+        
+        entries = list(pool._entries)
+        await pool._check_health()
+        
+        assert pool._entries == entries
+        assert pool.get_stats()["evictions"] == 0
+        
+        await pool.close()
+
+class TestUnixSocketPool:
+    """Test pooling over a Unix domain socket"""
+    
+    @pytest.mark.asyncio
+    async def test_pool(self, unix_runtime):
+        """Test pooled bindings share one unix:// endpoint"""
+        pool = BindingPool(
+            polycall_host=unix_runtime.url,
+            credentials={"user": "test"},
+            min_size=2,
+            max_size=2,
+        )
+        await pool.start()
+        
+        results = await asyncio.gather(*(
+            pool.execute_operation("op", {"index": i}) for i in range(20)
+        ))
+        assert [r["params"]["index"] for r in results] == list(range(20))
+        await pool.close()
@@ -0,0 +1,183 @@
+"""
+Shared Memory Transport Integration Tests
+"""
+
+import pytest
+import asyncio
+from pypolycall.core.binding import ProtocolBinding
+from pypolycall.core.protocol import shm
+from pypolycall.core.protocol.shm import ShmRing, ShmTransport
+from pypolycall.exceptions import ProtocolError, RuntimeError as PyPolyCallRuntimeError
+
+async def shm_binding(runtime, **config):
+    """Connected and authenticated binding using the shared-memory transport"""
+    config.setdefault("retry_attempts", 0)
+    binding = ProtocolBinding(binding_config={"shm_path": runtime.path, **config})
+    assert await binding.connect()
+    assert await binding.authenticate({"user": "test"})
+    return binding
+
+class TestShmRing:
+    """Test the shared byte ring"""
+    
+    def test_wraps_around(self):
+        ring = ShmRing(memoryview(bytearray(ShmRing.footprint(16))), 16)
+        assert ring.write(memoryview(b"0123456789")) == 10
+        ring.consume(8)
+        assert ring.write(memoryview(b"abcdefghijklmnop")) == 14
+        assert ring.free == 0
+        
+        views = ring.readable()
+        assert len(views) == 2
+        assert b"".join(bytes(view) for view in views) == b"89abcdefghijklmn"
+    
+    def test_flags(self):
+        ring = ShmRing(memoryview(bytearray(ShmRing.footprint(16))), 16)
+        ring.sleeping = True
+        ring.waiting = True
+        assert ring.sleeping and ring.waiting
+        ring.sleeping = False
+        assert not ring.sleeping
+
+class TestShmTransport:
+    """Test ProtocolBinding over shared memory"""
+    
+    @pytest.mark.asyncio
+    async def test_lifecycle(self, shm_runtime):
+        """Test the full exchange runs through the rings"""
+        binding = await shm_binding(shm_runtime)
+        assert binding.is_authenticated
+        
+        result = await binding.execute_operation("test_op", {"param": "value"})
+        assert result["params"] == {"param": "value"}
+        assert await binding.heartbeat() >= 0
+        
+        await binding.shutdown()
+        assert not binding.is_connected
+    
+    @pytest.mark.asyncio
+    async def test_payloads_larger_than_ring(self, shm_runtime):
+        """Test frames wrap and wait for space in a small ring"""
+        binding = await shm_binding(shm_runtime, shm_ring_size=4096)
+        
+        blob = "x" * 50000
+        results = await binding.execute_many(
+            [("echo", {"index": i, "blob": blob}) for i in range(8)]
+        )
+        assert [r["params"]["index"] for r in results] == list(range(8))
+        assert all(r["params"]["blob"] == blob for r in results)
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_pipelined_requests(self, shm_runtime):
+        """Test concurrent requests are matched to their replies"""
+        binding = await shm_binding(shm_runtime)
+        
+        results = await asyncio.gather(*(
+            binding.execute_operation("op", {"index": i}) for i in range(200)
+        ))
+        assert [r["params"]["index"] for r in results] == list(range(200))
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_runtime_error_frame(self, shm_runtime):
+        """Test ERROR replies surface as ProtocolError"""
+        binding = await shm_binding(shm_runtime)
+        with pytest.raises(ProtocolError):
+            await binding.execute_operation("fail", {})
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_runtime_disconnect(self, shm_runtime):
+        """Test a dropped runtime fails outstanding requests"""
+        binding = await shm_binding(shm_runtime)
+        
+        shm_runtime.drop_commands = 1
+        with pytest.raises(PyPolyCallRuntimeError):
+            await binding.execute_operation("op", {})
+        assert not binding.is_connected
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_no_listener(self, tmp_path):
+        """Test connecting without a runtime fails cleanly"""
+        binding = ProtocolBinding(binding_config={
+            "shm_path": str(tmp_path / "missing.sock"),
+            "retry_attempts": 0,
+        })
+        assert not await binding.connect()
+    
+    @pytest.mark.asyncio
+    async def test_idle_channel_polls_slowly(self, shm_runtime):
+        """Test a quiet channel falls back to the slow idle poll"""
+        binding = await shm_binding(shm_runtime)
+        channel = binding.protocol_handler._transport._channel
+        await binding.execute_operation("op", {})
+        await asyncio.sleep(shm._POLL_INTERVAL * 3)
+        
+        delay = channel._poll_handle.when() - asyncio.get_running_loop().time()
+        assert shm._POLL_INTERVAL < delay <= shm._IDLE_POLL_INTERVAL
+        result = await binding.execute_operation("op", {"after": "idle"})
+        assert result["params"] == {"after": "idle"}
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_missed_doorbell_recovers(self, shm_runtime, monkeypatch):
+        """Test a write whose doorbell is lost is still picked up by the idle poll"""
+        monkeypatch.setattr(shm, "_IDLE_POLL_INTERVAL", 0.1)
+        binding = await shm_binding(shm_runtime)
+        channel = binding.protocol_handler._transport._channel
+        await asyncio.sleep(shm._POLL_INTERVAL * 3)
+        
+        channel._ring_if_sleeping = lambda: None
+        result = await asyncio.wait_for(binding.execute_operation("op", {"lost": True}), 1.0)
+        assert result["params"] == {"lost": True}
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_bad_ring_size_rejected(self, shm_runtime):
+        """Test rings that do not fit the segment are refused and the server keeps serving"""
+        with pytest.raises(PyPolyCallRuntimeError, match="rejected"):
+            await ShmTransport(shm_runtime.path, ring_size=0).open(None, None)
+        
+        segment = shm.shared_memory.SharedMemory(create=True, size=4096)
+        try:
+            loop = asyncio.get_running_loop()
+            sock = shm.socket.socket(shm.socket.AF_UNIX, shm.socket.SOCK_STREAM)
+            sock.setblocking(False)
+            await loop.sock_connect(sock, shm_runtime.path)
+            name = segment.name.encode()
+            await loop.sock_sendall(sock, shm._HELLO_STRUCT.pack(
+                shm._HELLO_MAGIC, shm._HELLO_VERSION, 0, 1 << 20, len(name)
+            ) + name)
+            assert await loop.sock_recv(sock, 1) == shm._NACK
+            sock.close()
+        finally:
+            segment.close()
+            segment.unlink()
+        
+        binding = await shm_binding(shm_runtime)
+        assert (await binding.execute_operation("op", {}))["status"] == "success"
+        await binding.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_open_cleans_up(self, shm_runtime, monkeypatch):
+        """Test a cancelled open closes its socket and segment"""
+        closed = []
+        original = shm.shared_memory.SharedMemory.close
+        monkeypatch.setattr(
+            shm.shared_memory.SharedMemory, "close",
+            lambda segment: (closed.append(segment.name), original(segment)),
+        )
+        
+        async def stalled_hello(self, loop, sock, segment):
+            await asyncio.sleep(10)
+        monkeypatch.setattr(ShmTransport, "_hello", stalled_hello)
+        
+        task = asyncio.ensure_future(ShmTransport(shm_runtime.path).open(None, None))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert len(closed) == 1
+
@@ -0,0 +1,76 @@
+"""
+Synchronous Binding Integration Tests
+"""
+
+import threading
+
+import pytest
+from pypolycall.core.sync import EventLoopThread, SyncBinding
+from pypolycall.exceptions import ProtocolError
+
+class TestSyncBinding:
+    """Test the blocking binding facade"""
+    
+    def test_lifecycle(self, threaded_runtime):
+        """Test blocking connect, authenticate, execute and shutdown"""
+        with SyncBinding(polycall_host="127.0.0.1", polycall_port=threaded_runtime.port) as binding:
+            assert binding.connect() == True
+            assert binding.authenticate({"user": "test"}) == True
+            
+            result = binding.execute_operation("test_op", {"param": "value"})
+            assert result["params"] == {"param": "value"}
+            assert binding.heartbeat() > 0
+            
+            with pytest.raises(ProtocolError):
+                binding.execute_operation("fail", {})
+        
+        assert not binding.is_connected
+    
+    def test_shared_loop(self, threaded_runtime):
+        """Test bindings share one long-lived loop thread across calls"""
+        first = SyncBinding(polycall_host="127.0.0.1", polycall_port=threaded_runtime.port)
+        second = SyncBinding(polycall_host="127.0.0.1", polycall_port=threaded_runtime.port)
+        first.connect()
+        threads_before = threading.active_count()
+        
+        second.connect()
+        for binding in (first, second):
+            binding.authenticate({"user": "test"})
+            for i in range(20):
+                assert binding.execute_operation("op", {"i": i})["params"] == {"i": i}
+        
+        assert threading.active_count() == threads_before
+        assert first._loop_thread is second._loop_thread
+        first.shutdown()
+        second.shutdown()
+    
+    def test_concurrent_callers(self, threaded_runtime):
+        """Test calls from many threads are pipelined on one connection"""
+        binding = SyncBinding(polycall_host="127.0.0.1", polycall_port=threaded_runtime.port)
+        binding.connect()
+        binding.authenticate({"user": "test"})
+        results = {}
+        
+        def worker(index):
+            results[index] = binding.execute_operation("op", {"index": index})
+        
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        
+        assert {i: r["params"]["index"] for i, r in results.items()} == {i: i for i in range(8)}
+        binding.shutdown()
+    
+    def test_private_loop_thread(self):
+        """Test a dedicated loop thread starts on demand and stops cleanly"""
+        loop_thread = EventLoopThread()
+        
+        async def answer():
+            return 42
+        
+        assert loop_thread.run(answer()) == 42
+        assert loop_thread.is_running
+        loop_thread.stop()
+        assert not loop_thread.is_running
@@ -0,0 +1 @@
+"""Telemetry Integration Tests"""
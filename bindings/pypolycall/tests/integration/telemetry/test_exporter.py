@@ -0,0 +1,169 @@
+"""
+Metrics Exporter Integration Tests
+"""
+
+import pytest
+import asyncio
+from pypolycall.core.binding import ProtocolBinding
+from pypolycall.core.pool import BindingPool
+from pypolycall.core.telemetry import MetricsExporter
+from pypolycall.core.telemetry.exporter import CONTENT_TYPE
+
+async def scrape(exporter, path="/metrics", method="GET"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", exporter.port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return head.decode(), body.decode()
+
+class TestMetricsExporter:
+    """Test OpenMetrics exposition over HTTP"""
+    
+    @pytest.mark.asyncio
+    async def test_binding_metrics(self, polycall_runtime):
+        """Test a scrape renders operation, frame, codec and connection metrics"""
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        for i in range(3):
+            await binding.execute_operation("get", {"i": i})
+        
+        async with MetricsExporter(binding.metrics, bindings=[binding], port=0) as exporter:
+            head, body = await scrape(exporter)
+        await binding.shutdown()
+        
+        assert head.startswith("HTTP/1.1 200")
+        assert f"Content-Type: {CONTENT_TYPE}" in head
+        assert body.endswith("# EOF\n")
+        assert 'pypolycall_operation_requests_total{operation="get"} 3' in body
+        assert 'pypolycall_operation_latency_seconds_count{operation="get"} 3' in body
+        assert 'pypolycall_operation_latency_seconds{operation="get",quantile="0.99"}' in body
+        assert 'pypolycall_codec_seconds_count{direction="encode"}' in body
+        assert 'pypolycall_frame_size_bytes_sum{direction="received"}' in body
+        assert 'pypolycall_state_transitions_total{from="init",to="connected"} 1' in body
+        assert 'pypolycall_in_flight{endpoint="127.0.0.1:' in body
+    
+    @pytest.mark.asyncio
+    async def test_compression_metrics(self, polycall_runtime):
+        """Test compressed bytes, ratio and CPU time are exported per connection"""
+        polycall_runtime.compression = True
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={"compression": "zlib", "compression_threshold": 256}
+        )
+        await binding.connect()
+        await binding.authenticate({"user": "test"})
+        await binding.execute_operation("op", {"rows": [{"id": i, "state": "ready"} for i in range(500)]})
+        stats = binding.protocol_handler.compression_stats
+        endpoint = binding.protocol_handler.endpoint
+        
+        async with MetricsExporter(binding.metrics, bindings=[binding], port=0) as exporter:
+            _head, body = await scrape(exporter)
+        await binding.shutdown()
+        
+        assert stats["bytes_in"] > stats["bytes_out"] > 0
+        labels = f'endpoint="{endpoint}",direction='
+        assert f'pypolycall_compression_bytes_total{{{labels}"in"}} {stats["bytes_in"]}' in body
+        assert f'pypolycall_compression_bytes_total{{{labels}"out"}} {stats["bytes_out"]}' in body
+        assert f'pypolycall_compression_ratio{{endpoint="{endpoint}"}} ' in body
+        assert f'pypolycall_compression_seconds_total{{{labels}"compress"}}' in body
+    
+    @pytest.mark.asyncio
+    async def test_pool_metrics(self, polycall_runtime):
+        """Test pool occupancy is exported"""
+        pool = BindingPool(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            credentials={"user": "test"},
+            min_size=2,
+            max_size=4,
+        )
+        await pool.start()
+        await pool.execute_operation("op", {})
+        
+        async with MetricsExporter(pool.metrics, pool=pool, port=0) as exporter:
+            _head, body = await scrape(exporter)
+        await pool.close()
+        
+        assert "pypolycall_pool_size 2" in body
+        assert "pypolycall_pool_in_flight 0" in body
+        assert 'pypolycall_operation_requests_total{operation="op"} 1' in body
+    
+    @pytest.mark.asyncio
+    async def test_render_cached(self):
+        """Test scrapes inside cache_ttl reuse the last render"""
+        from pypolycall.core.telemetry import MetricsCollector
+        
+        metrics = MetricsCollector()
+        async with MetricsExporter(metrics, port=0, cache_ttl=60) as exporter:
+            _head, first = await scrape(exporter)
+            metrics.record_request("get")
+            _head, second = await scrape(exporter)
+            exporter.cache_ttl = 0
+            _head, third = await scrape(exporter)
+        
+        assert first == second
+        assert exporter.renders == 2 and exporter.scrapes == 3
+        assert 'pypolycall_operation_requests_total{operation="get"} 1' in third
+    
+    @pytest.mark.asyncio
+    async def test_unknown_path(self):
+        """Test other paths and methods are rejected"""
+        from pypolycall.core.telemetry import MetricsCollector
+        
+        async with MetricsExporter(MetricsCollector(), port=0) as exporter:
+            not_found, _body = await scrape(exporter, "/other")
+            not_allowed, _body = await scrape(exporter, method="POST")
+        
+        assert not_found.startswith("HTTP/1.1 404")
+        assert not_allowed.startswith("HTTP/1.1 405")
+
+class TestEnableMetrics:
+    """Test bindings and pools start an exporter when enable_metrics is set"""
+    
+    @pytest.mark.asyncio
+    async def test_binding_config(self, polycall_runtime, monkeypatch):
+        """Test enable_metrics serves the binding's metrics while it is up"""
+        monkeypatch.delenv("PYPOLYCALL_ENABLE_METRICS", raising=False)
+        plain = ProtocolBinding(polycall_host="127.0.0.1", polycall_port=polycall_runtime.port)
+        await plain.connect()
+        assert plain.exporter is None
+        await plain.shutdown()
+        
+        binding = ProtocolBinding(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            binding_config={"enable_metrics": True, "metrics_port": 0},
+        )
+        await binding.connect()
+        exporter = binding.exporter
+        _head, body = await scrape(exporter)
+        await binding.shutdown()
+        
+        assert 'pypolycall_in_flight{endpoint="127.0.0.1:' in body
+        assert binding.exporter is None and exporter._server is None
+    
+    @pytest.mark.asyncio
+    async def test_pool_env(self, polycall_runtime, monkeypatch):
+        """Test PYPOLYCALL_ENABLE_METRICS gives a pool one exporter for all its bindings"""
+        monkeypatch.setenv("PYPOLYCALL_ENABLE_METRICS", "true")
+        monkeypatch.setenv("PYPOLYCALL_METRICS_PORT", "0")
+        pool = BindingPool(
+            polycall_host="127.0.0.1",
+            polycall_port=polycall_runtime.port,
+            credentials={"user": "test"},
+            min_size=2,
+            max_size=2,
+        )
+        await pool.start()
+        _head, body = await scrape(pool.exporter)
+        
+        assert "pypolycall_pool_size 2" in body
+        assert all(entry.binding.exporter is None for entry in pool._entries)
+        await pool.close()
+        assert pool.exporter is None
@@ -2,6 +2,8 @@
 CLI Main Module Tests
 """
 
+import sys
+
 import pytest
 import asyncio
 from pypolycall.cli.main import CLI, main
@@ -38,3 +40,64 @@ class TestCLI:
         # Test help doesn't raise exception
         with pytest.raises(SystemExit):
             parser.parse_args(['--help'])
+    
+    def test_main_event_loop(self, monkeypatch, capsys):
+        """Test main runs on the requested loop, falling back without uvloop"""
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        with pytest.raises(SystemExit) as exit_info:
+            main(['--event-loop', 'uvloop', 'info'])
+        
+        assert exit_info.value.code == 0
+        assert "Event Loop: asyncio" in capsys.readouterr().out
+    
+    def test_main_config_event_loop(self, monkeypatch):
+        """Test main falls back to the configured event_loop key"""
+        from pypolycall.config import ConfigManager
+        
+        cli_main = sys.modules["pypolycall.cli.main"]
+        
+        backends = []
+        def fake_run(coro, name):
+            coro.close()
+            backends.append(name)
+        
+        monkeypatch.setattr(cli_main, "run", fake_run)
+        monkeypatch.setattr(
+            ConfigManager, "default_config", lambda self: {"core": {"event_loop": "uvloop"}}
+        )
+        main(['info'])
+        main(['--event-loop', 'asyncio', 'info'])
+        
+        assert backends == ["uvloop", "asyncio"]
+    
+    @pytest.mark.asyncio
+    async def test_profile_command(self, polycall_runtime, tmp_path, capsys):
+        """Test profile runs a workload and writes collapsed stacks"""
+        output = tmp_path / "profile.folded"
+        cli = CLI()
+        result = await cli.run([
+            '--host', '127.0.0.1', '--port', str(polycall_runtime.port),
+            'profile', '--requests', '300', '--interval', '0.001', '--output', str(output),
+        ])
+        
+        assert result == 0
+        printed = capsys.readouterr().out
+        assert "300 x profile" in printed
+        assert "wait" in printed and "decode" in printed
+        assert output.exists()
+    
+    @pytest.mark.asyncio
+    async def test_telemetry_observe(self, polycall_runtime, capsys):
+        """Test telemetry tails protocol events for the requested duration"""
+        cli = CLI()
+        result = await cli.run([
+            '--host', '127.0.0.1', '--port', str(polycall_runtime.port),
+            'telemetry', '--observe', '--duration', '0.2', '--heartbeat-interval', '0.05',
+        ])
+        
+        assert result == 0
+        printed = capsys.readouterr().out
+        assert "state  init->connected" in printed
+        assert "connected->authenticated" in printed
+        assert "RTT: samples=" in printed
+
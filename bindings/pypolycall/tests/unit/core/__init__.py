@@ -0,0 +1 @@
+"""Core Layer Tests"""
@@ -0,0 +1,97 @@
+"""
+Event Tracker Tests
+"""
+
+import asyncio
+import threading
+
+import pytest
+from pypolycall.core.telemetry.events import EventKinds, EventTracker
+
+class TestEventTracker:
+    """Test the bounded event ring"""
+    
+    def test_ring_bounded(self):
+        """Test only the newest capacity events are retained, oldest first"""
+        tracker = EventTracker(capacity=4)
+        for i in range(10):
+            tracker.record(EventKinds.ERROR, f"op{i}")
+        
+        assert [event.name for event in tracker.recent()] == ["op6", "op7", "op8", "op9"]
+        assert [event.sequence for event in tracker.recent(2)] == [9, 10]
+        assert tracker.recorded == 10 and tracker.overwritten == 6
+        assert tracker.recent(0) == []
+    
+    def test_event_slots(self):
+        """Test events are slotted and convert to dicts"""
+        event = EventTracker().record(EventKinds.SLOW, "get", duration=1.5)
+        
+        with pytest.raises(AttributeError):
+            event.extra = 1
+        assert event.as_dict()["duration"] == 1.5
+        assert event.as_dict()["kind"] == "slow"
+    
+    def test_invalid_capacity(self):
+        """Test a zero capacity is rejected"""
+        with pytest.raises(ValueError):
+            EventTracker(capacity=0)
+
+class TestEventSubscription:
+    """Test async subscribers"""
+    
+    @pytest.mark.asyncio
+    async def test_subscribe(self):
+        """Test subscribers receive events recorded after subscribing"""
+        tracker = EventTracker()
+        tracker.record(EventKinds.STATE, "before")
+        subscription = tracker.subscribe()
+        
+        async def producer():
+            for i in range(3):
+                await asyncio.sleep(0)
+                tracker.record(EventKinds.STATE, f"s{i}")
+            tracker.close()
+        
+        asyncio.ensure_future(producer())
+        names = [event.name async for event in subscription]
+        assert names == ["s0", "s1", "s2"]
+        assert tracker.subscribers == 0
+    
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self):
+        """Test a slow subscriber keeps the newest events and counts drops"""
+        tracker = EventTracker()
+        async with tracker.subscribe(maxsize=3, replay=0) as subscription:
+            for i in range(5):
+                tracker.record(EventKinds.ERROR, f"e{i}")
+        
+            assert subscription.dropped == 2
+            assert subscription.pending == 3
+            assert (await subscription.__anext__()).name == "e2"
+        
+        assert [event.name async for event in subscription] == ["e3", "e4"]
+    
+    @pytest.mark.asyncio
+    async def test_replay(self):
+        """Test replay delivers retained events first"""
+        tracker = EventTracker()
+        for i in range(3):
+            tracker.record(EventKinds.STATE, f"s{i}")
+        subscription = tracker.subscribe(replay=2)
+        subscription.close()
+        
+        assert [event.name async for event in subscription] == ["s1", "s2"]
+    
+    @pytest.mark.asyncio
+    async def test_record_from_thread(self):
+        """Test events recorded on another thread wake the subscriber"""
+        tracker = EventTracker()
+        subscription = tracker.subscribe()
+        thread = threading.Thread(target=tracker.record, args=(EventKinds.ERROR, "worker"))
+        
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, thread.start)
+        event = await asyncio.wait_for(subscription.__anext__(), 1)
+        thread.join()
+        
+        assert event.name == "worker"
@@ -0,0 +1,173 @@
+"""
+FFI Bridge Tests
+
+Native tests run against the library named by PYPOLYCALL_FFI_PATH and are
+skipped when it cannot be loaded.
+"""
+
+import asyncio
+import os
+
+import pytest
+from pypolycall.core.ffi import FFIBridge, NativeBuffer
+from pypolycall.core.protocol import MessageBuilder, MessageFlags, MessageTypes
+from pypolycall.core.protocol.checksum import calculate_checksum
+from pypolycall.core.protocol.messages import HEADER_STRUCT
+from pypolycall.exceptions import FFIError
+
+@pytest.fixture
+def bridge():
+    try:
+        bridge = FFIBridge()
+    except FFIError as e:
+        pytest.skip(f"libpolycall unavailable: {e}")
+    yield bridge
+    bridge.close()
+
+@pytest.fixture
+def state_machine(bridge):
+    machine = bridge.create_state_machine()
+    for name in ("INIT", "READY", "RUNNING"):
+        machine.add_state(name)
+    machine.add_transition("to_ready", "INIT", "READY")
+    machine.add_transition("to_running", "READY", "RUNNING")
+    yield machine
+    machine.destroy()
+
+class TestLoading:
+    """Test library resolution"""
+    
+    def test_missing_library_raises(self, tmp_path):
+        with pytest.raises(FFIError):
+            FFIBridge(str(tmp_path / "libpolycall.so"))
+    
+    def test_from_config(self, tmp_path):
+        with pytest.raises(FFIError, match="libmissing"):
+            FFIBridge.from_config({"ffi_path": str(tmp_path / "libmissing.so")})
+
+class TestNativeBuffer:
+    """Test buffer pinning for GIL-free calls"""
+    
+    def test_read_only_without_copy(self):
+        payload = b"polycall" * 16
+        view = memoryview(payload)[8:]
+        with NativeBuffer(view) as buffer:
+            assert buffer.length == len(payload) - 8
+            with NativeBuffer(payload) as whole:
+                assert buffer.address == whole.address + 8
+    
+    def test_pins_exporter(self):
+        payload = bytearray(64)
+        with NativeBuffer(payload):
+            with pytest.raises(BufferError):
+                payload.extend(b"resize")
+        payload.extend(b"resize")
+    
+    def test_non_contiguous_copied(self):
+        with NativeBuffer(memoryview(b"abcdef")[::2]) as buffer:
+            assert buffer.length == 3
+
+class TestNativeProtocol:
+    """Test native protocol helpers against the Python implementation"""
+    
+    @pytest.mark.parametrize("size", [0, 1, 255, 4096, 100000])
+    def test_checksum_parity(self, bridge, size):
+        payload = os.urandom(size)
+        assert bridge.calculate_checksum(payload) == calculate_checksum(payload)
+    
+    def test_checksum_accepts_buffers(self, bridge):
+        payload = os.urandom(1000)
+        expected = calculate_checksum(payload)
+        assert bridge.calculate_checksum(bytearray(payload)) == expected
+        assert bridge.calculate_checksum(memoryview(payload)) == expected
+        assert bridge.calculate_checksum(memoryview(payload)[10:]) == calculate_checksum(payload[10:])
+        assert bridge.verify_checksum(expected, payload)
+    
+    @pytest.mark.asyncio
+    async def test_checksum_offloaded(self, bridge):
+        payloads = [os.urandom(1024 * 1024) for _ in range(4)] + [b"small"]
+        results = await asyncio.gather(*(bridge.calculate_checksum_async(p) for p in payloads))
+        assert results == [calculate_checksum(p) for p in payloads]
+    
+    def test_header_matches_builder(self, bridge):
+        payload = b'{"operation": "ping"}'
+        frame = MessageBuilder().build(MessageTypes.COMMAND, payload, MessageFlags.RELIABLE, 7)
+        built = HEADER_STRUCT.unpack_from(frame)
+        
+        header = bridge.create_header(MessageTypes.COMMAND, len(payload), MessageFlags.RELIABLE)
+        assert header.version == built[0]
+        assert header.type == MessageTypes.COMMAND
+        assert header.flags == MessageFlags.RELIABLE
+        assert header.payload_length == len(payload)
+        assert header.sequence == header.checksum == 0
+    
+    def test_version_compatible(self, bridge):
+        assert bridge.version_compatible(1)
+        assert not bridge.version_compatible(2)
+
+@pytest.fixture
+def parser_bridge(bridge):
+    if bridge._native.polycall_parser_create is None:
+        pytest.skip("libpolycall built without the parser")
+    return bridge
+
+class TestNativeParser:
+    """Test polycall_parser_* through the bridge"""
+    
+    def test_repeated_parses(self, parser_bridge):
+        # Released ASTs must not be walked or freed again; 200 parses
+        # corrupt the heap quickly if they are
+        for _ in range(200):
+            try:
+                result = parser_bridge.parse_string("  \n  ")
+            except FFIError as e:
+                pytest.skip(f"Tokenizer rejects blank input: {e}")
+            assert result == (1, 0)
+    
+    def test_failure_without_get_error(self, parser_bridge, monkeypatch):
+        monkeypatch.setattr(parser_bridge._native, "polycall_parser_get_error", None)
+        with pytest.raises(FFIError, match="unknown error"):
+            parser_bridge.parse_string(b"")
+    
+    def test_missing_parser(self, bridge, monkeypatch):
+        monkeypatch.setattr(bridge._native, "polycall_parser_destroy", None)
+        with pytest.raises(FFIError, match="does not export"):
+            bridge.parse_string("function main() { }")
+
+class TestNativeStateMachine:
+    """Test polycall_sm_* through the bridge"""
+    
+    def test_transitions(self, state_machine):
+        assert state_machine.states == ["INIT", "READY", "RUNNING"]
+        assert state_machine.current_state == "INIT"
+        assert state_machine.execute_transition("to_ready") == "READY"
+        assert state_machine.execute_transition("to_running") == "RUNNING"
+    
+    def test_unknown_transition(self, state_machine):
+        with pytest.raises(FFIError, match="ERROR_INVALID_TRANSITION"):
+            state_machine.execute_transition("to_nowhere")
+        assert state_machine.failed_transitions == 1
+    
+    def test_locked_state(self, state_machine):
+        state_machine.lock_state("READY")
+        with pytest.raises(FFIError, match="ERROR_STATE_LOCKED"):
+            state_machine.execute_transition("to_ready")
+        state_machine.unlock_state("READY")
+        assert state_machine.execute_transition("to_ready") == "READY"
+    
+    def test_integrity_and_snapshot(self, state_machine):
+        assert state_machine.verify_state_integrity("READY")
+        snapshot = state_machine.create_snapshot("READY")
+        state_machine.restore_snapshot(snapshot)
+        assert state_machine.get_diagnostics("READY")["state_id"] == 1
+        assert state_machine.get_state_version("READY") >= 1
+    
+    def test_name_too_long(self, state_machine):
+        with pytest.raises(FFIError):
+            state_machine.add_state("S" * 40)
+    
+    def test_destroyed(self, bridge):
+        machine = bridge.create_state_machine()
+        machine.destroy()
+        with pytest.raises(FFIError):
+            machine.add_state("INIT")
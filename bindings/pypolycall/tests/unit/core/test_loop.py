@@ -0,0 +1,58 @@
+"""
+Event Loop Selection Tests
+"""
+
+import asyncio
+import sys
+
+import pytest
+from pypolycall.core.loop import configured_event_loop, loop_backend, new_event_loop, resolve_event_loop, run
+from pypolycall.core.sync import EventLoopThread, shared_loop
+
+class TestEventLoopSelection:
+    """Test backend configuration and fallback"""
+    
+    def test_configured_backend(self, monkeypatch):
+        """Test config wins over the environment, which wins over the default"""
+        monkeypatch.delenv("PYPOLYCALL_EVENT_LOOP", raising=False)
+        assert configured_event_loop() == "asyncio"
+        
+        monkeypatch.setenv("PYPOLYCALL_EVENT_LOOP", "uvloop")
+        assert configured_event_loop() == "uvloop"
+        assert configured_event_loop({"event_loop": "asyncio"}) == "asyncio"
+    
+    def test_uvloop_fallback(self, monkeypatch):
+        """Test uvloop falls back to asyncio when it cannot be imported"""
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        assert resolve_event_loop("uvloop") == "asyncio"
+        
+        loop = new_event_loop("uvloop")
+        try:
+            assert loop_backend(loop) == "asyncio"
+        finally:
+            loop.close()
+    
+    def test_unknown_backend(self):
+        """Test unknown backend names are rejected"""
+        with pytest.raises(ValueError):
+            resolve_event_loop("trio")
+    
+    def test_run(self):
+        """Test run() returns the coroutine result on the named backend"""
+        async def backend():
+            await asyncio.sleep(0)
+            return loop_backend()
+        
+        assert run(backend(), "asyncio") == "asyncio"
+    
+    def test_loop_thread_backend(self, monkeypatch):
+        """Test loop threads and shared loops honour the backend setting"""
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        thread = EventLoopThread(event_loop="uvloop")
+        try:
+            assert thread.event_loop == "asyncio"
+            assert loop_backend(thread.start()) == "asyncio"
+        finally:
+            thread.stop()
+        
+        assert shared_loop("asyncio") is shared_loop("asyncio")
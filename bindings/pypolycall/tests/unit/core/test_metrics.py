@@ -0,0 +1,119 @@
+"""
+Metrics Collector Tests
+"""
+
+import random
+
+import pytest
+from pypolycall.core.telemetry.metrics import (
+    HISTOGRAM_BUCKETS,
+    MAX_VALUE,
+    OTHER_OPERATION,
+    Counters,
+    Histogram,
+    MetricsCollector,
+)
+
+class TestHistogram:
+    """Test log-bucketed histogram accuracy and bounds"""
+    
+    def test_empty(self):
+        """Test an empty histogram has no percentiles"""
+        histogram = Histogram()
+        assert histogram.percentile(0.5) is None
+        assert histogram.as_dict() == {"count": 0}
+    
+    def test_small_values_exact(self):
+        """Test values below the sub-bucket count are recorded exactly"""
+        histogram = Histogram()
+        for value in range(10):
+            histogram.record(value)
+        
+        assert histogram.percentile(0.5) == 4
+        assert histogram.percentile(1.0) == 9
+        assert histogram.min == 0 and histogram.max == 9
+    
+    def test_relative_error(self):
+        """Test percentiles stay within the sub-bucket resolution"""
+        rng = random.Random(7)
+        values = sorted(int(rng.lognormvariate(12, 2)) for _ in range(20000))
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+        
+        for fraction in (0.5, 0.9, 0.99, 0.999):
+            exact = values[int(fraction * len(values)) - 1]
+            assert exact <= histogram.percentile(fraction) <= exact * 1.0625 + 1
+    
+    def test_clamped(self):
+        """Test out-of-range values land in the first and last buckets"""
+        histogram = Histogram()
+        histogram.record(-5)
+        histogram.record(MAX_VALUE * 4)
+        
+        assert histogram.counts[0] == 1
+        assert histogram.counts[HISTOGRAM_BUCKETS - 1] == 1
+        assert histogram.max == MAX_VALUE
+    
+    def test_bucket_bounds_increase(self):
+        """Test bucket upper bounds are strictly increasing"""
+        bounds = [Histogram.bucket_upper_bound(i) for i in range(HISTOGRAM_BUCKETS)]
+        assert bounds == sorted(set(bounds))
+        assert bounds[-1] == MAX_VALUE
+
+class TestMetricsCollector:
+    """Test counters and per-operation accounting"""
+    
+    def test_operation_latency(self):
+        """Test requests, responses and errors are counted per operation"""
+        metrics = MetricsCollector()
+        for latency in (1000, 2000, 3000):
+            metrics.record_request("get")
+            metrics.record_response("get", latency)
+        metrics.record_request("put")
+        metrics.record_error("put")
+        
+        snapshot = metrics.get_current_metrics()
+        assert snapshot["counters"]["requests"] == 4
+        assert snapshot["counters"]["responses"] == 3
+        assert snapshot["counters"]["errors"] == 1
+        assert snapshot["operations"]["get"]["latency"]["p50"] == pytest.approx(2e-6, rel=0.07)
+        assert snapshot["operations"]["put"] == {"requests": 1, "errors": 1, "latency": {"count": 0}}
+    
+    def test_operations_bounded(self):
+        """Test operation names beyond max_operations share one slot"""
+        metrics = MetricsCollector(max_operations=2)
+        for name in ("a", "b", "c", "d"):
+            metrics.record_request(name)
+        
+        operations = metrics.operations()
+        assert set(operations) == {"a", "b", OTHER_OPERATION}
+        assert operations[OTHER_OPERATION]["requests"] == 2
+        assert metrics.latency("c") is None
+    
+    def test_frames_and_transitions(self):
+        """Test frame sizes and state transitions"""
+        metrics = MetricsCollector()
+        metrics.record_frame_sent(100)
+        metrics.record_frame_received(300)
+        metrics.record_state_transition("init", "connected")
+        metrics.record_state_transition("init", "connected")
+        
+        assert metrics.counters[Counters.BYTES_SENT] == 100
+        assert metrics.counters[Counters.BYTES_RECEIVED] == 300
+        assert metrics.frames_received.max == 300
+        assert metrics.transitions() == {("init", "connected"): 2}
+        assert metrics.get_current_metrics()["state_transitions"] == {"init->connected": 2}
+    
+    def test_reset(self):
+        """Test reset zeroes everything"""
+        metrics = MetricsCollector()
+        metrics.record_request("get")
+        metrics.record_response("get", 10)
+        metrics.record_frame_sent(10)
+        metrics.record_state_transition("init", "connected")
+        metrics.reset()
+        
+        assert not any(metrics.counters)
+        assert metrics.operations() == {}
+        assert metrics.transitions() == {}
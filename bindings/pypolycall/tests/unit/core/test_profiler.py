@@ -0,0 +1,110 @@
+"""
+Sampling Profiler Tests
+"""
+
+import asyncio
+import json
+import selectors
+import sys
+import threading
+import time
+
+import pytest
+from pypolycall.core.protocol.checksum import calculate_checksum
+from pypolycall.core.protocol.codecs import default_registry
+from pypolycall.core.telemetry.profiler import PHASES, SamplingProfiler, classify, profile
+
+def busy(function, seconds=0.2):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        function()
+
+class TestSamplingProfiler:
+    """Test stack sampling and phase attribution"""
+    
+    def test_checksum_phase(self, tmp_path):
+        """Test samples inside the checksum module are attributed to it"""
+        payload = bytes(range(256)) * 16
+        output = tmp_path / "out.folded"
+        with profile(str(output), interval=0.001) as profiler:
+            busy(lambda: calculate_checksum(payload[:255]))
+        
+        phases = profiler.phases()
+        assert list(phases) == list(PHASES)
+        assert profiler.samples > 0
+        assert phases["checksum"] > profiler.samples / 2
+        
+        lines = output.read_text().splitlines()
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profiler.samples
+        assert any(line.startswith("checksum;") and "_checksum_loop (checksum.py:" in line for line in lines)
+    
+    def test_codec_phases(self):
+        """Test codec encode and decode are told apart"""
+        codec = default_registry.get("json")
+        encoded = codec.encode({"operation": "op", "params": list(range(50))})
+        with SamplingProfiler(interval=0.001) as profiler:
+            busy(lambda: codec.encode({"operation": "op", "params": list(range(50))}), 0.1)
+            busy(lambda: codec.decode(encoded), 0.1)
+        
+        phases = profiler.phases()
+        assert phases["encode"] > 0 and phases["decode"] > 0
+    
+    def test_leaf_phases(self):
+        """Test idle selector, stdlib and application frames"""
+        assert classify((selectors.DefaultSelector.select.__code__,)) == "wait"
+        assert classify((json.dumps.__code__,)) == "other"
+        assert classify((busy.__code__,)) == "callback"
+    
+    def test_asyncio_idle(self):
+        """Test the asyncio loop is idle in _run_once outside a callback"""
+        run_once = asyncio.BaseEventLoop._run_once.__code__
+        handle_run = asyncio.Handle._run.__code__
+        
+        assert classify((selectors.DefaultSelector.select.__code__, run_once)) == "wait"
+        assert classify((run_once,)) == "wait"
+        assert classify((busy.__code__, handle_run, run_once)) == "callback"
+    
+    def test_native_loop_idle(self):
+        """Test a loop without a Python dispatch frame, as uvloop runs, is idle in its entry frame"""
+        async def work():
+            busy(lambda: None, 0.1)
+        
+        def run_native_loop():
+            # Drive a coroutine the way a native loop does, then block
+            started.wait()
+            try:
+                work().send(None)
+            except StopIteration:
+                pass
+            time.sleep(0.1)
+        
+        started = threading.Event()
+        thread = threading.Thread(target=run_native_loop)
+        thread.start()
+        with SamplingProfiler(interval=0.001, thread_id=thread.ident) as profiler:
+            started.set()
+            thread.join()
+        
+        phases = profiler.phases()
+        assert phases["callback"] > 0 and phases["wait"] > 0
+        assert classify((run_native_loop.__code__,)) == "callback"
+    
+    def test_switch_interval_restored(self):
+        """Test the switch interval is lowered while sampling and restored on stop"""
+        previous = sys.getswitchinterval()
+        sys.setswitchinterval(0.01)
+        try:
+            with SamplingProfiler(interval=0.001):
+                assert sys.getswitchinterval() < 0.001
+            assert sys.getswitchinterval() == pytest.approx(0.01)
+        finally:
+            sys.setswitchinterval(previous)
+    
+    def test_stop_idempotent(self):
+        """Test stop without start and repeated stops are harmless"""
+        profiler = SamplingProfiler()
+        profiler.stop()
+        profiler.start()
+        profiler.stop()
+        profiler.stop()
+        assert profiler.samples >= 0
@@ -0,0 +1,301 @@
+"""
+Protocol Framing Tests
+"""
+
+import random
+
+import pytest
+from pypolycall.core.protocol import MessageBuilder, MessageParser, MessageTypes, MessageFlags
+from pypolycall.core.protocol import default_registry
+from pypolycall.core.protocol.checksum import calculate_checksum
+from pypolycall.core.protocol.messages import HEADER_SIZE, FrameBuffer
+from pypolycall.core.protocol.heartbeat import RTTStats
+from pypolycall.exceptions import ProtocolError
+
+def reference_checksum(data: bytes, checksum: int = 0) -> int:
+    """Literal transcription of polycall_protocol_calculate_checksum"""
+    for byte in data:
+        checksum = ((checksum << 5) & 0xFFFFFFFF) | (checksum >> 27)
+        checksum = (checksum + byte) & 0xFFFFFFFF
+    return checksum
+
+class TestChecksum:
+    """Test checksum parity with the C implementation"""
+    
+    def test_empty_payload(self):
+        assert calculate_checksum(b"") == 0
+    
+    def test_matches_reference(self):
+        payload = bytes(range(256)) * 8
+        assert calculate_checksum(payload) == reference_checksum(payload)
+    
+    def test_accepts_buffers(self):
+        payload = b"polycall"
+        expected = reference_checksum(payload)
+        assert calculate_checksum(bytearray(payload)) == expected
+        assert calculate_checksum(memoryview(payload)) == expected
+    
+    @pytest.mark.parametrize("payload", [
+        bytes(range(256)) * 64,
+        bytes(20000),
+        b"\xff" * 20000,
+        random.Random(8).randbytes(100000),
+        b"\xff" * 5000 + random.Random(10).randbytes(30000) + b"\xff" * 3000,
+    ], ids=["ramp", "zeros", "ones", "random", "mixed"])
+    def test_large_payloads(self, payload):
+        """Large payloads take the vectorized path when NumPy is installed"""
+        assert calculate_checksum(payload) == reference_checksum(payload)
+    
+    def test_continues_from_running_value(self):
+        """Carries and 0xFFFFFFFF running values are applied exactly"""
+        payload = random.Random(9).randbytes(5000)
+        head, tail = payload[:1234], payload[1234:]
+        assert calculate_checksum(tail, calculate_checksum(head)) == reference_checksum(payload)
+        
+        rotate_right = lambda value: ((value >> 5) | (value << 27)) & 0xFFFFFFFF
+        # Lands exactly on 0xFFFFFFFF, holds through zeros, then wraps
+        seed = rotate_right(0xFFFFFFFE)
+        payload = b"\x01" + bytes(300) + b"\x05" + bytes(range(256)) * 4
+        assert calculate_checksum(payload, seed) == reference_checksum(payload, seed)
+        # Carries out of the 32-bit add
+        seed = rotate_right(0xFFFFFF80)
+        payload = b"\xff" * 2000
+        assert calculate_checksum(payload, seed) == reference_checksum(payload, seed)
+
+class TestFraming:
+    """Test MessageBuilder / MessageParser round trips"""
+    
+    def test_header_layout(self):
+        frame = MessageBuilder().build(MessageTypes.COMMAND, b"abc", MessageFlags.RELIABLE)
+        
+        assert HEADER_SIZE == 16
+        assert len(frame) == HEADER_SIZE + 3
+        # version, type, flags (LE u16), sequence (LE u32)
+        assert frame[:8] == bytes([1, 0x03, 0x08, 0x00, 0x01, 0x00, 0x00, 0x00])
+    
+    def test_round_trip(self):
+        builder = MessageBuilder()
+        parser = MessageParser()
+        payload = builder.encode_payload({"operation": "op", "params": {"a": 1}})
+        frame = builder.build(MessageTypes.COMMAND, payload)
+        
+        header = parser.parse_header(frame)
+        assert header.type == MessageTypes.COMMAND
+        assert header.sequence == 1
+        assert header.payload_length == len(payload)
+        
+        parser.verify(header, frame[HEADER_SIZE:])
+        assert parser.decode_payload(frame[HEADER_SIZE:]) == {"operation": "op", "params": {"a": 1}}
+    
+    def test_sequence_allocation(self):
+        builder = MessageBuilder()
+        assert [builder.next_sequence() for _ in range(3)] == [1, 2, 3]
+    
+    def test_rejects_corruption(self):
+        parser = MessageParser()
+        frame = bytearray(MessageBuilder().build(MessageTypes.RESPONSE, b"payload"))
+        header = parser.parse_header(frame)
+        frame[-1] ^= 0xFF
+        
+        with pytest.raises(ProtocolError):
+            parser.verify(header, frame[HEADER_SIZE:])
+    
+    def test_rejects_bad_header(self):
+        parser = MessageParser(max_payload_size=4)
+        frame = bytearray(MessageBuilder().build(MessageTypes.RESPONSE, b"payload"))
+        
+        with pytest.raises(ProtocolError):
+            parser.parse_header(frame)
+        
+        frame[0] = 2
+        with pytest.raises(ProtocolError):
+            MessageParser().parse_header(frame)
+    
+    def test_handshake_payload(self):
+        payload = MessageBuilder.handshake_payload()
+        assert len(payload) == 8
+        assert MessageParser.parse_handshake(payload) == (1, 0, ())
+    
+    def test_handshake_codec_extension(self):
+        payload = MessageBuilder.handshake_payload(codecs=[2, 1])
+        assert len(payload) == 11
+        assert MessageParser.parse_handshake(payload).codecs == (2, 1)
+        
+        with pytest.raises(ProtocolError):
+            MessageParser.parse_handshake(payload[:-1])
+
+class TestFrameBuffer:
+    """Test incremental frame reassembly"""
+    
+    @staticmethod
+    def feed(frames, data, chunk):
+        """Copy data into the buffer chunk bytes at a time, as recv_into would"""
+        received = []
+        
+        def on_frame(header, payload):
+            received.append((header.sequence, bytes(payload)))
+        
+        for start in range(0, len(data), chunk):
+            piece = data[start:start + chunk]
+            target = frames.get_buffer(len(piece))
+            while len(piece) > len(target):
+                target[:] = piece[:len(target)]
+                frames.buffer_updated(len(target), on_frame)
+                piece = piece[len(target):]
+                target = frames.get_buffer(len(piece))
+            target[:len(piece)] = piece
+            frames.buffer_updated(len(piece), on_frame)
+        return received
+    
+    def build_stream(self, payloads):
+        builder = MessageBuilder()
+        return b"".join(builder.build(MessageTypes.RESPONSE, payload) for payload in payloads)
+    
+    @pytest.mark.parametrize("chunk", [1, 7, 16, 4096])
+    def test_partial_and_coalesced_reads(self, chunk):
+        """Frames split across reads or sharing a read are delivered once each"""
+        payloads = [b"", b"a", b"payload" * 10, bytes(range(256))]
+        received = self.feed(FrameBuffer(size=64), self.build_stream(payloads), chunk)
+        
+        assert received == list(zip(range(1, 5), payloads))
+    
+    def test_payloads_are_views(self):
+        """Payloads are memoryviews released after the callback"""
+        frames = FrameBuffer()
+        views = []
+        data = self.build_stream([b"abc", b"def"])
+        target = frames.get_buffer(len(data))
+        target[:len(data)] = data
+        frames.buffer_updated(len(data), lambda header, payload: views.append(payload))
+        
+        assert len(views) == 2
+        assert all(isinstance(view, memoryview) for view in views)
+        with pytest.raises(ValueError):
+            bytes(views[0])
+        assert frames.buffered == 0
+    
+    def test_oversized_frame(self):
+        """A payload larger than the buffer is read into its own buffer"""
+        payloads = [b"x" * 1000, b"tail"]
+        frames = FrameBuffer(size=32)
+        received = self.feed(frames, self.build_stream(payloads), 100)
+        
+        assert received == [(1, payloads[0]), (2, payloads[1])]
+        assert frames.buffered == 0
+    
+    def test_rejects_corruption(self):
+        """Checksum failures surface from buffer_updated"""
+        stream = bytearray(self.build_stream([b"payload"]))
+        stream[-1] ^= 0xFF
+        
+        with pytest.raises(ProtocolError):
+            self.feed(FrameBuffer(), bytes(stream), 4096)
+
+class TestRTTStats:
+    """Test HEARTBEAT round-trip statistics"""
+    
+    def test_smoothing(self):
+        """Test the TCP-style smoothed RTT tracks samples"""
+        stats = RTTStats()
+        assert stats.srtt is None and stats.percentile(0.5) is None
+        
+        stats.record(0.010)
+        assert stats.srtt == 0.010
+        assert stats.rttvar == 0.005
+        
+        stats.record(0.018)
+        assert stats.srtt == pytest.approx(0.011)
+        assert stats.min == 0.010 and stats.max == 0.018
+    
+    def test_histogram(self):
+        """Test samples land in power-of-two microsecond buckets"""
+        stats = RTTStats()
+        for rtt in [0.0001] * 98 + [0.05, 0.05]:
+            stats.record(rtt)
+        stats.record_miss()
+        
+        snapshot = stats.as_dict()
+        assert snapshot["samples"] == 100
+        assert snapshot["missed"] == 1
+        assert snapshot["histogram"] == {"lt_128us": 98, "lt_65536us": 2}
+        assert snapshot["p50"] == pytest.approx(0.000128)
+        assert snapshot["p99"] == 0.05
+
+class TestCodecs:
+    """Test payload codec registry and round trips"""
+    
+    def test_json_round_trip(self):
+        codec = default_registry.get("json")
+        data = {"operation": "op", "params": {"values": [1, 2.5, "x", None]}}
+        assert codec.decode(memoryview(codec.encode(data))) == data
+    
+    def test_msgpack_round_trip(self):
+        pytest.importorskip("msgpack")
+        codec = default_registry.get("msgpack")
+        data = {"operation": "op", "params": {"blob": b"\x00\x01", "n": 1}}
+        assert codec.decode(codec.encode(data)) == data
+    
+    def test_raw_passthrough(self):
+        codec = default_registry.get("raw")
+        payload = b"pre-encoded"
+        assert codec.encode(payload) is payload
+        
+        with pytest.raises(ProtocolError):
+            codec.encode({"not": "bytes"})
+    
+    def test_preference_and_negotiation(self):
+        registry = default_registry
+        # Raw is never negotiated; JSON is always the final fallback
+        assert [c.name for c in registry.preference(["raw", "bogus"])] == ["json"]
+        assert registry.negotiate([0x7F]).name == "json"
+        assert registry.negotiate([0x01]).name == "json"
+        
+        with pytest.raises(ProtocolError):
+            registry.get("bogus")
+
+class TestCompression:
+    """Test payload compression thresholds and safety limits"""
+    
+    @pytest.mark.parametrize("algorithm", ["zlib", "lzma"])
+    def test_round_trip(self, algorithm):
+        from pypolycall.core.protocol.compression import Compressor
+        
+        compressor = Compressor(algorithm, threshold=16)
+        payload = b"polycall " * 200
+        compressed, used = compressor.compress(payload)
+        
+        assert used and len(compressed) < len(payload)
+        assert compressor.decompress(compressed, len(payload)) == payload
+    
+    def test_threshold_and_incompressible(self):
+        import os
+        from pypolycall.core.protocol.compression import Compressor
+        
+        compressor = Compressor(threshold=100)
+        assert compressor.compress(b"tiny") == (b"tiny", False)
+        
+        noise = os.urandom(1024)
+        assert compressor.compress(noise) == (noise, False)
+        assert compressor.stats.frames_skipped == 2
+    
+    def test_decompression_bound(self):
+        from pypolycall.core.protocol.compression import Compressor
+        
+        compressor = Compressor(threshold=0)
+        compressed, _ = compressor.compress(b"\x00" * 100000)
+        
+        with pytest.raises(ProtocolError):
+            compressor.decompress(compressed, 1000)
+        with pytest.raises(ProtocolError):
+            compressor.decompress(b"not compressed", 1000)
+    
+    @pytest.mark.parametrize("algorithm", ["zlib", "lzma"])
+    def test_truncated_stream(self, algorithm):
+        from pypolycall.core.protocol.compression import Compressor
+        
+        compressor = Compressor(algorithm, threshold=0)
+        payload = b"polycall " * 200
+        compressed, _ = compressor.compress(payload)
+        
+        with pytest.raises(ProtocolError, match="truncated"):
+            compressor.decompress(compressed[:-8], len(payload))
@@ -0,0 +1,109 @@
+"""
+Slow Operation Log Tests
+"""
+
+import json
+import time
+
+from pypolycall.core.telemetry.slowlog import CallTrace, SlowOperationLog
+
+def _trace() -> CallTrace:
+    trace = CallTrace()
+    trace.started = 0
+    trace.encoded = 1_000_000
+    trace.acquired = 1_000_000
+    trace.written = 3_000_000
+    trace.received = 9_000_000
+    trace.decoded = 10_000_000
+    trace.sequence = 42
+    trace.request_bytes = 128
+    trace.reply_bytes = 256
+    return trace
+
+class TestCallTrace:
+    """Test phase accounting"""
+    
+    def test_phases(self):
+        """Test each phase is the gap between its marks, in seconds"""
+        phases = _trace().phases(12_000_000)
+        
+        assert phases == {
+            "encode": 0.001,
+            "queue": 0.0,
+            "write": 0.002,
+            "wait": 0.006,
+            "decode": 0.001,
+            "resume": 0.002,
+        }
+    
+    def test_unfinished_phases(self):
+        """Test phases a failed call never reached are None"""
+        trace = CallTrace()
+        trace.encoded = trace.acquired = trace.written = trace.started
+        phases = trace.phases(time.perf_counter_ns())
+        
+        assert phases["write"] == 0.0
+        assert phases["wait"] is None and phases["decode"] is None
+        assert phases["resume"] is None
+
+class TestSlowOperationLog:
+    """Test JSONL output"""
+    
+    def test_entries_written(self, tmp_path):
+        """Test each slow call becomes one JSON line once the log is closed"""
+        path = tmp_path / "slow.jsonl"
+        with SlowOperationLog(str(path)) as slow_log:
+            slow_log.record("get", _trace(), 0.5, "json", "127.0.0.1:8084")
+            slow_log.record("put", _trace(), 0.5, "msgpack", "127.0.0.1:8084", TimeoutError())
+        
+        first, second = [json.loads(line) for line in path.read_text().splitlines()]
+        assert first["operation"] == "get" and first["sequence"] == 42
+        assert first["request_bytes"] == 128 and first["reply_bytes"] == 256
+        assert first["codec"] == "json" and first["connection"] == "127.0.0.1:8084"
+        assert first["phases"]["wait"] == 0.006
+        assert "error" not in first
+        assert second["error"] == "TimeoutError"
+        assert slow_log.stats["recorded"] == 2
+    
+    def test_rotation(self, tmp_path):
+        """Test the file rotates at max_bytes keeping backup_count files"""
+        path = tmp_path / "slow.jsonl"
+        with SlowOperationLog(str(path), max_bytes=1024, backup_count=2) as slow_log:
+            for _ in range(50):
+                slow_log.record("get", _trace(), 0.5, "json", "127.0.0.1:8084")
+        
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "slow.jsonl", "slow.jsonl.1", "slow.jsonl.2"
+        ]
+        assert path.stat().st_size <= 1024
+    
+    def test_backlog_dropped(self, tmp_path):
+        """Test entries beyond max_pending are dropped, not queued"""
+        slow_log = SlowOperationLog(str(tmp_path / "slow.jsonl"), max_pending=0)
+        slow_log.record("get", _trace(), 0.5, "json", "127.0.0.1:8084")
+        slow_log.close()
+        
+        assert slow_log.stats["recorded"] == 0
+        assert slow_log.stats["dropped"] == 1
+    
+    def test_from_config(self, tmp_path, monkeypatch):
+        """Test no log is created without slow_log_path"""
+        monkeypatch.delenv("PYPOLYCALL_SLOW_LOG", raising=False)
+        assert SlowOperationLog.from_config({}) is None
+        
+        slow_log = SlowOperationLog.from_config({
+            "slow_log_path": str(tmp_path / "logs" / "slow.jsonl")
+        })
+        slow_log.close()
+        assert slow_log.path.endswith("slow.jsonl")
+    
+    def test_env_fallback(self, tmp_path, monkeypatch):
+        """Test PYPOLYCALL_SLOW_LOG opens a log for bindings without slow_log_path"""
+        from pypolycall.core.binding import ProtocolBinding
+        
+        path = str(tmp_path / "slow.jsonl")
+        monkeypatch.setenv("PYPOLYCALL_SLOW_LOG", path)
+        binding = ProtocolBinding()
+        
+        assert binding.slow_log is not None and binding.slow_log.path == path
+        binding.slow_log.close()
@@ -0,0 +1,396 @@
+"""
+State Machine Tests
+"""
+
+import time
+
+import pytest
+from pypolycall.core.ffi import SMStatus
+from pypolycall.core.state import ProtocolStates, StateMachine, StateManager, protocol_state_machine
+from pypolycall.core.state.snapshot import HEADER_SIZE, RECORD_SIZE
+from pypolycall.core.telemetry.metrics import MetricsCollector
+from pypolycall.exceptions import ConfigurationError, StateError
+
+@pytest.fixture
+def machine():
+    """INIT -> READY -> RUNNING machine like polycall_state_machine.c"""
+    return StateMachine.build(
+        ["INIT", "READY", "RUNNING", "PAUSED", "ERROR"],
+        [
+            ("to_ready", "INIT", "READY"),
+            ("to_running", "READY", "RUNNING"),
+            ("to_paused", "RUNNING", "PAUSED"),
+            ("pause_to_running", "PAUSED", "RUNNING"),
+            ("to_error", "RUNNING", "ERROR"),
+        ],
+        final_states=["ERROR"],
+    )
+
+class TestStateMachine:
+    """Test table-driven transitions"""
+    
+    def test_named_transitions(self, machine):
+        """Test named transitions move through the table"""
+        assert machine.current_state == "INIT"
+        assert machine.transition("to_ready") == "READY"
+        assert machine.execute_transition("to_running") == SMStatus.SUCCESS
+        assert machine.current_state == "RUNNING"
+        assert machine.transition_count == 2
+        assert machine.get_state_version("RUNNING") == 2
+    
+    def test_transition_to(self, machine):
+        """Test moving by target state and checking reachability"""
+        assert machine.can_transition_to("READY")
+        assert not machine.can_transition_to("RUNNING")
+        assert machine.transition_to("READY") == "READY"
+        assert machine.try_transition_to("INIT") == SMStatus.ERROR_INVALID_TRANSITION
+        assert machine.try_transition_to("MISSING") == SMStatus.ERROR_INVALID_STATE
+        assert machine.failed_transitions == 1
+    
+    def test_wrong_source_state(self, machine):
+        """Test a transition only runs from its source state"""
+        assert not machine.can_transition("to_running")
+        with pytest.raises(StateError) as excinfo:
+            machine.transition("to_running")
+        assert excinfo.value.status == SMStatus.ERROR_INVALID_TRANSITION
+        assert machine.current_state == "INIT"
+    
+    def test_locked_state(self, machine):
+        """Test locked states refuse transitions without counting failures"""
+        machine.lock_state("READY")
+        assert machine.execute_transition("to_ready") == SMStatus.ERROR_STATE_LOCKED
+        assert machine.failed_transitions == 0
+        machine.unlock_state("READY")
+        assert machine.transition("to_ready") == "READY"
+    
+    def test_restore_transition_count(self, machine):
+        """Test the transition count can be restored but not made negative"""
+        machine.restore_transition_count(7)
+        machine.transition("to_ready")
+        assert machine.transition_count == 8
+        with pytest.raises(ValueError):
+            machine.restore_transition_count(-1)
+    
+    def test_callbacks_order(self):
+        """Test on_exit, action and on_enter run in that order"""
+        calls = []
+        machine = StateMachine()
+        machine.add_state("A", on_exit=lambda sm: calls.append("exit"))
+        machine.add_state("B", on_enter=lambda sm: calls.append(sm.current_state))
+        machine.add_transition("go", "A", "B", action=lambda sm: calls.append("action"))
+        
+        machine.transition("go")
+        assert calls == ["exit", "action", "A"]
+        assert machine.current_state == "B"
+    
+    def test_guard_cached(self):
+        """Test a guard runs once until invalidate_guards"""
+        calls = []
+        def guard(source, target):
+            calls.append((source.name, target.name))
+            return len(calls) > 1
+        
+        machine = StateMachine.build(["A", "B"], [("go", "A", "B"), ("back", "B", "A")])
+        machine.add_transition("hop", "A", "A", guard=guard)
+        
+        assert machine.execute_transition("hop") == SMStatus.ERROR_INVALID_TRANSITION
+        assert machine.execute_transition("hop") == SMStatus.ERROR_INVALID_TRANSITION
+        assert calls == [("A", "A")]
+        machine.invalidate_guards()
+        assert machine.execute_transition("hop") == SMStatus.SUCCESS
+        assert len(calls) == 2
+    
+    def test_guard_uncached(self):
+        """Test cache_guards=False evaluates the guard every time"""
+        allowed = [False]
+        machine = StateMachine(cache_guards=False)
+        machine.add_state("A")
+        machine.add_state("B")
+        machine.add_transition("go", "A", "B", guard=lambda source, target: allowed[0])
+        
+        assert not machine.can_transition("go")
+        allowed[0] = True
+        assert machine.transition("go") == "B"
+    
+    def test_definition_errors(self, machine):
+        """Test definition errors carry polycall_sm_status_t codes"""
+        with pytest.raises(StateError) as excinfo:
+            machine.add_state("READY")
+        assert excinfo.value.status == SMStatus.ERROR_INVALID_STATE
+        with pytest.raises(StateError) as excinfo:
+            machine.add_transition("to_ready", "INIT", "RUNNING")
+        assert excinfo.value.status == SMStatus.ERROR_INVALID_TRANSITION
+        with pytest.raises(StateError) as excinfo:
+            machine.add_transition("to_nowhere", "INIT", "MISSING")
+        assert excinfo.value.status == SMStatus.ERROR_INVALID_STATE
+        with pytest.raises(StateError):
+            machine.add_state("S" * 40)
+    
+    def test_limits(self):
+        """Test POLYCALL_MAX_STATES and POLYCALL_MAX_TRANSITIONS are enforced"""
+        machine = StateMachine()
+        for i in range(32):
+            machine.add_state(f"S{i}")
+        with pytest.raises(StateError) as excinfo:
+            machine.add_state("S32")
+        assert excinfo.value.status == SMStatus.ERROR_MAX_STATES_REACHED
+        
+        for i in range(64):
+            machine.add_transition(f"t{i}", i % 32, (i + 1) % 32)
+        with pytest.raises(StateError) as excinfo:
+            machine.add_transition("t64", 0, 1)
+        assert excinfo.value.status == SMStatus.ERROR_MAX_TRANSITIONS_REACHED
+    
+    def test_definition_after_compile(self, machine):
+        """Test states and transitions added after first use are picked up"""
+        machine.transition("to_ready")
+        machine.add_state("DRAINING")
+        machine.add_transition("drain", "READY", "DRAINING")
+        
+        assert machine.transition_to("DRAINING") == "DRAINING"
+    
+    def test_copy(self, machine):
+        """Test copies share the definition but not their current state"""
+        machine.transition("to_ready")
+        machine.lock_state("RUNNING")
+        clone = machine.copy()
+        
+        assert clone.current_state == "INIT"
+        assert not clone.is_locked("RUNNING")
+        clone.add_state("EXTRA")
+        assert "EXTRA" not in machine.states
+    
+    def test_protocol_states(self):
+        """Test the protocol lifecycle matches polycall_protocol_can_transition"""
+        machine = protocol_state_machine()
+        
+        assert machine.states == list(ProtocolStates.NAMES)
+        for name in ("to_handshake", "to_auth", "to_ready", "to_error", "to_closed"):
+            machine.transition(name)
+        assert machine.current_state_id == ProtocolStates.CLOSED
+        assert machine.is_final
+
+class TestStateManager:
+    """Test per-session machines"""
+    
+    def test_sessions(self):
+        """Test sessions transition independently and are counted per state"""
+        manager = StateManager()
+        manager.create("a")
+        manager.create("b", state="READY")
+        
+        assert manager.transition_to("a", "HANDSHAKE") == "HANDSHAKE"
+        assert manager.execute_transition("b", "to_closed") == SMStatus.SUCCESS
+        assert manager.execute_transition("missing", "to_closed") == SMStatus.ERROR_INVALID_CONTEXT
+        assert manager.counts()["HANDSHAKE"] == 1
+        assert manager.counts()["CLOSED"] == 1
+        assert manager.get("a").current_state == "HANDSHAKE"
+    
+    def test_duplicate_and_remove(self):
+        """Test a key is tracked once until removed"""
+        manager = StateManager()
+        manager.create("a")
+        with pytest.raises(StateError):
+            manager.create("a")
+        
+        assert manager.remove("a")
+        assert not manager.remove("a")
+        assert "a" not in manager and len(manager) == 0
+        assert manager.state_of("a") is None
+    
+    def test_transition_many(self):
+        """Test bulk transitions honour source and key filters"""
+        manager = StateManager()
+        for key in range(4):
+            manager.create(key, state="READY")
+        manager.create("fresh")
+        
+        moved = manager.transition_many("CLOSED", source="READY", keys=[0, 1, "fresh"])
+        assert moved == {("READY", "CLOSED"): 2}
+        assert manager.counts()["READY"] == 2
+
+@pytest.fixture(params=[False, True], ids=["machines", "vectorized"])
+def sessions(request):
+    """Manager in both storage modes with a shared collector"""
+    if request.param:
+        pytest.importorskip("numpy")
+    return StateManager(metrics=MetricsCollector(), vectorized=request.param, capacity=2)
+
+class TestSessionModes:
+    """Test both storage modes behave alike"""
+    
+    def test_lifecycle(self, sessions):
+        """Test per-session transitions, counts and telemetry"""
+        for key in ("a", "b", "c"):
+            sessions.create(key)
+        for name in ("to_handshake", "to_auth", "to_ready"):
+            assert sessions.execute_transition("a", name) == SMStatus.SUCCESS
+        assert sessions.transition_to("b", "HANDSHAKE") == "HANDSHAKE"
+        assert sessions.execute_transition("c", "to_ready") == SMStatus.ERROR_INVALID_TRANSITION
+        with pytest.raises(StateError) as excinfo:
+            sessions.transition_to("missing", "READY")
+        assert excinfo.value.status == SMStatus.ERROR_INVALID_CONTEXT
+        
+        assert len(sessions) == 3
+        assert sessions.state_of("a") == "READY"
+        assert sessions.counts() == {
+            "INIT": 1, "HANDSHAKE": 1, "AUTH": 0, "READY": 1, "ERROR": 0, "CLOSED": 0
+        }
+        assert sessions.metrics.transitions()[("INIT", "HANDSHAKE")] == 2
+    
+    def test_idle_sessions_closed(self, sessions):
+        """Test only idle READY sessions are moved to CLOSED"""
+        for key in range(6):
+            sessions.create(key, state="READY")
+        sessions.create("init")
+        time.sleep(0.05)
+        sessions.touch(0)
+        
+        moved = sessions.transition_many("CLOSED", source="READY", idle=0.04)
+        assert moved == {("READY", "CLOSED"): 5}
+        assert sessions.state_of(0) == "READY"
+        assert sessions.state_of("init") == "INIT"
+        assert sessions.metrics.transitions() == {("READY", "CLOSED"): 5}
+    
+    def test_remove_reuses_slot(self, sessions):
+        """Test removed sessions free their slot"""
+        sessions.create("a", state="READY")
+        assert sessions.remove("a")
+        assert "a" not in sessions
+        sessions.create("b")
+        
+        assert list(sessions) == ["b"]
+        assert sessions.counts()["READY"] == 0
+
+def _restored(sessions, path):
+    """Fresh manager in the same mode restored from path"""
+    manager = StateManager(vectorized=sessions.vectorized, capacity=2)
+    return manager, manager.restore(path)
+
+class TestSnapshots:
+    """Test snapshot, flush and restore in both storage modes"""
+    
+    def test_round_trip(self, sessions, tmp_path):
+        """Test restored sessions are in their snapshotted states"""
+        path = str(tmp_path / "sessions.snap")
+        for key in ("a", b"raw"):
+            sessions.create(key)
+        sessions.create(7, state="ERROR")
+        sessions.transition_to("a", "HANDSHAKE")
+        
+        assert sessions.snapshot(path) == 3
+        sessions.close_snapshot()
+        manager, restored = _restored(sessions, path)
+        
+        assert restored == 3
+        assert {key: manager.state_of(key) for key in manager} == {
+            "a": "HANDSHAKE", 7: "ERROR", b"raw": "INIT"
+        }
+        assert manager.snapshot_path == path
+        assert manager.integrity_violations == 0
+    
+    def test_flush_writes_changes_only(self, sessions, tmp_path):
+        """Test flush rewrites only changed and removed sessions"""
+        path = str(tmp_path / "sessions.snap")
+        for key in range(5):
+            sessions.create(key)
+        sessions.snapshot(path)
+        
+        assert sessions.flush() == 0
+        sessions.transition_to(1, "HANDSHAKE")
+        sessions.create("new", state="READY")
+        sessions.remove(2)
+        assert sessions.flush() == 3
+        sessions.transition_many("HANDSHAKE", source="INIT")
+        assert sessions.flush() == 3
+        sessions.close_snapshot()
+        
+        manager, restored = _restored(sessions, path)
+        assert restored == 5
+        assert manager.counts()["HANDSHAKE"] == 4
+        assert manager.state_of("new") == "READY"
+        assert 2 not in manager
+    
+    def test_corrupt_record_skipped(self, sessions, tmp_path):
+        """Test a record failing its checksum is skipped and counted"""
+        path = tmp_path / "sessions.snap"
+        sessions.create("a", state="READY")
+        sessions.create("b", state="READY")
+        sessions.snapshot(str(path))
+        sessions.close_snapshot()
+        data = bytearray(path.read_bytes())
+        data[HEADER_SIZE + 2] = 4
+        path.write_bytes(bytes(data))
+        
+        manager, restored = _restored(sessions, str(path))
+        assert restored == 1
+        assert manager.integrity_violations == 1
+        assert manager.state_of("b") == "READY" and "a" not in manager
+        assert len(path.read_bytes()) >= HEADER_SIZE + 2 * RECORD_SIZE
+    
+    def test_other_template_rejected(self, sessions, tmp_path):
+        """Test restoring a snapshot of a different machine fails"""
+        path = str(tmp_path / "sessions.snap")
+        sessions.create("a")
+        sessions.snapshot(path)
+        sessions.close_snapshot()
+        
+        template = StateMachine.build(["A", "B"], [("go", "A", "B")])
+        with pytest.raises(StateError) as excinfo:
+            StateManager(template).restore(path)
+        assert excinfo.value.status == SMStatus.ERROR_VERSION_MISMATCH
+        with pytest.raises(StateError) as excinfo:
+            sessions.restore(path)
+        assert excinfo.value.status == SMStatus.ERROR_INVALID_CONTEXT
+    
+    def test_machine_locks_restored(self, tmp_path):
+        """Test machine sessions get back their locks and transition count"""
+        path = str(tmp_path / "sessions.snap")
+        manager = StateManager()
+        manager.create("a")
+        manager.snapshot(path)
+        manager.execute_transition("a", "to_handshake")
+        manager.get("a").lock_state("AUTH")
+        manager.touch("a")
+        manager.close_snapshot()
+        
+        restored = StateManager()
+        assert restored.restore(path) == 1
+        machine = restored.get("a")
+        assert machine.current_state == "HANDSHAKE"
+        assert machine.is_locked("AUTH") and machine.transition_count == 1
+        assert restored.execute_transition("a", "to_auth") == SMStatus.ERROR_STATE_LOCKED
+
+class TestSessionStateVector:
+    """Test vector-only behaviour"""
+    
+    def test_growth(self):
+        """Test the vector doubles when full"""
+        pytest.importorskip("numpy")
+        manager = StateManager(vectorized=True, capacity=2)
+        for key in range(5):
+            manager.create(key)
+        
+        assert manager.vectorized and manager.get(0) is None
+        assert manager._vector.capacity == 8
+        assert manager.transition_many("HANDSHAKE") == {("INIT", "HANDSHAKE"): 5}
+    
+    def test_callbacks_refused(self):
+        """Test templates with state callbacks cannot be vectorized"""
+        pytest.importorskip("numpy")
+        template = StateMachine()
+        template.add_state("A", on_enter=lambda machine: None)
+        
+        with pytest.raises(ConfigurationError):
+            StateManager(template, vectorized=True)
+    
+    def test_locked_template_state(self):
+        """Test template locks block vectorized moves once lookups are refreshed"""
+        pytest.importorskip("numpy")
+        manager = StateManager(vectorized=True)
+        manager.create("a", state="READY")
+        manager.template.lock_state("CLOSED")
+        manager.invalidate()
+        
+        assert manager.transition_many("CLOSED") == {}
+        assert manager.state_of("a") == "READY"
@@ -0,0 +1,87 @@
+"""
+Package Import Tests
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cumulative import time allowed for "import pypolycall", in microseconds
+IMPORT_BUDGET_US = 50_000
+
+def run_python(code, **env):
+    """Run code in a fresh interpreter with import timing enabled"""
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PACKAGE_ROOT,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+class TestImport:
+    """Test the package imports lazily, quietly and quickly"""
+    
+    def test_import_is_silent(self):
+        """Test importing prints nothing to stdout"""
+        assert run_python("import pypolycall").stdout == ""
+    
+    def test_import_is_lazy(self):
+        """Test heavy layers load only when a public name is used"""
+        result = run_python(
+            "import sys, pypolycall\n"
+            "print(' '.join(sorted(sys.modules)))"
+        )
+        loaded = set(result.stdout.split())
+        
+        for module in ["pypolycall.core", "pypolycall.cli", "pypolycall.config",
+                       "pypolycall.utils", "asyncio", "yaml", "structlog", "numpy"]:
+            assert module not in loaded
+    
+    def test_binding_is_lazy(self):
+        """Test using ProtocolBinding does not load the FFI, state or pool layers"""
+        result = run_python(
+            "import sys, pypolycall\n"
+            "pypolycall.ProtocolBinding\n"
+            "print(' '.join(sorted(sys.modules)))"
+        )
+        loaded = set(result.stdout.split())
+        
+        assert "pypolycall.core.binding" in loaded
+        for module in ["ctypes", "pypolycall.core.ffi", "pypolycall.core.state",
+                       "pypolycall.core.pool", "pypolycall.core.telemetry.profiler"]:
+            assert module not in loaded
+    
+    def test_import_time_budget(self):
+        """Test the cumulative import time of the package stays within budget"""
+        run_python("import pypolycall")  # warm the bytecode cache
+        stderr = run_python("import pypolycall").stderr
+        
+        cumulative = [
+            int(line.split("|")[1])
+            for line in stderr.splitlines()
+            if line.rstrip().endswith("| pypolycall")
+        ]
+        assert cumulative and cumulative[0] < IMPORT_BUDGET_US
+    
+    def test_lazy_attributes(self):
+        """Test public names resolve on access and unknown names still fail"""
+        import pypolycall
+        from pypolycall.core.binding import ProtocolBinding
+        
+        assert pypolycall.ProtocolBinding is ProtocolBinding
+        assert "SyncBinding" in dir(pypolycall)
+        with pytest.raises(AttributeError):
+            pypolycall.NotAThing
+    
+    def test_notice_is_opt_in(self):
+        """Test the compliance notice goes to stderr only when requested"""
+        result = run_python("import pypolycall", PYPOLYCALL_COMPLIANCE_NOTICE="1")
+        
+        assert result.stdout == ""
+        assert "PYPOLYCALL PROTOCOL COMPLIANCE NOTICE" in result.stderr
@@ -188,4 +188,10 @@ if __name__ == "__main__":
         uvicorn_server = uvicorn.Server(config)
         await uvicorn_server.serve()
     
-    asyncio.run(main())
+    # Same loop backend as the binding: PYPOLYCALL_EVENT_LOOP=uvloop|asyncio
+    try:
+        from pypolycall.core.loop import run as run_event_loop
+    except ImportError:
+        run_event_loop = asyncio.run
+    
+    run_event_loop(main())